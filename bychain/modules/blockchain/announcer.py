@@ -0,0 +1,142 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, Tuple
+
+import requests
+
+
+class PeerStats(object):
+
+    @staticmethod
+    def to_json(stats: 'PeerStats'):
+        return dict(delivered=stats.delivered, rejected=stats.rejected, failed=stats.failed,
+                    last_latency=stats.last_latency, average_latency=stats.average_latency)
+
+    def __init__(self):
+        self.__delivered = 0
+        self.__rejected = 0
+        self.__failed = 0
+        self.__total_latency = 0.0
+        self.__last_latency = None
+
+    def record(self, latency: float = None, accepted: bool = False):
+        # latency is None when the peer could not be reached or did not answer in time.
+        if latency is None:
+            self.__failed += 1
+        else:
+            self.__last_latency = latency
+            self.__total_latency += latency
+            if accepted:
+                self.__delivered += 1
+            else:
+                self.__rejected += 1
+
+    @property
+    def delivered(self):
+        return self.__delivered
+
+    @property
+    def rejected(self):
+        return self.__rejected
+
+    @property
+    def failed(self):
+        return self.__failed
+
+    @property
+    def last_latency(self):
+        return self.__last_latency
+
+    @property
+    def average_latency(self):
+        answered = self.__delivered + self.__rejected
+        return self.__total_latency / answered if answered else None
+
+
+class BlockAnnouncer(object):
+    WORKERS = 8
+    TIMEOUT = (2.0, 5.0)
+
+    def __init__(self, workers: int = None, timeout: Tuple[float, float] = None):
+        self.__timeout = timeout or self.TIMEOUT
+        self.__pool = ThreadPoolExecutor(max_workers=workers or self.WORKERS, thread_name_prefix='announcer')
+        self.__lock = threading.Lock()
+        self.__sessions: Dict[str, requests.Session] = {}
+        self.__stats: Dict[str, PeerStats] = {}
+        self.__pending = set()
+
+    def __session(self, peer: str):
+        # One session per peer keeps its connections alive between announcements.
+        with self.__lock:
+            if peer not in self.__sessions:
+                self.__sessions[peer] = requests.Session()
+                self.__stats[peer] = PeerStats()
+            return self.__sessions[peer]
+
+    def __request(self, peer: str, path: str, data: bytes, headers: Dict[str, str]):
+        session = self.__session(peer=peer)
+        started = time.monotonic()
+        try:
+            response = session.post(url='http://{}{}'.format(peer, path), data=data, headers=headers,
+                                    timeout=self.__timeout)
+        except requests.RequestException:
+            response, latency = None, None
+        else:
+            latency = time.monotonic() - started
+
+        with self.__lock:
+            self.__stats[peer].record(latency=latency,
+                                      accepted=response is not None and 200 <= response.status_code < 300)
+
+        return response
+
+    def __post(self, peer: str, path: str, data: bytes, headers: Dict[str, str],
+               on_response: Callable[[str, requests.Response], None] = None):
+        response = self.__request(peer=peer, path=path, data=data, headers=headers)
+        accepted = response is not None and 200 <= response.status_code < 300
+        if accepted and on_response is not None:
+            on_response(peer, response)
+
+        return accepted
+
+    def send(self, peer: str, path: str, data: bytes, headers: Dict[str, str]):
+        # Posts from the calling thread over the peer's session; None when the peer could not be reached.
+        return self.__request(peer=peer, path=path, data=data, headers=headers)
+
+    def __done(self, future):
+        with self.__lock:
+            self.__pending.discard(future)
+
+    def announce(self, peers: Iterable[str], path: str, data: bytes, headers: Dict[str, str],
+                 on_response: Callable[[str, requests.Response], None] = None):
+        # Returns right away; each peer is posted to from the pool and slow peers only hold their own worker.
+        # on_response runs in the same worker for every accepted post, so flush also waits for it.
+        futures = []
+        for peer in peers:
+            future = self.__pool.submit(self.__post, peer, path, data, headers, on_response)
+            with self.__lock:
+                self.__pending.add(future)
+            future.add_done_callback(self.__done)
+            futures.append(future)
+
+        return futures
+
+    def flush(self, timeout: float = None):
+        with self.__lock:
+            pending = set(self.__pending)
+        not_done = wait(pending, timeout=timeout).not_done if pending else set()
+
+        return not not_done
+
+    def close(self):
+        self.__pool.shutdown(wait=False)
+        with self.__lock:
+            for session in self.__sessions.values():
+                session.close()
+            self.__sessions = {}
+
+    @property
+    def stats(self):
+        with self.__lock:
+            return {peer: PeerStats.to_json(stats) for peer, stats in self.__stats.items()}
@@ -1,11 +1,31 @@
-import copy
-import json
+import string
+import struct
 from hashlib import sha256
 from datetime import datetime
-from typing import List, Dict
+from typing import Callable, List, Dict
+
+from bychain.modules.blockchain.merkle import MerkleTree
+from bychain.modules.blockchain.serialization import BinarySerializer, SerializationError
+from bychain.modules.blockchain.transaction import FrozenTransaction
 
 
 class Block(object):
+    __slots__ = ('__index', '__transactions', '__timestamp', '__previous_hash', '__nonce', '__merkle_root',
+                 '__merkle_tree', '__hash', '__body_loader', '__read_through')
+    HEADER_PREFIX_FORMAT = struct.Struct('>Qd32s32s')
+    NONCE_FORMAT = struct.Struct('>Q')
+    ENCODED_FORMAT = struct.Struct('>BQdQ')
+
+    @staticmethod
+    def hash_to_bytes(block_hash: str):
+        # Previous hashes that are not a full sha256 hex digest (such as the genesis marker) are committed through
+        # their digest so the header keeps a fixed size.
+        if len(block_hash) == 64 and all(char in string.hexdigits for char in block_hash):
+            result = bytes.fromhex(block_hash)
+        else:
+            result = sha256(block_hash.encode()).digest()
+
+        return result
 
     @staticmethod
     def to_json(block: 'Block'):
@@ -16,22 +36,142 @@ class Block(object):
 
         return result
 
+    @staticmethod
+    def header_to_json(block: 'Block'):
+        # Everything the hash commits to, with the merkle root standing in for the transactions.
+        result = None
+        if block is not None:
+            result = dict(index=block.index, previous_hash=block.previous_hash, timestamp=block.timestamp,
+                          nonce=block.nonce, merkle_root=block.merkle_root.hex(), hash=block.hash)
+
+        return result
+
+    @classmethod
+    def decode(cls, data: bytes):
+        view = memoryview(data)
+        if len(view) < cls.ENCODED_FORMAT.size:
+            raise SerializationError('Truncated block header')
+
+        version, index, timestamp, nonce = cls.ENCODED_FORMAT.unpack_from(view, 0)
+        if version != BinarySerializer.VERSION:
+            raise SerializationError('Unsupported block version {}'.format(version))
+
+        previous_hash, offset = BinarySerializer.decode_value(view, cls.ENCODED_FORMAT.size)
+        transactions, offset = BinarySerializer.decode_value(view, offset)
+        if offset != len(view) or not isinstance(previous_hash, str) or not isinstance(transactions, list) or \
+                not all(isinstance(transaction, dict) for transaction in transactions):
+            raise SerializationError('Malformed block')
+
+        return cls(index=index, transactions=transactions, previous_hash=previous_hash, timestamp=timestamp,
+                   nonce=nonce)
+
+    @classmethod
+    def from_header(cls, index: int, previous_hash: str, timestamp: float, nonce: int, merkle_root: bytes,
+                    body_loader: Callable[[], List[Dict]]):
+        # Builds a block whose transactions are only read, through body_loader, the first time they are needed;
+        # the hash only depends on the header so it never triggers the load.
+        block = cls(index=index, transactions=(), previous_hash=previous_hash, timestamp=timestamp, nonce=nonce)
+        block.__transactions = None
+        block.__merkle_root = merkle_root
+        block.__body_loader = body_loader
+        return block
+
     def __init__(self, index: int, transactions: List[Dict], previous_hash: str, timestamp: float = None,
                  nonce: int = 0):
         self.__index = index
-        self.__transactions = copy.deepcopy(transactions)
+        self.__transactions = tuple(FrozenTransaction.freeze(transaction) for transaction in transactions)
         self.__timestamp = timestamp or datetime.utcnow().timestamp()
         self.__previous_hash = previous_hash
-        self.nonce = nonce
+        self.__nonce = nonce
+        self.__merkle_root = None
+        self.__merkle_tree = None
+        self.__hash = None
+        self.__body_loader = None
+        self.__read_through = False
+
+    def __body(self):
+        transactions = self.__transactions
+        if transactions is None:
+            if self.__body_loader is None:
+                raise LookupError('Transactions of block {} have been pruned'.format(self.__index))
+            if self.__read_through:
+                transactions = self.__body_loader()
+            else:
+                transactions = tuple(FrozenTransaction.freeze(transaction) for transaction in self.__body_loader())
+                self.__transactions = transactions
+        return transactions
+
+    def evict_body(self, body_loader: Callable[[], List[Dict]] = None, read_through: bool = False):
+        # Drops the transactions once the hash is fixed; they come back through body_loader, or never without one.
+        # With read_through the body is not kept: the loader, which then returns a tuple of frozen transactions and
+        # does its own caching, is called on every access.
+        self.hash
+        self.__transactions = None
+        self.__merkle_tree = None
+        self.__body_loader = body_loader
+        self.__read_through = read_through
 
     def __json(self):
-        return dict(index=self.__index, transactions=self.__transactions, timestamp=self.__timestamp,
-                    previous_hash=self.__previous_hash, nonce=self.nonce)
+        return dict(index=self.__index, transactions=list(self.__body()), timestamp=self.__timestamp,
+                    previous_hash=self.__previous_hash, nonce=self.__nonce)
+
+    def encode(self):
+        buffer = bytearray(self.ENCODED_FORMAT.pack(BinarySerializer.VERSION, self.__index, self.__timestamp,
+                                                    self.__nonce))
+        BinarySerializer.encode_value(buffer, self.__previous_hash)
+        BinarySerializer.encode_value(buffer, self.__body())
+        return bytes(buffer)
+
+    def transaction_position(self, transaction_id):
+        position = None
+        for current_position, transaction in enumerate(self.__body()):
+            if str(transaction.get('id')) == str(transaction_id):
+                position = current_position
+                break
+
+        return position
+
+    @property
+    def merkle_tree(self):
+        # Not cached for read-through blocks, which keep nothing derived from their body.
+        tree = self.__merkle_tree
+        if tree is None:
+            tree = MerkleTree(transactions=self.__body())
+            if self.__transactions is not None:
+                self.__merkle_tree = tree
+        return tree
+
+    @property
+    def merkle_root(self):
+        # Only the root is kept for hashing; the full tree is cached once a proof is requested.
+        if self.__merkle_root is None:
+            tree = self.__merkle_tree or MerkleTree(transactions=self.__body())
+            self.__merkle_root = tree.root
+        return self.__merkle_root
+
+    @property
+    def header_prefix(self):
+        return self.HEADER_PREFIX_FORMAT.pack(self.__index, self.__timestamp, self.hash_to_bytes(self.__previous_hash),
+                                              self.merkle_root)
+
+    @property
+    def header(self):
+        return self.header_prefix + self.NONCE_FORMAT.pack(self.__nonce)
 
     @property
     def hash(self):
-        block_string = json.dumps(self.__json(), sort_keys=True)
-        return sha256(block_string.encode()).hexdigest()
+        if self.__hash is None:
+            self.__hash = sha256(self.header).hexdigest()
+        return self.__hash
+
+    @property
+    def nonce(self):
+        return self.__nonce
+
+    def _set_nonce(self, nonce: int):
+        # Only for the miner, on a block that is not part of a chain yet; everywhere else the nonce is read-only.
+        self.__nonce = nonce
+        self.__hash = None
 
     @property
     def index(self):
@@ -39,7 +179,15 @@ class Block(object):
 
     @property
     def transactions(self):
-        return self.__transactions
+        return list(self.__body())
+
+    @property
+    def body_loaded(self):
+        return self.__transactions is not None
+
+    @property
+    def body_available(self):
+        return self.__transactions is not None or self.__body_loader is not None
 
     @property
     def timestamp(self):
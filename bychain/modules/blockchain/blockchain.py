@@ -1,28 +1,88 @@
-import copy
+import json
+import threading
+from collections import OrderedDict
 from datetime import datetime
-from typing import Dict, List
+from functools import partial
+from typing import Dict, List, Tuple
 
 from bychain.modules.blockchain.block import Block
+from bychain.modules.blockchain.bloom import BloomFilter
+from bychain.modules.blockchain.compact import CompactBlock
+from bychain.modules.blockchain.difficulty import Difficulty
+from bychain.modules.blockchain.mempool import Mempool
+from bychain.modules.blockchain.merkle import MerkleTree
+from bychain.modules.blockchain.miner import ProofOfWorkMiner
+from bychain.modules.blockchain.serialization import BinarySerializer, SerializationError
+from bychain.modules.blockchain.store import BlockStore
+from bychain.modules.blockchain.transaction import FrozenTransaction
+from bychain.modules.blockchain.validation import ChainValidator, ValidationResult
 
 
 class BlockChain(object):
-    DIFFICULTY = 2
+    DIFFICULTY_BITS = 8
+    RETARGET_INTERVAL = 10
+    TARGET_BLOCK_INTERVAL = 10.0
+    MEDIAN_TIME_BLOCKS = 11
+    MAX_FUTURE_BLOCK_TIME = 2 * 60 * 60.0
+    MINING_WORKERS = 1
+    VALIDATION_WORKERS = 1
+    MAX_BLOCK_TRANSACTIONS = 1000
+    MAX_BLOCK_BYTES = 1000000
+    MEMPOOL_MAX_TRANSACTIONS = 100000
+    MEMPOOL_MAX_BYTES = 50000000
+    MEMPOOL_TTL = 24 * 60 * 60.0
     STARTING_HASH = '0'
+    CHECKPOINTS: Dict[int, str] = {}
+    LOCATOR_DENSE_BLOCKS = 10
+    HEADERS_PER_REQUEST = 2000
+    PRUNE_EVICT = 'evict'
+    PRUNE_FULL = 'full'
+    PRUNE_DEPTH = None
+    PRUNE_MODE = PRUNE_EVICT
+    BODY_CACHE_SIZE = 256
+    PRUNED_FILTER_CAPACITY = 1000000
+    PRUNED_FILTER_ERROR_RATE = 0.001
+    TRANSACTION_ADDED = 'added'
+    TRANSACTION_INVALID = 'invalid'
+    TRANSACTION_DUPLICATE = 'duplicate'
+    TRANSACTION_REJECTED = 'rejected'
     REQUIRED_TRANSACTION_FIELDS = {'id', 'value', 'timestamp'}
-    OPTIONAL_TRANSACTION_FIELDS = set()
+    OPTIONAL_TRANSACTION_FIELDS = {Mempool.PRIORITY_FIELD}
 
     @classmethod
-    def __is_valid_proof(cls, block: Block, block_hash: str):
-        return block_hash.startswith('0' * cls.DIFFICULTY) and block_hash == block.hash
+    def __is_valid_proof(cls, block: Block, block_hash: str, target: int):
+        return block_hash == block.hash and Difficulty.meets_target(block_hash=block_hash, target=target)
 
     @classmethod
-    def proof_of_work(cls, block: Block):
-        computed_hash = block.hash
-        while not computed_hash.startswith('0' * cls.DIFFICULTY):
-            block.nonce += 1
-            computed_hash = block.hash
+    def initial_target(cls):
+        return Difficulty.target_from_bits(bits=cls.DIFFICULTY_BITS)
 
-        return computed_hash
+    @classmethod
+    def expected_target(cls, height: int, previous_target: int, timestamps: List[float]):
+        # timestamps are those of the blocks right below height, at least the last RETARGET_INTERVAL + 1 of them.
+        target = previous_target
+        if height == 0:
+            target = cls.initial_target()
+        elif height % cls.RETARGET_INTERVAL == 0:
+            window = timestamps[-(cls.RETARGET_INTERVAL + 1):]
+            if len(window) > 1:
+                target = Difficulty.retarget(target=previous_target, timestamps=window,
+                                             block_interval=cls.TARGET_BLOCK_INTERVAL)
+
+        return target
+
+    @classmethod
+    def valid_timestamp(cls, timestamp: float, timestamps: List[float]):
+        # timestamps are those of the blocks right below; a block must come after the median of the last
+        # MEDIAN_TIME_BLOCKS of them and at most MAX_FUTURE_BLOCK_TIME after the local clock.
+        window = sorted(timestamps[-cls.MEDIAN_TIME_BLOCKS:])
+        return (not window or timestamp > window[len(window) // 2]) and \
+            timestamp <= datetime.utcnow().timestamp() + cls.MAX_FUTURE_BLOCK_TIME
+
+    @classmethod
+    def proof_of_work(cls, block: Block, target: int = None, interrupt: threading.Event = None):
+        miner = ProofOfWorkMiner(workers=cls.MINING_WORKERS)
+        return miner.mine(block=block, target=target or cls.initial_target(), interrupt=interrupt)
 
     @classmethod
     def __validate_new_transaction(cls, transaction: Dict):
@@ -36,72 +96,521 @@ class BlockChain(object):
                 if not (field in cls.REQUIRED_TRANSACTION_FIELDS or field in cls.OPTIONAL_TRANSACTION_FIELDS):
                     break
             else:
-                is_valid = True
+                priority = transaction.get(Mempool.PRIORITY_FIELD, 0)
+                is_valid = (isinstance(transaction['id'], (str, int)) and not isinstance(transaction['id'], bool) and
+                            isinstance(priority, (int, float)) and not isinstance(priority, bool) and priority >= 0)
 
         return is_valid
 
+    @classmethod
+    def check_chain(cls, chain: List[Dict]):
+        validator = ChainValidator(expected_target=cls.expected_target, workers=cls.VALIDATION_WORKERS,
+                                   checkpoints=cls.CHECKPOINTS, valid_timestamp=cls.valid_timestamp)
+        return validator.validate(chain=chain, previous_hash=cls.STARTING_HASH)
+
     @classmethod
     def validate_chain(cls, chain: List[Dict]):
-        result = False
-        previous_hash = cls.STARTING_HASH
-
-        if isinstance(chain, list) and chain:
-            for block_json in chain:
-                block_hash = block_json.pop('hash')
-                block = Block(**block_json)
-                if not (cls.__is_valid_proof(block=block, block_hash=block_hash) and
-                        previous_hash == block.previous_hash):
-                    break
-                previous_hash = block.hash
+        return cls.check_chain(chain=chain).valid
 
-            else:
-                result = True
+    @classmethod
+    def decode_chain(cls, data: bytes):
+        return [Block.to_json(Block.decode(encoded_block)) for encoded_block in BinarySerializer.decode_blocks(data)]
 
-        return result
+    @staticmethod
+    def __snapshot_transactions(encoded_block: bytes, merkle_root: bytes):
+        # Snapshot bodies are only trusted through the merkle root committed in their checkpointed header.
+        transactions = Block.decode(encoded_block).transactions
+        if MerkleTree(transactions=transactions).root != merkle_root:
+            raise SerializationError('Snapshot block body does not match its merkle root')
+        return transactions
 
-    def __init__(self):
-        self.__unconfirmed_transactions = []
+    def __init__(self, store: BlockStore = None, snapshot: str = None):
+        self.__mempool = Mempool(max_transactions=self.MEMPOOL_MAX_TRANSACTIONS, max_bytes=self.MEMPOOL_MAX_BYTES,
+                                 ttl=self.MEMPOOL_TTL)
         self.__chain = []
-        self.__create_genesis_block()
+        self.__targets = []
+        self.__works = []
+        self.__heights_by_hash: Dict[str, int] = {}
+        self.__locations_by_transaction: Dict[str, Tuple[int, int]] = {}
+        self.__indexed_height = 0
+        self.__pruned_filter = BloomFilter(capacity=self.PRUNED_FILTER_CAPACITY,
+                                           error_rate=self.PRUNED_FILTER_ERROR_RATE) \
+            if self.PRUNE_MODE == self.PRUNE_FULL else None
+        self.__json_blocks: List[str] = []
+        self.__encoded_blocks: List[bytes] = []
+        self.__pruned_height = 0
+        self.__body_cache = OrderedDict()
+        self.__lock = threading.RLock()
+        self.__mining_interrupts = set()
+        self.__store = store
+        if store is not None and len(store) > 0:
+            self.__load_from_store()
+        elif snapshot is not None:
+            self.__load_snapshot(path=snapshot)
+        else:
+            self.__create_genesis_block()
 
     def __create_genesis_block(self):
         genesis_block = Block(index=0, transactions=[], previous_hash=self.STARTING_HASH)
-        self.proof_of_work(block=genesis_block)
-        self.__chain.append(genesis_block)
+        self.proof_of_work(block=genesis_block, target=self.next_target)
+        self.__append(block=genesis_block)
 
-    def add_block(self, block: Block, proof: str):
+    def __load_from_store(self):
+        # Blocks in the local store were validated before being written, so they are trusted as they are. Blocks
+        # pruned in full mode before the restart have no body left; their ids come back from the pruned records.
+        # The transaction index is rebuilt from the ids stored with each block rather than from the bodies; blocks
+        # without them are indexed lazily.
+        if self.__pruned_filter is not None:
+            self.__pruned_height, transaction_ids = self.__store.load_pruned()
+            for transaction_id in transaction_ids:
+                self.__pruned_filter.add(transaction_id)
+        for block in self.__store.load(first_previous_hash=self.STARTING_HASH):
+            self.__append(block=block, persist=False)
+
+        ids_by_height = self.__store.load_transaction_ids()
+        for height in range(self.__indexed_height, min(len(ids_by_height), len(self.__chain))):
+            for position, transaction_id in enumerate(ids_by_height[height]):
+                self.__locations_by_transaction.setdefault(transaction_id, (height, position))
+            self.__indexed_height = height + 1
+
+    def __load_snapshot(self, path: str):
+        # Only headers are hashed: each one links to the hash computed for the previous one and the last must be the
+        # checkpoint the snapshot was taken at, which pins every header below it.
+        with open(path, 'rb') as snapshot_file:
+            entries = BinarySerializer.decode_blocks(snapshot_file.read())
+        metadata = BinarySerializer.loads(entries[0])
+        encoded_blocks = entries[1:]
+        if not (isinstance(metadata, dict) and metadata.get('height') == len(encoded_blocks) - 1 and
+                self.CHECKPOINTS.get(metadata['height']) == metadata.get('hash') and
+                len(metadata.get('merkle_roots', ())) == len(encoded_blocks)):
+            raise SerializationError('Snapshot does not match a configured checkpoint')
+
+        previous_hash = self.STARTING_HASH
+        for encoded_block, merkle_root in zip(encoded_blocks, metadata['merkle_roots']):
+            _, index, timestamp, nonce = Block.ENCODED_FORMAT.unpack_from(encoded_block, 0)
+            merkle_root = bytes.fromhex(merkle_root)
+            block = Block.from_header(index=index, previous_hash=previous_hash, timestamp=timestamp, nonce=nonce,
+                                      merkle_root=merkle_root,
+                                      body_loader=partial(self.__snapshot_transactions, encoded_block, merkle_root))
+            self.__append(block=block)
+            previous_hash = block.hash
+        if previous_hash != metadata['hash']:
+            raise SerializationError('Snapshot headers do not lead to the checkpoint')
+
+    def export_snapshot(self, path: str):
+        # Writes the chain up to the highest checkpoint it contains along with the merkle roots, so an import only
+        # hashes headers; returns the checkpoint height or None when no checkpoint has been reached.
+        height = None
+        with self.__lock:
+            reached = [checkpoint for checkpoint, block_hash in self.CHECKPOINTS.items()
+                       if checkpoint < len(self.__chain) and self.__chain[checkpoint].hash == block_hash]
+            if reached:
+                height = max(reached)
+                blocks = self.__chain[:height + 1]
+
+        if height is not None:
+            metadata = dict(height=height, hash=blocks[-1].hash,
+                            merkle_roots=[block.merkle_root.hex() for block in blocks])
+            with open(path, 'wb') as snapshot_file:
+                snapshot_file.write(BinarySerializer.encode_blocks(
+                    [BinarySerializer.dumps(metadata)] + [block.encode() for block in blocks]))
+
+        return height
+
+    def __append(self, block: Block, persist: bool = True):
+        target = self.next_target
+        self.__targets.append(target)
+        self.__works.append((self.__works[-1] if self.__works else 0) + Difficulty.work(target=target))
+        self.__chain.append(block)
+        self.__json_blocks.append(None)
+        self.__encoded_blocks.append(None)
+        self.__heights_by_hash[block.hash] = len(self.__chain) - 1
+        if self.__indexed_height == len(self.__chain) - 1 and block.body_loaded:
+            self.__index_transactions()
+        if persist and self.__store is not None:
+            self.__store.append(block=block)
+        self.__prune()
+
+    def __prune(self):
+        # Once a block is PRUNE_DEPTH deep its transactions leave memory: with a store they are evicted and come back
+        # through the body cache, in full mode they are dropped for good along with their segments. Their ids move
+        # from the transaction index to the pruned filter, and to the store's pruned records, before the body goes.
+        height = len(self.__chain) - 1 - self.PRUNE_DEPTH if self.PRUNE_DEPTH is not None else -1
+        if height >= 0 and self.__chain[height].body_available:
+            block = self.__chain[height]
+            if self.PRUNE_MODE == self.PRUNE_FULL:
+                if height >= self.__pruned_height:
+                    transaction_ids = [str(transaction.get('id')) for transaction in block.transactions]
+                    for transaction_id in transaction_ids:
+                        self.__pruned_filter.add(transaction_id)
+                        if self.__locations_by_transaction.get(transaction_id, (-1,))[0] == height:
+                            del self.__locations_by_transaction[transaction_id]
+                    if self.__store is not None:
+                        self.__store.record_pruned(height=height, transaction_ids=transaction_ids)
+                self.__indexed_height = max(self.__indexed_height, height + 1)
+                block.evict_body()
+                self.__pruned_height = max(self.__pruned_height, height + 1)
+                if self.__store is not None:
+                    self.__store.prune(height=height + 1)
+            elif self.__store is not None:
+                block.evict_body(body_loader=partial(self.__load_body, height), read_through=True)
+            self.__json_blocks[height] = None
+            self.__encoded_blocks[height] = None
+
+    def __load_body(self, height: int):
+        # Evicted blocks read their body through here on every access, so the cache holds the BODY_CACHE_SIZE most
+        # recently used bodies; the rest are read back from the store.
+        with self.__lock:
+            transactions = self.__body_cache.get(height)
+            if transactions is not None:
+                self.__body_cache.move_to_end(height)
+
+        if transactions is None:
+            transactions = tuple(FrozenTransaction.freeze(transaction)
+                                 for transaction in self.__store.read_transactions(height=height))
+            with self.__lock:
+                self.__body_cache[height] = transactions
+                self.__body_cache.move_to_end(height)
+                while len(self.__body_cache) > max(self.BODY_CACHE_SIZE, 1):
+                    self.__body_cache.popitem(last=False)
+
+        return transactions
+
+    def __index_transactions(self):
+        # Blocks loaded header-only without stored ids are indexed on the first lookup. Ids are keyed by their
+        # string form and the earliest occurrence wins.
+        while self.__indexed_height < len(self.__chain):
+            for position, transaction in enumerate(self.__chain[self.__indexed_height].transactions):
+                transaction_id = str(transaction.get('id'))
+                self.__locations_by_transaction.setdefault(transaction_id, (self.__indexed_height, position))
+            self.__indexed_height += 1
+
+    def __is_duplicate(self, transaction_id):
+        # Pending ids are checked in the mempool, confirmed ones in the transaction index and those of fully pruned
+        # blocks in the pruned filter. A false positive of the filter rejects a new id at PRUNED_FILTER_ERROR_RATE.
+        transaction_id = str(transaction_id)
+        duplicate = transaction_id in self.__mempool
+        if not duplicate:
+            self.__index_transactions()
+            duplicate = transaction_id in self.__locations_by_transaction or \
+                (self.__pruned_filter is not None and transaction_id in self.__pruned_filter)
+
+        return duplicate
+
+    def __replace_from(self, height: int, blocks: List[Block]):
+        # Keeps the blocks below height, skips replacement blocks that are already in place and swaps in the rest.
+        # Lists are rebuilt rather than cut in place so snapshots handed to readers stay consistent. Blocks whose
+        # transactions were pruned cannot be replaced.
+        skipped = 0
+        while skipped < len(blocks) and height < len(self.__chain) and \
+                self.__chain[height].hash == blocks[skipped].hash:
+            height += 1
+            skipped += 1
+        blocks = blocks[skipped:]
+
+        replaced = height >= self.__pruned_height
+        if replaced:
+            self.__swap_from(height=height, blocks=blocks)
+
+        return replaced
+
+    def __swap_from(self, height: int, blocks: List[Block]):
+        dropped_blocks = self.__chain[height:]
+        new_hashes = {block.hash for block in blocks}
+        dropped_transactions = [transaction for block in dropped_blocks if block.hash not in new_hashes
+                                for transaction in block.transactions]
+        if self.__store is not None:
+            self.__store.truncate(height=height)
+
+        for block in dropped_blocks:
+            del self.__heights_by_hash[block.hash]
+        for dropped_height in range(height, self.__indexed_height):
+            for transaction in self.__chain[dropped_height].transactions:
+                transaction_id = str(transaction.get('id'))
+                if self.__locations_by_transaction.get(transaction_id, (-1,))[0] >= height:
+                    del self.__locations_by_transaction[transaction_id]
+        self.__indexed_height = min(self.__indexed_height, height)
+
+        self.__chain = self.__chain[:height]
+        self.__targets = self.__targets[:height]
+        self.__works = self.__works[:height]
+        self.__json_blocks = self.__json_blocks[:height]
+        self.__encoded_blocks = self.__encoded_blocks[:height]
+        self.__body_cache = OrderedDict((cached, transactions) for cached, transactions in self.__body_cache.items()
+                                        if cached < height)
+        for block in blocks:
+            self.__append(block=block)
+
+        # Transactions from blocks that left the chain go back to the mempool unless the new blocks have them.
+        for transaction in dropped_transactions:
+            self.__mempool.add(transaction=transaction)
+        self.__remove_confirmed(blocks=blocks)
+
+    def __fork_height(self, previous_hash: str):
+        # Height of the local block a suffix builds on, -1 for a suffix starting at genesis, None when unknown.
+        return -1 if previous_hash == self.STARTING_HASH else self.__heights_by_hash.get(previous_hash)
+
+    def __recent_timestamps(self, height: int):
+        # Timestamps of the blocks right below height, as many as the retarget and median time rules look at.
+        window = max(self.RETARGET_INTERVAL + 1, self.MEDIAN_TIME_BLOCKS)
+        return [block.timestamp for block in self.__chain[max(height - window, 0):height]]
+
+    def __suffix_work(self, fork_height: int, blocks: List[Block]):
+        # Cumulative work of the local chain up to fork_height followed by blocks.
+        target = self.__targets[fork_height] if fork_height >= 0 else None
+        work = self.__works[fork_height] if fork_height >= 0 else 0
+        timestamps = self.__recent_timestamps(height=fork_height + 1)
+        for offset, block in enumerate(blocks):
+            target = self.expected_target(height=fork_height + 1 + offset, previous_target=target,
+                                          timestamps=timestamps)
+            work += Difficulty.work(target=target)
+            timestamps.append(block.timestamp)
+
+        return work
+
+    def __add_block(self, block: Block, proof: str):
         added = False
 
-        if self.last_block.hash == block.previous_hash:
-            if self.__is_valid_proof(block=block, block_hash=proof):
-                self.__chain.append(block)
-                added = True
+        with self.__lock:
+            if self.last_block.hash == block.previous_hash and \
+                    self.CHECKPOINTS.get(len(self.__chain), proof) == proof and \
+                    self.valid_timestamp(timestamp=block.timestamp,
+                                         timestamps=self.__recent_timestamps(height=len(self.__chain))):
+                if self.__is_valid_proof(block=block, block_hash=proof, target=self.next_target):
+                    self.__append(block=block)
+                    self.__remove_confirmed(blocks=[block])
+                    added = True
 
         return added
 
-    def add_new_transaction(self, transaction: Dict):
-        added = False
-        if isinstance(transaction, dict):
-            transaction['timestamp'] = datetime.utcnow().timestamp()
-            if self.__validate_new_transaction(transaction=transaction):
-                self.__unconfirmed_transactions.append(transaction)
-                added = True
+    def __remove_confirmed(self, blocks: List[Block]):
+        self.__mempool.remove_ids(transaction.get('id') for block in blocks for transaction in block.transactions)
+
+    def interrupt_mining(self):
+        with self.__lock:
+            for interrupt in self.__mining_interrupts:
+                interrupt.set()
+
+    def add_block(self, block: Block, proof: str):
+        added = self.__add_block(block=block, proof=proof)
+        if added:
+            self.interrupt_mining()
 
         return added
 
+    def add_new_transactions(self, transactions: List[Dict], relayed: bool = False):
+        # Transactions are validated before the lock is taken, then checked for duplicates and inserted under a single
+        # acquisition for the whole batch. Relayed transactions keep the timestamp of the node they were submitted
+        # to, as long as it is at most MAX_FUTURE_BLOCK_TIME ahead of the local clock; a later one would otherwise
+        # outlive the mempool TTL. Returns one TRANSACTION_* status per transaction, in order.
+        timestamp = datetime.utcnow().timestamp()
+        results = []
+        for transaction in transactions:
+            valid = isinstance(transaction, dict)
+            if valid and not relayed:
+                transaction['timestamp'] = timestamp
+            if valid:
+                valid = isinstance(transaction.get('timestamp'), (int, float)) and \
+                        transaction['timestamp'] <= timestamp + self.MAX_FUTURE_BLOCK_TIME and \
+                        self.__validate_new_transaction(transaction=transaction)
+            results.append(self.TRANSACTION_ADDED if valid else self.TRANSACTION_INVALID)
+
+        with self.__lock:
+            for position, transaction in enumerate(transactions):
+                if results[position] == self.TRANSACTION_ADDED:
+                    if self.__is_duplicate(transaction_id=transaction['id']):
+                        results[position] = self.TRANSACTION_DUPLICATE
+                    elif self.__mempool.add(transaction=transaction) is None:
+                        results[position] = self.TRANSACTION_REJECTED
+
+        return results
+
+    def add_new_transaction(self, transaction: Dict):
+        added = self.add_new_transactions(transactions=[transaction])[0] == self.TRANSACTION_ADDED
+        return added
+
+    def match_compact(self, block_hash: str, short_ids: List[str]):
+        # The transactions of a compact block that the mempool holds, None for the rest.
+        with self.__lock:
+            transactions = self.__mempool.transactions
+        return CompactBlock.match(block_hash=block_hash, short_ids=short_ids, transactions=transactions)
+
+    def has_transaction(self, transaction_id):
+        with self.__lock:
+            return self.__is_duplicate(transaction_id=transaction_id)
+
+    def close(self):
+        if self.__store is not None:
+            self.__store.close()
+
+    def encode_chain(self):
+        _, _, encoded_blocks = self.encoded_range()
+        return BinarySerializer.encode_blocks(list(encoded_blocks))
+
+    @staticmethod
+    def __serialized_range(chain: List[Block], cache: List, cache_from: int, serialize, start: int, stop: int):
+        # Serialized blocks are cached lazily next to the chain, so each block is serialized once however often it
+        # is read; pruned heights below cache_from are serialized on demand only. The caches are replaced together
+        # with the chain, which keeps a snapshot of both consistent.
+        heights = range(min(start, len(chain)), len(chain) if stop is None else min(stop, len(chain)))
+
+        def serialized_blocks():
+            for height in heights:
+                serialized = cache[height]
+                if serialized is None:
+                    serialized = serialize(chain[height])
+                    if height >= cache_from:
+                        cache[height] = serialized
+                yield serialized
+
+        return len(chain), len(heights), serialized_blocks()
+
+    def __cache_from(self):
+        return len(self.__chain) - self.PRUNE_DEPTH if self.PRUNE_DEPTH is not None else 0
+
+    def json_range(self, start: int = 0, stop: int = None):
+        with self.__lock:
+            chain, cache, cache_from = self.__chain, self.__json_blocks, self.__cache_from()
+        return self.__serialized_range(chain=chain, cache=cache, cache_from=cache_from, start=start, stop=stop,
+                                       serialize=lambda block: json.dumps(Block.to_json(block), sort_keys=True))
+
+    def encoded_range(self, start: int = 0, stop: int = None):
+        with self.__lock:
+            chain, cache, cache_from = self.__chain, self.__encoded_blocks, self.__cache_from()
+        return self.__serialized_range(chain=chain, cache=cache, cache_from=cache_from, start=start, stop=stop,
+                                       serialize=lambda block: block.encode())
+
+    def headers_range(self, start: int = 0, stop: int = None):
+        # Headers stay available for pruned blocks, so they can be served from any height.
+        with self.__lock:
+            chain = self.__chain
+        stop = min(len(chain) if stop is None else stop, start + self.HEADERS_PER_REQUEST)
+        return len(chain), [Block.header_to_json(block) for block in chain[start:stop]]
+
+    def locator(self):
+        # Hashes from the tip back to genesis, one per block for the most recent ones and then doubling the step,
+        # so a peer can place the fork point of any chain from O(log n) hashes.
+        hashes = []
+        with self.__lock:
+            height, step = len(self.__chain) - 1, 1
+            while height > 0:
+                hashes.append(self.__chain[height].hash)
+                if len(hashes) >= self.LOCATOR_DENSE_BLOCKS:
+                    step *= 2
+                height -= step
+            hashes.append(self.__chain[0].hash)
+
+        return hashes
+
+    def locate(self, locator: List[str]):
+        # Height of the first locator hash found in this chain, or -1 when the chains share no block.
+        height = -1
+        with self.__lock:
+            for block_hash in locator:
+                if block_hash in self.__heights_by_hash:
+                    height = self.__heights_by_hash[block_hash]
+                    break
+
+        return height
+
+    def check_suffix(self, suffix: List[Dict]):
+        # Validates blocks meant to follow the local block their first previous_hash names, using the local chain
+        # up to that block for targets and timestamps. Only the suffix is rehashed.
+        result = ValidationResult(failed_height=0, reason=ValidationResult.MALFORMED)
+        if isinstance(suffix, list) and suffix and isinstance(suffix[0], dict) and \
+                isinstance(suffix[0].get('previous_hash'), str):
+            with self.__lock:
+                fork_height = self.__fork_height(previous_hash=suffix[0].get('previous_hash'))
+                if fork_height is not None:
+                    previous_target = self.__targets[fork_height] if fork_height >= 0 else None
+                    previous_work = self.__works[fork_height] if fork_height >= 0 else 0
+                    timestamps = self.__recent_timestamps(height=fork_height + 1)
+
+            if fork_height is None:
+                result = ValidationResult(failed_height=0, reason=ValidationResult.BROKEN_LINK)
+            else:
+                validator = ChainValidator(expected_target=self.expected_target, workers=self.VALIDATION_WORKERS,
+                                           checkpoints=self.CHECKPOINTS, valid_timestamp=self.valid_timestamp)
+                result = validator.validate(chain=suffix, first_height=fork_height + 1,
+                                            previous_hash=suffix[0]['previous_hash'],
+                                            previous_target=previous_target, timestamps=timestamps,
+                                            previous_work=previous_work)
+
+        return result
+
+    def reorganize(self, suffix: List[Dict]):
+        # Applies a suffix accepted by check_suffix when it still builds on a local block and gives the chain more
+        # cumulative work. Blocks below the fork point are kept as they are.
+        reorganized = False
+        new_blocks = [Block(**{field: value for field, value in block_json.items() if field != 'hash'})
+                      for block_json in suffix]
+        with self.__lock:
+            fork_height = self.__fork_height(previous_hash=new_blocks[0].previous_hash) if new_blocks else None
+            if fork_height is not None and \
+                    self.__suffix_work(fork_height=fork_height, blocks=new_blocks) > self.__works[-1]:
+                reorganized = self.__replace_from(height=fork_height + 1, blocks=new_blocks)
+
+        if reorganized:
+            self.interrupt_mining()
+
+        return reorganized
+
+    def block_at(self, height: int):
+        result = None
+        with self.__lock:
+            if isinstance(height, int) and 0 <= height < len(self.__chain):
+                result = self.__chain[height]
+
+        return result
+
+    def block_by_hash(self, block_hash: str):
+        result = None
+        with self.__lock:
+            height = self.__heights_by_hash.get(block_hash)
+            if height is not None:
+                result = self.__chain[height]
+
+        return result
+
+    def find_transaction(self, transaction_id):
+        result = None
+        with self.__lock:
+            self.__index_transactions()
+            location = self.__locations_by_transaction.get(str(transaction_id))
+            if location is not None:
+                height, position = location
+                result = (self.__chain[height], position)
+
+        return result
+
     def mine(self):
+        # The search runs outside the lock; a new tip from add_block or the chain setter sets the interrupt and the
+        # search gives up. Mined transactions only leave the mempool once the block is appended.
         mined_block = None
-        if self.__unconfirmed_transactions:
-            last_block = self.last_block
-            new_block = Block(index=last_block.index + 1,
-                              transactions=self.__unconfirmed_transactions,
-                              previous_hash=last_block.hash)
-
-            proof = self.proof_of_work(block=new_block)
-            added = self.add_block(block=new_block, proof=proof)
-            if added:
-                self.__unconfirmed_transactions = []
+        new_block = None
+        interrupt = threading.Event()
+
+        with self.__lock:
+            if self.__mempool:
+                last_block = self.last_block
+                transactions = self.__mempool.select(max_transactions=self.MAX_BLOCK_TRANSACTIONS,
+                                                     max_bytes=self.MAX_BLOCK_BYTES)
+                new_block = Block(index=last_block.index + 1,
+                                  transactions=transactions,
+                                  previous_hash=last_block.hash)
+                target = self.next_target
+                self.__mining_interrupts.add(interrupt)
+
+        if new_block is not None:
+            try:
+                proof = self.proof_of_work(block=new_block, target=target, interrupt=interrupt)
+            finally:
+                with self.__lock:
+                    self.__mining_interrupts.discard(interrupt)
+
+            if proof is not None and self.__add_block(block=new_block, proof=proof):
                 mined_block = new_block
+                self.interrupt_mining()
 
         return mined_block
 
@@ -109,18 +618,61 @@ class BlockChain(object):
     def last_block(self) -> Block:
         last = None
         if len(self.__chain) > 0:
-            last = copy.deepcopy(self.__chain[-1])
+            last = self.__chain[-1]
         return last
 
+    @property
+    def length(self):
+        return len(self.__chain)
+
+    @property
+    def work(self):
+        return self.__works[-1] if self.__works else 0
+
+    @property
+    def pruned_height(self):
+        return self.__pruned_height
+
+    @property
+    def next_target(self):
+        previous_target = self.__targets[-1] if self.__targets else None
+        timestamps = self.__recent_timestamps(height=len(self.__chain))
+        return self.expected_target(height=len(self.__chain), previous_target=previous_target, timestamps=timestamps)
+
+    @property
+    def difficulty(self):
+        return Difficulty.bits_from_target(target=self.next_target)
+
+    @property
+    def mining(self):
+        return bool(self.__mining_interrupts)
+
     @property
     def chain(self):
         return [Block.to_json(block) for block in self.__chain]
 
     @chain.setter
     def chain(self, chain: List[Dict]):
-        new_chain = [Block(**block_json) for block_json in chain]
-        self.__chain = new_chain
+        new_chain = [Block(**{field: value for field, value in block_json.items() if field != 'hash'})
+                     for block_json in chain]
+        with self.__lock:
+            self.__replace_from(height=0, blocks=new_chain)
+
+        self.interrupt_mining()
+
+    @property
+    def mempool_stats(self):
+        with self.__lock:
+            self.__mempool.expire()
+            return self.__mempool.stats
+
+    @property
+    def pending_summary(self):
+        # The number of unconfirmed transactions and the timestamp of the oldest, without copying the mempool.
+        with self.__lock:
+            return len(self.__mempool), self.__mempool.oldest_timestamp()
 
     @property
     def unconfirmed_transactions(self):
-        return copy.deepcopy(self.__unconfirmed_transactions)
+        with self.__lock:
+            return self.__mempool.transactions
@@ -0,0 +1,37 @@
+import math
+from hashlib import blake2b
+
+
+class BloomFilter(object):
+    # Answers "definitely not seen" or "maybe seen" for string keys; keys cannot be removed.
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.__size = max(int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)), 8)
+        self.__hashes = max(int(round(self.__size / capacity * math.log(2))), 1)
+        self.__bits = bytearray((self.__size + 7) // 8)
+        self.__count = 0
+
+    def __positions(self, key: str):
+        # Double hashing: the k positions are derived from the two halves of a single digest.
+        digest = blake2b(key.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], 'big'), int.from_bytes(digest[8:], 'big') | 1
+        return [(first + position * second) % self.__size for position in range(self.__hashes)]
+
+    def add(self, key: str):
+        for position in self.__positions(key):
+            self.__bits[position >> 3] |= 1 << (position & 7)
+        self.__count += 1
+
+    def __contains__(self, key: str):
+        return all(self.__bits[position >> 3] & (1 << (position & 7)) for position in self.__positions(key))
+
+    def __len__(self):
+        return self.__count
+
+    @property
+    def size(self):
+        return self.__size
+
+    @property
+    def hashes(self):
+        return self.__hashes
@@ -0,0 +1,60 @@
+import string
+from hashlib import blake2b
+from typing import Dict, List
+
+from bychain.modules.blockchain.block import Block
+from bychain.modules.blockchain.serialization import BinarySerializer
+
+
+class CompactBlock(object):
+    # A block header with short transaction ids in place of its transactions. Short ids are keyed with the block
+    # hash, so they cannot be precomputed to collide with transactions of a future block.
+    SHORT_ID_BYTES = 6
+    HASH_HEX_LENGTH = 64
+    UINT64_LIMIT = 2 ** 64
+
+    @classmethod
+    def short_id(cls, block_hash: str, transaction: Dict):
+        return blake2b(BinarySerializer.canonical(transaction), digest_size=cls.SHORT_ID_BYTES,
+                       key=bytes.fromhex(block_hash)).hexdigest()
+
+    @classmethod
+    def to_json(cls, block: Block):
+        result = Block.header_to_json(block)
+        result['short_ids'] = [cls.short_id(block_hash=block.hash, transaction=transaction)
+                               for transaction in block.transactions]
+        return result
+
+    @classmethod
+    def is_well_formed(cls, compact: Dict):
+        # Checks the header fields and short id list that matching and rebuild read, so a malformed compact block is
+        # rejected up front rather than failing halfway through.
+        result = isinstance(compact, dict) and isinstance(compact.get('short_ids'), list) and \
+            cls.__is_hash(compact.get('hash')) and isinstance(compact.get('previous_hash'), str) and \
+            cls.__is_uint64(compact.get('index')) and cls.__is_uint64(compact.get('nonce')) and \
+            isinstance(compact.get('timestamp'), (int, float)) and not isinstance(compact.get('timestamp'), bool)
+        return result
+
+    @classmethod
+    def __is_hash(cls, value):
+        return isinstance(value, str) and len(value) == cls.HASH_HEX_LENGTH and \
+            all(character in string.hexdigits for character in value)
+
+    @classmethod
+    def __is_uint64(cls, value):
+        return isinstance(value, int) and not isinstance(value, bool) and 0 <= value < cls.UINT64_LIMIT
+
+    @classmethod
+    def match(cls, block_hash: str, short_ids: List[str], transactions: List[Dict]):
+        # Transactions in short_ids order, with None wherever no transaction, or more than one, has the short id.
+        by_short_id = {}
+        for transaction in transactions:
+            short_id = cls.short_id(block_hash=block_hash, transaction=transaction)
+            by_short_id[short_id] = None if short_id in by_short_id else transaction
+
+        return [by_short_id.get(short_id) for short_id in short_ids]
+
+    @staticmethod
+    def rebuild(compact: Dict, transactions: List[Dict]):
+        return Block(index=compact['index'], transactions=transactions, previous_hash=compact['previous_hash'],
+                     timestamp=compact['timestamp'], nonce=compact['nonce'])
@@ -0,0 +1,40 @@
+import math
+from typing import List
+
+HASH_BITS = 256
+TIME_UNITS_PER_SECOND = 10 ** 6
+
+
+class Difficulty(object):
+    MAX_TARGET = 2 ** (HASH_BITS - 1)
+    MAX_ADJUSTMENT = 4
+
+    @staticmethod
+    def target_from_bits(bits: float):
+        return int(2 ** (HASH_BITS - bits))
+
+    @staticmethod
+    def bits_from_target(target: int):
+        return HASH_BITS - math.log2(target)
+
+    @staticmethod
+    def meets_target(block_hash: str, target: int):
+        return int(block_hash, 16) < target
+
+    @staticmethod
+    def work(target: int):
+        # Expected number of hashes needed to meet target; chains are compared by the sum over their blocks.
+        return 2 ** HASH_BITS // target
+
+    @classmethod
+    def retarget(cls, target: int, timestamps: List[float], block_interval: float):
+        # timestamps are those of the blocks in the finished window; the observed span is clamped so a single window
+        # can move the target by at most MAX_ADJUSTMENT in either direction. Spans are counted in whole microseconds
+        # so the new target is computed exactly rather than through a float.
+        expected_timespan = max(round((len(timestamps) - 1) * block_interval * TIME_UNITS_PER_SECOND), 1)
+        actual_timespan = round((timestamps[-1] - timestamps[0]) * TIME_UNITS_PER_SECOND)
+        actual_timespan = min(max(actual_timespan, expected_timespan // cls.MAX_ADJUSTMENT),
+                              expected_timespan * cls.MAX_ADJUSTMENT)
+
+        new_target = target * actual_timespan // expected_timespan
+        return min(max(new_target, 1), cls.MAX_TARGET)
@@ -0,0 +1,33 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class SeenCache(object):
+    # Keys seen most recently, bounded to capacity; the oldest are forgotten first.
+    CAPACITY = 100000
+
+    def __init__(self, capacity: int = None):
+        self.__capacity = max(capacity or self.CAPACITY, 1)
+        self.__entries = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def add(self, key, max_age: float = None):
+        # Returns True when key had not been seen, or was last marked more than max_age seconds ago, so an item
+        # requested from a peer that never delivered it can be requested again. The key is marked either way.
+        now = time.monotonic()
+        with self.__lock:
+            seen_at = self.__entries.pop(key, None)
+            added = seen_at is None or (max_age is not None and now - seen_at > max_age)
+            self.__entries[key] = now if added else seen_at
+            while len(self.__entries) > self.__capacity:
+                self.__entries.popitem(last=False)
+
+        return added
+
+    def __contains__(self, key):
+        with self.__lock:
+            return key in self.__entries
+
+    def __len__(self):
+        return len(self.__entries)
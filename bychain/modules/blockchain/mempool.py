@@ -0,0 +1,185 @@
+import heapq
+import itertools
+from datetime import datetime
+from typing import Dict, Iterable, List
+
+from bychain.modules.blockchain.serialization import BinarySerializer
+from bychain.modules.blockchain.transaction import FrozenTransaction
+
+
+class MempoolEntry(object):
+    __slots__ = ('transaction', 'sequence', 'priority', 'size', 'timestamp')
+
+    def __init__(self, transaction: FrozenTransaction, sequence: int, priority: float, size: int, timestamp: float):
+        self.transaction = transaction
+        self.sequence = sequence
+        self.priority = priority
+        self.size = size
+        self.timestamp = timestamp
+
+
+class Mempool(object):
+    PRIORITY_FIELD = 'fee'
+
+    @classmethod
+    def priority_of(cls, transaction: Dict):
+        priority = transaction.get(cls.PRIORITY_FIELD, 0)
+        return priority if isinstance(priority, (int, float)) and not isinstance(priority, bool) else 0
+
+    def __init__(self, max_transactions: int = None, max_bytes: int = None, ttl: float = None):
+        self.__max_transactions = max_transactions
+        self.__max_bytes = max_bytes
+        self.__ttl = ttl
+        self.__entries: Dict[int, MempoolEntry] = {}
+        self.__sequences_by_id: Dict[str, List[int]] = {}
+        self.__heap = []
+        self.__eviction_heap = []
+        self.__expiry_heap = []
+        self.__sequence = itertools.count()
+        self.__size = 0
+        self.__expired = 0
+        self.__evicted = 0
+        self.__rejected = 0
+
+    def __compact(self):
+        # Removed entries are left in the heaps and skipped lazily; rebuild them once they dominate.
+        if len(self.__heap) > 2 * len(self.__entries) + 64:
+            entries = self.__entries.values()
+            self.__heap = [(-entry.priority, entry.sequence) for entry in entries]
+            self.__eviction_heap = [(entry.priority, entry.sequence) for entry in entries]
+            self.__expiry_heap = [(entry.timestamp, entry.sequence) for entry in entries]
+            for heap in (self.__heap, self.__eviction_heap, self.__expiry_heap):
+                heapq.heapify(heap)
+
+    def __remove(self, sequence: int):
+        entry = self.__entries.pop(sequence)
+        transaction_id = str(entry.transaction.get('id'))
+        sequences = self.__sequences_by_id[transaction_id]
+        sequences.remove(sequence)
+        if not sequences:
+            del self.__sequences_by_id[transaction_id]
+        self.__size -= entry.size
+        return entry
+
+    def __is_full(self, extra_transactions: int = 0, extra_bytes: int = 0):
+        return (self.__max_transactions is not None and len(self.__entries) + extra_transactions >
+                self.__max_transactions) or \
+               (self.__max_bytes is not None and self.__size + extra_bytes > self.__max_bytes)
+
+    def __make_room(self, entry: MempoolEntry):
+        # Evicts the lowest priority entries, oldest first, as long as they rank below the incoming one; the
+        # incoming entry is rejected when it would itself be the one to go.
+        while self.__eviction_heap and self.__is_full(extra_transactions=1, extra_bytes=entry.size):
+            priority, sequence = self.__eviction_heap[0]
+            if sequence not in self.__entries:
+                heapq.heappop(self.__eviction_heap)
+            elif (priority, sequence) < (entry.priority, entry.sequence):
+                heapq.heappop(self.__eviction_heap)
+                self.__remove(sequence=sequence)
+                self.__evicted += 1
+            else:
+                break
+
+        return not self.__is_full(extra_transactions=1, extra_bytes=entry.size)
+
+    def expire(self, now: float = None):
+        expired = 0
+        if self.__ttl is not None:
+            deadline = (now if now is not None else datetime.utcnow().timestamp()) - self.__ttl
+            while self.__expiry_heap and self.__expiry_heap[0][0] < deadline:
+                _, sequence = heapq.heappop(self.__expiry_heap)
+                if sequence in self.__entries:
+                    self.__remove(sequence=sequence)
+                    expired += 1
+            self.__expired += expired
+            self.__compact()
+
+        return expired
+
+    def add(self, transaction: Dict, now: float = None):
+        self.expire(now=now)
+        frozen_transaction = FrozenTransaction.freeze(transaction)
+        timestamp = frozen_transaction.get('timestamp')
+        entry = MempoolEntry(transaction=frozen_transaction, sequence=next(self.__sequence),
+                             priority=self.priority_of(frozen_transaction),
+                             size=len(BinarySerializer.canonical(frozen_transaction)),
+                             timestamp=timestamp if isinstance(timestamp, (int, float)) else 0)
+
+        added = None
+        if self.__make_room(entry=entry):
+            self.__entries[entry.sequence] = entry
+            self.__sequences_by_id.setdefault(str(frozen_transaction.get('id')), []).append(entry.sequence)
+            self.__size += entry.size
+            heapq.heappush(self.__heap, (-entry.priority, entry.sequence))
+            heapq.heappush(self.__eviction_heap, (entry.priority, entry.sequence))
+            heapq.heappush(self.__expiry_heap, (entry.timestamp, entry.sequence))
+            added = frozen_transaction
+        else:
+            self.__rejected += 1
+
+        return added
+
+    def remove_ids(self, transaction_ids: Iterable):
+        removed = 0
+        for transaction_id in transaction_ids:
+            for sequence in list(self.__sequences_by_id.get(str(transaction_id), ())):
+                self.__remove(sequence=sequence)
+                removed += 1
+        self.__compact()
+
+        return removed
+
+    def select(self, max_transactions: int, max_bytes: int, now: float = None):
+        # Pops the best entries (highest priority, then earliest arrival) until a limit is hit and pushes them back,
+        # so the selection costs O(k log n) and leaves the pool untouched.
+        self.expire(now=now)
+        selected: List[MempoolEntry] = []
+        popped = []
+        selected_bytes = 0
+
+        while self.__heap and len(selected) < max_transactions:
+            heap_item = heapq.heappop(self.__heap)
+            entry = self.__entries.get(heap_item[1])
+            if entry is None:
+                continue
+            popped.append(heap_item)
+            if selected_bytes + entry.size > max_bytes:
+                break
+            selected.append(entry)
+            selected_bytes += entry.size
+
+        for heap_item in popped:
+            heapq.heappush(self.__heap, heap_item)
+
+        return [entry.transaction for entry in selected]
+
+    @property
+    def transactions(self):
+        return [entry.transaction for entry in self.__entries.values()]
+
+    @property
+    def size(self):
+        return self.__size
+
+    @property
+    def stats(self):
+        return dict(transactions=len(self.__entries), bytes=self.__size, max_transactions=self.__max_transactions,
+                    max_bytes=self.__max_bytes, ttl=self.__ttl, expired=self.__expired, evicted=self.__evicted,
+                    rejected=self.__rejected)
+
+    def oldest_timestamp(self):
+        # Timestamp of the oldest entry, None when empty; removed entries at the top of the expiry heap are dropped
+        # on the way, so repeated calls stay cheap.
+        while self.__expiry_heap and self.__expiry_heap[0][1] not in self.__entries:
+            heapq.heappop(self.__expiry_heap)
+        return self.__expiry_heap[0][0] if self.__expiry_heap else None
+
+    def __contains__(self, transaction_id):
+        # Ids are compared by their string form, as in the chain's transaction index.
+        return str(transaction_id) in self.__sequences_by_id
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def __bool__(self):
+        return bool(self.__entries)
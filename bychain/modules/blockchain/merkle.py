@@ -0,0 +1,67 @@
+from hashlib import sha256
+from typing import Dict, List
+
+from bychain.modules.blockchain.serialization import BinarySerializer
+
+LEAF_PREFIX = b'\x00'
+NODE_PREFIX = b'\x01'
+
+
+class MerkleTree(object):
+    LEFT = 'left'
+    RIGHT = 'right'
+
+    @staticmethod
+    def hash_leaf(transaction: Dict):
+        return sha256(LEAF_PREFIX + BinarySerializer.canonical(transaction)).digest()
+
+    @staticmethod
+    def hash_node(left: bytes, right: bytes):
+        return sha256(NODE_PREFIX + left + right).digest()
+
+    @classmethod
+    def verify(cls, transaction: Dict, proof: List[Dict], root: str):
+        computed = cls.hash_leaf(transaction=transaction)
+        for step in proof:
+            sibling = bytes.fromhex(step['hash'])
+            if step['position'] == cls.LEFT:
+                computed = cls.hash_node(left=sibling, right=computed)
+            else:
+                computed = cls.hash_node(left=computed, right=sibling)
+
+        return computed.hex() == root
+
+    def __init__(self, transactions: List[Dict]):
+        self.__levels = [[self.hash_leaf(transaction=transaction) for transaction in transactions]]
+        while len(self.__levels[-1]) > 1:
+            self.__levels.append(self.__next_level(self.__levels[-1]))
+
+    def __next_level(self, level: List[bytes]):
+        # An odd node is promoted unchanged instead of being paired with a copy of itself, so two different
+        # transaction lists can never share a root.
+        next_level = [self.hash_node(left=level[position], right=level[position + 1])
+                      for position in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            next_level.append(level[-1])
+
+        return next_level
+
+    def proof(self, position: int):
+        result = None
+        if 0 <= position < len(self):
+            result = []
+            for level in self.__levels[:-1]:
+                sibling_position = position ^ 1
+                if sibling_position < len(level):
+                    side = self.LEFT if sibling_position < position else self.RIGHT
+                    result.append(dict(hash=level[sibling_position].hex(), position=side))
+                position //= 2
+
+        return result
+
+    @property
+    def root(self):
+        return self.__levels[-1][0] if self.__levels[-1] else sha256(b'').digest()
+
+    def __len__(self):
+        return len(self.__levels[0])
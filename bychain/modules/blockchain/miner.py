@@ -0,0 +1,116 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait
+from hashlib import sha256
+
+from bychain.modules.blockchain.block import Block
+
+NO_NONCE = 2 ** 63 - 1
+ABORTED = -1
+
+_found_nonce = None
+
+
+def _init_worker(found_nonce):
+    global _found_nonce
+    _found_nonce = found_nonce
+
+
+def _search_nonce(header_prefix: bytes, start: int, step: int, target: int, check_interval: int):
+    # Every worker walks its own stride and stops once a lower nonce has been published, so the lowest valid
+    # nonce wins exactly as in the serial search.
+    found_nonce = _found_nonce
+    midstate = sha256(header_prefix)
+    pack_nonce = Block.NONCE_FORMAT.pack
+    nonce = start
+    attempts = 0
+
+    while True:
+        if attempts % check_interval == 0 and nonce >= found_nonce.value:
+            break
+
+        attempt = midstate.copy()
+        attempt.update(pack_nonce(nonce))
+        if int.from_bytes(attempt.digest(), 'big') < target:
+            with found_nonce.get_lock():
+                if nonce < found_nonce.value:
+                    found_nonce.value = nonce
+            break
+
+        nonce += step
+        attempts += 1
+
+
+class ProofOfWorkMiner(object):
+    # Worker processes start from a fork server, or are spawned, rather than forked from a threaded server process.
+    CHECK_INTERVAL = 256
+    POLL_SECONDS = 0.05
+    START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+    def __init__(self, workers: int = None):
+        self.__workers = workers or 1
+
+    def __search_serial(self, block: Block, target: int, interrupt: threading.Event):
+        # The header prefix is hashed once and each attempt only feeds the nonce into a copy of that state.
+        midstate = sha256(block.header_prefix)
+        pack_nonce = Block.NONCE_FORMAT.pack
+        nonce = block.nonce
+        attempts = 0
+
+        interrupted = False
+
+        attempt = midstate.copy()
+        attempt.update(pack_nonce(nonce))
+        while not interrupted and int.from_bytes(attempt.digest(), 'big') >= target:
+            attempts += 1
+            if interrupt is not None and attempts % self.CHECK_INTERVAL == 0 and interrupt.is_set():
+                interrupted = True
+            else:
+                nonce += 1
+                attempt = midstate.copy()
+                attempt.update(pack_nonce(nonce))
+
+        computed_hash = None
+        if not interrupted:
+            block._set_nonce(nonce)
+            computed_hash = block.hash
+
+        return computed_hash
+
+    def __search_parallel(self, block: Block, target: int, interrupt: threading.Event):
+        context = multiprocessing.get_context(self.START_METHOD)
+        found_nonce = context.Value('q', NO_NONCE)
+
+        with ProcessPoolExecutor(max_workers=self.__workers, mp_context=context, initializer=_init_worker,
+                                 initargs=(found_nonce,)) as pool:
+            futures = [pool.submit(_search_nonce, block.header_prefix, block.nonce + offset, self.__workers, target,
+                                   self.CHECK_INTERVAL)
+                       for offset in range(self.__workers)]
+            _, pending = wait(futures, timeout=self.POLL_SECONDS)
+            while pending:
+                if interrupt is not None and interrupt.is_set():
+                    # Workers stop once the published nonce is below anything they could try.
+                    with found_nonce.get_lock():
+                        found_nonce.value = ABORTED
+                _, pending = wait(pending, timeout=self.POLL_SECONDS)
+            for future in futures:
+                future.result()
+
+        computed_hash = None
+        if found_nonce.value != ABORTED:
+            block._set_nonce(found_nonce.value)
+            computed_hash = block.hash
+
+        return computed_hash
+
+    def mine(self, block: Block, target: int, interrupt: threading.Event = None):
+        if self.__workers > 1:
+            computed_hash = self.__search_parallel(block=block, target=target, interrupt=interrupt)
+        else:
+            computed_hash = self.__search_serial(block=block, target=target, interrupt=interrupt)
+
+        return computed_hash
+
+    @property
+    def workers(self):
+        return self.__workers
@@ -1,36 +1,391 @@
 import json
+import os
+import struct
+import threading
+import time
 import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import partial
 from typing import Set, Dict, List
 
 import requests
 
+from bychain.modules.blockchain.announcer import BlockAnnouncer
 from bychain.modules.blockchain.block import Block
 from bychain.modules.blockchain.blockchain import BlockChain
+from bychain.modules.blockchain.compact import CompactBlock
+from bychain.modules.blockchain.gossip import SeenCache
+from bychain.modules.blockchain.scheduler import MiningScheduler
+from bychain.modules.blockchain.store import BlockStore
+from bychain.modules.blockchain.serialization import CONTENT_TYPE_BINARY, CONTENT_TYPE_JSON, SerializationError
+from bychain.modules.blockchain.validation import ChainValidator
 
 
 class BlockChainNode(object):
+    WIRE_CONTENT_TYPE = CONTENT_TYPE_JSON
+    DATA_DIR = os.environ.get('BYCHAIN_DATA_DIR')
+    SNAPSHOT = os.environ.get('BYCHAIN_SNAPSHOT')
+    ANNOUNCE_WORKERS = BlockAnnouncer.WORKERS
+    ANNOUNCE_TIMEOUT = BlockAnnouncer.TIMEOUT
+    CONSENSUS_WORKERS = 8
+    CONSENSUS_TIMEOUT = 30.0
+    SYNC_BODIES_BATCH = 100
+    GOSSIP_SEEN_CAPACITY = SeenCache.CAPACITY
+    GOSSIP_REQUEST_TIMEOUT = 30.0
+    COMPACT_BLOCKS = True
+    COMPACT_PENDING_BLOCKS = 16
+    COMPACT_UNSUPPORTED_STATUSES = (404, 405)
     __blockchain: BlockChain = None
     __peers: Set[str] = None
+    __scheduler: MiningScheduler = None
+    __announcer: BlockAnnouncer = None
+    __seen: SeenCache = None
+    __pending_compact_blocks: OrderedDict = None
+    __compact_lock = threading.Lock()
+
+    @classmethod
+    def __shutdown(cls):
+        if cls.__scheduler is not None:
+            cls.__scheduler.stop()
+        if cls.__announcer is not None:
+            cls.__announcer.close()
+        if cls.__blockchain is not None:
+            cls.__blockchain.close()
 
     @classmethod
     def clear(cls):
+        cls.__shutdown()
         cls.__blockchain = None
         cls.__peers = None
+        cls.__scheduler = None
+        cls.__announcer = None
+        cls.__seen = None
+        cls.__pending_compact_blocks = None
 
     @classmethod
     def initialize(cls):
-        cls.__blockchain = BlockChain()
+        cls.__shutdown()
+        cls.__blockchain = BlockChain(store=BlockStore(path=cls.DATA_DIR) if cls.DATA_DIR else None,
+                                      snapshot=cls.SNAPSHOT)
         cls.__peers = set()
+        cls.__scheduler = MiningScheduler(mine=cls.mine, pending_summary=cls.__pending_summary)
+        cls.__announcer = BlockAnnouncer(workers=cls.ANNOUNCE_WORKERS, timeout=cls.ANNOUNCE_TIMEOUT)
+        cls.__seen = SeenCache(capacity=cls.GOSSIP_SEEN_CAPACITY)
+        cls.__pending_compact_blocks = OrderedDict()
+
+    @classmethod
+    def __pending_summary(cls):
+        return cls.__blockchain.pending_summary
+
+    @classmethod
+    def __gossip(cls, blocks: List[Block] = (), transactions: List[Dict] = ()):
+        # Peers are only sent the hashes and ids; each one replies with those it lacks, which are then delivered to
+        # it alone. Everything gossiped is marked as seen so it is not requested or relayed again.
+        for block in blocks:
+            cls.__seen.add(('block', block.hash))
+        for transaction in transactions:
+            cls.__seen.add(('transaction', str(transaction['id'])))
+
+        inventory = {
+            "blocks": [block.hash for block in blocks],
+            "transactions": [transaction['id'] for transaction in transactions]
+        }
+        return cls.__announcer.announce(peers=list(cls.__peers), path='/inventory', data=json.dumps(inventory),
+                                        headers={'Content-Type': CONTENT_TYPE_JSON},
+                                        on_response=partial(cls.__deliver, blocks, transactions))
+
+    @classmethod
+    def __deliver(cls, blocks: List[Block], transactions: List[Dict], peer: str, response: requests.Response):
+        try:
+            wanted = response.json()
+        except ValueError:
+            wanted = None
+        if isinstance(wanted, dict):
+            wanted_hashes = set(wanted.get('blocks') or ())
+            wanted_ids = {str(transaction_id) for transaction_id in wanted.get('transactions') or ()}
+
+            for block in blocks:
+                if block.hash in wanted_hashes:
+                    cls.__deliver_block(peer=peer, block=block)
+            relayed = [transaction for transaction in transactions if str(transaction['id']) in wanted_ids]
+            if relayed:
+                cls.__announcer.send(peer=peer, path='/transactions/relay', data=json.dumps(relayed),
+                                     headers={'Content-Type': CONTENT_TYPE_JSON})
+
+    @staticmethod
+    def __missing_positions(response: requests.Response):
+        missing = None
+        if response is not None and response.status_code == 200:
+            try:
+                body = response.json()
+            except ValueError:
+                body = None
+            if isinstance(body, dict) and isinstance(body.get('missing'), list):
+                missing = body['missing']
+
+        return missing
+
+    @classmethod
+    def __deliver_block(cls, peer: str, block: Block):
+        # The compact block goes first; the peer answers with the positions of the transactions it could not find
+        # in its mempool, which are sent in one more request. A peer without the compact endpoints gets the full
+        # block; one that answered and rejected the block is not sent it again.
+        response = None
+        if cls.COMPACT_BLOCKS:
+            response = cls.__announcer.send(peer=peer, path='/compact_block',
+                                            data=json.dumps(CompactBlock.to_json(block=block)),
+                                            headers={'Content-Type': CONTENT_TYPE_JSON})
+            missing = cls.__missing_positions(response=response)
+            if missing is not None:
+                transactions = block.transactions
+                positions = [position for position in missing
+                             if isinstance(position, int) and 0 <= position < len(transactions)]
+                missing_transactions = {
+                    "hash": block.hash,
+                    "positions": positions,
+                    "transactions": [transactions[position] for position in positions]
+                }
+                response = cls.__announcer.send(peer=peer, path='/compact_block/transactions',
+                                                data=json.dumps(missing_transactions),
+                                                headers={'Content-Type': CONTENT_TYPE_JSON})
+
+        if not cls.COMPACT_BLOCKS or \
+                (response is not None and response.status_code in cls.COMPACT_UNSUPPORTED_STATUSES):
+            if cls.WIRE_CONTENT_TYPE == CONTENT_TYPE_BINARY:
+                data = block.encode()
+            else:
+                data = json.dumps(Block.to_json(block=block), sort_keys=True)
+            cls.__announcer.send(peer=peer, path='/add_block', data=data,
+                                 headers={'Content-Type': cls.WIRE_CONTENT_TYPE})
+
+    @classmethod
+    def __complete_compact_block(cls, compact: Dict, transactions: List[Dict], retry: bool):
+        # Returns the positions to request from the sender, [] once the block has been added, or None when it was
+        # rejected. When a block rebuilt partly from the mempool does not hash to its header, a short id matched
+        # the wrong transaction and, if retry is set, every transaction is requested instead.
+        missing = [position for position, transaction in enumerate(transactions) if transaction is None]
+        if not missing:
+            try:
+                block = CompactBlock.rebuild(compact=compact, transactions=transactions)
+                matches = block.hash == compact['hash']
+            except (TypeError, ValueError, AttributeError, SerializationError, struct.error):
+                block, matches = None, False
+
+            if matches:
+                missing = [] if cls.add_block(block=block, proof=compact['hash']) else None
+            elif retry:
+                transactions = [None] * len(transactions)
+                missing = list(range(len(transactions)))
+            else:
+                missing = None
+
+        if missing:
+            with cls.__compact_lock:
+                cls.__pending_compact_blocks[compact['hash']] = (compact, transactions)
+                while len(cls.__pending_compact_blocks) > cls.COMPACT_PENDING_BLOCKS:
+                    cls.__pending_compact_blocks.popitem(last=False)
+
+        return missing
+
+    @classmethod
+    def receive_compact_block(cls, compact: Dict):
+        result = None
+        if CompactBlock.is_well_formed(compact=compact):
+            try:
+                transactions = cls.__blockchain.match_compact(block_hash=compact['hash'],
+                                                              short_ids=compact['short_ids'])
+            except (TypeError, ValueError, AttributeError):
+                transactions = None
+            if transactions is not None:
+                result = cls.__complete_compact_block(compact=compact, transactions=transactions, retry=True)
+
+        return result
+
+    @classmethod
+    def receive_compact_transactions(cls, block_hash: str, positions: List[int], transactions: List[Dict]):
+        # Fills in the transactions requested for a pending compact block; same results as receive_compact_block.
+        result = None
+        with cls.__compact_lock:
+            pending = cls.__pending_compact_blocks.pop(block_hash, None)
+
+        if pending is not None and isinstance(positions, list) and isinstance(transactions, list):
+            compact, known_transactions = pending
+            known_transactions = list(known_transactions)
+            filled = set()
+            for position, transaction in zip(positions, transactions):
+                if isinstance(position, int) and 0 <= position < len(known_transactions) and \
+                        isinstance(transaction, dict):
+                    known_transactions[position] = transaction
+                    filled.add(position)
+            result = cls.__complete_compact_block(compact=compact, transactions=known_transactions,
+                                                  retry=len(filled) < len(known_transactions))
+
+        return result
 
     @classmethod
     def __announce_new_block(cls, block: Block):
-        for peer in cls.__peers:
-            url = "http://{}/add_block".format(peer)
-            requests.post(url=url, data=json.dumps(Block.to_json(block=block), sort_keys=True))
+        # Announcements run in the background so mining returns without waiting on peers.
+        return cls.__gossip(blocks=[block])
+
+    @classmethod
+    def inventory(cls, blocks: List[str], transactions: List):
+        # The hashes and ids of an announcement that are neither known here nor requested from another peer within
+        # GOSSIP_REQUEST_TIMEOUT; they are marked as requested.
+        wanted = {
+            "blocks": [block_hash for block_hash in blocks
+                       if isinstance(block_hash, str) and cls.__blockchain.block_by_hash(block_hash=block_hash) is None
+                       and cls.__seen.add(('block', block_hash), max_age=cls.GOSSIP_REQUEST_TIMEOUT)],
+            "transactions": [transaction_id for transaction_id in transactions
+                             if isinstance(transaction_id, (str, int)) and not isinstance(transaction_id, bool) and
+                             not cls.__blockchain.has_transaction(transaction_id=transaction_id) and
+                             cls.__seen.add(('transaction', str(transaction_id)),
+                                            max_age=cls.GOSSIP_REQUEST_TIMEOUT)]
+        }
+        return wanted
+
+    @classmethod
+    def wait_for_announcements(cls, timeout: float = None):
+        return cls.__announcer.flush(timeout=timeout)
+
+    @classmethod
+    def announcement_stats(cls):
+        return cls.__announcer.stats
+
+    @staticmethod
+    def __remaining(deadline: float):
+        return max(deadline - time.monotonic(), 0.001)
+
+    @staticmethod
+    def __is_count(value):
+        return isinstance(value, int) and not isinstance(value, bool) and value >= 0
+
+    @classmethod
+    def __locate(cls, peer: str, locator: List[str], deadline: float):
+        # None when the peer cannot locate; a reply that does not describe a chain raises ValueError.
+        located = None
+        response = requests.post('http://{}/locate'.format(peer), data=json.dumps(locator),
+                                 headers={'Content-Type': CONTENT_TYPE_JSON}, timeout=cls.__remaining(deadline))
+        if response.status_code == 200:
+            body = response.json()
+            if not (isinstance(body, dict) and cls.__is_count(body.get('length')) and
+                    isinstance(body.get('fork_height'), int) and cls.__is_count(body.get('work')) and
+                    -1 <= body['fork_height'] < body['length']):
+                raise ValueError('Malformed locate reply')
+            located = body['length'], body['fork_height'], body['work']
+
+        return located
+
+    @classmethod
+    def __request_chain(cls, peer: str, deadline: float, start: int = 0, stop: int = None):
+        length, chain = 0, []
+        params = {}
+        if start:
+            params['from'] = start
+        if stop is not None:
+            params['to'] = stop - 1
+        params = params or None
+        if cls.WIRE_CONTENT_TYPE == CONTENT_TYPE_BINARY:
+            accept = '{}, {};q=0.5'.format(CONTENT_TYPE_BINARY, CONTENT_TYPE_JSON)
+            response = requests.get('http://{}/chain'.format(peer), headers={'Accept': accept}, params=params,
+                                    timeout=cls.__remaining(deadline))
+        else:
+            response = requests.get('http://{}/chain'.format(peer), params=params, timeout=cls.__remaining(deadline))
+
+        if response.status_code == 200:
+            if response.headers.get('Content-Type', '').split(';')[0].strip() == CONTENT_TYPE_BINARY:
+                try:
+                    chain = BlockChain.decode_chain(data=response.content)
+                    length = len(chain)
+                except SerializationError:
+                    pass
+            else:
+                body = response.json()
+                if isinstance(body, dict) and isinstance(body.get('chain'), list):
+                    length = body.get('length', 0)
+                    chain = body['chain']
+
+        return length, chain
+
+    @classmethod
+    def __request_headers(cls, peer: str, start: int, stop: int, deadline: float):
+        # Pages through /headers until stop or until the peer has no more to send, or sends something that is not a
+        # page of headers.
+        headers = []
+        while start + len(headers) < stop:
+            response = requests.get('http://{}/headers'.format(peer),
+                                    params={'from': start + len(headers), 'to': stop - 1},
+                                    timeout=cls.__remaining(deadline))
+            body = response.json() if response.status_code == 200 else None
+            page = body.get('headers') if isinstance(body, dict) else None
+            if not (isinstance(page, list) and page):
+                break
+            headers.extend(page)
+
+        return headers[:stop - start]
+
+    @classmethod
+    def __request_bodies(cls, peers: List[str], start: int, headers: List[Dict], deadline: float):
+        # Blocks for one batch of validated headers, from the first of peers that sends exactly what they commit to.
+        blocks = None
+        for peer in peers:
+            try:
+                _, chain = cls.__request_chain(peer=peer, deadline=deadline, start=start, stop=start + len(headers))
+            except (requests.RequestException, ValueError):
+                continue
+            if ChainValidator.matches_headers(chain=chain, headers=headers):
+                blocks = chain
+                break
+
+        return blocks
+
+    @classmethod
+    def __query_peer(cls, peer: str, locator: List[str], deadline: float, fallback: bool = True):
+        # Returns the advertised length, the fork height, the advertised cumulative work and, for peers that cannot
+        # locate, their whole chain since its work is only known once it has been downloaded and checked. None when
+        # the peer cannot be reached, answers with something malformed, or cannot locate and fallback is off.
+        result = None
+        try:
+            located = cls.__locate(peer=peer, locator=locator, deadline=deadline)
+            if located is None and fallback:
+                _, suffix = cls.__request_chain(peer=peer, deadline=deadline)
+                result = len(suffix), -1, None, suffix
+            elif located is not None:
+                result = located[0], located[1], located[2], None
+        except (requests.RequestException, ValueError):
+            pass
+
+        return result
+
+    @classmethod
+    def __query_peers(cls, peers: List[str], locator: List[str], deadline: float, fallback: bool = True):
+        # Peers are queried concurrently; those that have not answered by the deadline are left out.
+        candidates = []
+        if peers:
+            pool = ThreadPoolExecutor(max_workers=min(cls.CONSENSUS_WORKERS, len(peers)),
+                                      thread_name_prefix='consensus')
+            futures = {pool.submit(cls.__query_peer, peer, locator, deadline, fallback): peer for peer in peers}
+            done, _ = wait(futures, timeout=cls.__remaining(deadline))
+            pool.shutdown(wait=False, cancel_futures=True)
+            candidates = [(futures[future], future.result()) for future in done if future.result() is not None]
+
+        return candidates
 
     @classmethod
     def add_new_transaction(cls, transaction: Dict):
-        return cls.__blockchain.add_new_transaction(transaction=transaction)
+        added = cls.__blockchain.add_new_transaction(transaction=transaction)
+        if added:
+            cls.__gossip(transactions=[transaction])
+        return added
+
+    @classmethod
+    def add_new_transactions(cls, transactions: List[Dict], relayed: bool = False):
+        results = cls.__blockchain.add_new_transactions(transactions=transactions, relayed=relayed)
+        added = [transaction for transaction, result in zip(transactions, results)
+                 if result == BlockChain.TRANSACTION_ADDED]
+        if added:
+            cls.__gossip(transactions=added)
+        return results
 
     @classmethod
     def add_peer(cls, peer: str):
@@ -43,7 +398,58 @@ class BlockChainNode(object):
 
     @classmethod
     def add_block(cls, block: Block, proof: str):
-        return cls.__blockchain.add_block(block=block, proof=proof)
+        added = cls.__blockchain.add_block(block=block, proof=proof)
+        if added:
+            cls.__gossip(blocks=[block])
+        return added
+
+    @classmethod
+    def json_range(cls, start: int = 0, stop: int = None):
+        return cls.__blockchain.json_range(start=start, stop=stop)
+
+    @classmethod
+    def encoded_range(cls, start: int = 0, stop: int = None):
+        return cls.__blockchain.encoded_range(start=start, stop=stop)
+
+    @classmethod
+    def block(cls, block_hash: str):
+        return cls.__blockchain.block_by_hash(block_hash=block_hash)
+
+    @classmethod
+    def block_at(cls, height: int):
+        return cls.__blockchain.block_at(height=height)
+
+    @classmethod
+    def transaction(cls, transaction_id):
+        result = None
+        found = cls.__blockchain.find_transaction(transaction_id=transaction_id)
+        if found is not None:
+            block, position = found
+            result = {
+                "block_index": block.index,
+                "block_hash": block.hash,
+                "position": position,
+                "transaction": block.transactions[position]
+            }
+
+        return result
+
+    @classmethod
+    def transaction_proof(cls, transaction_id):
+        result = None
+        found = cls.__blockchain.find_transaction(transaction_id=transaction_id)
+        if found is not None:
+            block, position = found
+            result = {
+                "block_index": block.index,
+                "block_hash": block.hash,
+                "merkle_root": block.merkle_root.hex(),
+                "position": position,
+                "transaction": block.transactions[position],
+                "proof": block.merkle_tree.proof(position=position)
+            }
+
+        return result
 
     @classmethod
     def mine(cls):
@@ -52,32 +458,128 @@ class BlockChainNode(object):
             cls.__announce_new_block(block=mined_block)
         return mined_block
 
+    @classmethod
+    def submit_mining_job(cls):
+        return cls.__scheduler.submit()
+
+    @classmethod
+    def mining_job(cls, job_id: str):
+        return cls.__scheduler.job(job_id=job_id)
+
+    @classmethod
+    def start_continuous_mining(cls, min_transactions: int = 1, max_age: float = None):
+        return cls.__scheduler.start_continuous(min_transactions=min_transactions, max_age=max_age)
+
+    @classmethod
+    def stop_continuous_mining(cls):
+        cls.__scheduler.stop_continuous()
+
+    @classmethod
+    def continuous_mining(cls):
+        return cls.__scheduler.continuous
+
+    @classmethod
+    def export_snapshot(cls, path: str):
+        return cls.__blockchain.export_snapshot(path=path)
+
+    @classmethod
+    def locate(cls, locator: List[str]):
+        return cls.__blockchain.locate(locator=locator)
+
     @classmethod
     def consensus(cls):
+        # Each peer places the fork point from our block locator and advertises its cumulative work. Candidates are
+        # tried most work first and only the blocks above their fork point are downloaded, so usually just the best
+        # chain is fetched; the next one is only tried while it advertises more than the best valid chain so far.
+        # Advertised work only orders the candidates: a chain is chosen on the work its validated blocks add up to.
+        # Peers that cannot locate advertise nothing and are checked last.
         result = False
+        best_work = cls.__blockchain.work
+        best_suffix = None
+        locator = cls.__blockchain.locator()
+        deadline = time.monotonic() + cls.CONSENSUS_TIMEOUT
+
+        candidates = sorted(cls.__query_peers(peers=list(cls.__peers), locator=locator, deadline=deadline),
+                            key=lambda candidate: -1 if candidate[1][2] is None else candidate[1][2], reverse=True)
+        for peer_node, (_, fork_height, work, suffix) in candidates:
+            if time.monotonic() >= deadline:
+                break
+            if work is not None and work <= best_work:
+                continue
+            if suffix is None:
+                try:
+                    _, suffix = cls.__request_chain(peer=peer_node, deadline=deadline, start=fork_height + 1)
+                except (requests.RequestException, ValueError):
+                    suffix = []
+
+            checked = cls.__blockchain.check_suffix(suffix=suffix)
+            if checked and checked.work > best_work:
+                best_work = checked.work
+                best_suffix = suffix
+
+        if best_suffix is not None:
+            result = cls.__blockchain.reorganize(suffix=best_suffix)
+
+        return result
+
+    @classmethod
+    def __download_bodies(cls, peers: List[str], start: int, headers: List[Dict], deadline: float):
+        # Batches of SYNC_BODIES_BATCH blocks are spread round robin over peers and fetched concurrently, one worker
+        # per peer; a batch a peer cannot serve is retried with the next one. None unless every batch arrived.
+        batches = range(0, len(headers), cls.SYNC_BODIES_BATCH)
+        pool = ThreadPoolExecutor(max_workers=min(cls.CONSENSUS_WORKERS, len(peers)), thread_name_prefix='sync')
+        futures = [pool.submit(cls.__request_bodies, peers[position % len(peers):] + peers[:position % len(peers)],
+                               start + offset, headers[offset:offset + cls.SYNC_BODIES_BATCH], deadline)
+                   for position, offset in enumerate(batches)]
+        _, not_done = wait(futures, timeout=cls.__remaining(deadline))
+        pool.shutdown(wait=False, cancel_futures=True)
+
+        blocks = None
+        if not not_done and all(future.result() is not None for future in futures):
+            blocks = [block_json for future in futures for block_json in future.result()]
+
+        return blocks
 
-        longest_chain = None
-        current_len = len(cls.__blockchain.chain)
+    @classmethod
+    def sync(cls):
+        # Headers-first: the header chain of the candidate advertising the most work is downloaded and validated
+        # before any transaction is, so an invalid chain only costs its headers. Bodies are then fetched in parallel
+        # from every peer that advertises enough blocks and checked against the validated headers.
+        result = False
+        best_work = cls.__blockchain.work
+        locator = cls.__blockchain.locator()
+        deadline = time.monotonic() + cls.CONSENSUS_TIMEOUT
 
-        for peer_node in cls.__peers:
-            response = requests.get('http://{}/chain'.format(peer_node))
-            if response.status_code == 200:
-                length = response.json().get('length', 0)
-                chain = response.json().get('chain', [])
-                if length > current_len and cls.__blockchain.validate_chain(chain=chain):
-                    current_len = length
-                    longest_chain = chain
+        candidates = sorted(cls.__query_peers(peers=list(cls.__peers), locator=locator, deadline=deadline,
+                                              fallback=False), key=lambda candidate: candidate[1][2], reverse=True)
+        for peer_node, (length, fork_height, work, _) in candidates:
+            if work <= best_work or time.monotonic() >= deadline:
+                break
+            try:
+                headers = cls.__request_headers(peer=peer_node, start=fork_height + 1, stop=length, deadline=deadline)
+            except (requests.RequestException, ValueError):
+                headers = []
 
-        if longest_chain:
-            cls.__blockchain.chain = longest_chain
-            result = True
+            checked = cls.__blockchain.check_suffix(suffix=headers)
+            if checked and checked.work > best_work:
+                stop = fork_height + 1 + len(headers)
+                peers = [peer_node] + [other for other, (other_length, _, _, _) in candidates
+                                       if other != peer_node and other_length >= stop]
+                blocks = cls.__download_bodies(peers=peers, start=fork_height + 1, headers=headers,
+                                               deadline=deadline)
+                if blocks is not None:
+                    result = cls.__blockchain.reorganize(suffix=blocks)
+                    break
 
         return result
 
+    @classmethod
+    def headers_range(cls, start: int = 0, stop: int = None):
+        return cls.__blockchain.headers_range(start=start, stop=stop)
+
     def __new__(cls, *args, **kwargs):
         if cls.__blockchain is None:
-            cls.__blockchain = BlockChain()
-            cls.__peers = set()
+            cls.initialize()
         return super().__new__(cls, *args, **kwargs)
 
     def __init__(self):
@@ -96,6 +598,22 @@ class BlockChainNode(object):
     def chain(self):
         return self.__blockchain.chain
 
+    @property
+    def length(self):
+        return self.__blockchain.length
+
+    @property
+    def work(self):
+        return self.__blockchain.work
+
+    @property
+    def pruned_height(self):
+        return self.__blockchain.pruned_height
+
+    @property
+    def encoded_chain(self):
+        return self.__blockchain.encode_chain()
+
     @chain.setter
     def chain(self, new_chain: List[Dict]):
         blocks_chain: List[Block] = []
@@ -108,3 +626,7 @@ class BlockChainNode(object):
     @property
     def unconfirmed_transactions(self):
         return self.__blockchain.unconfirmed_transactions
+
+    @property
+    def mempool_stats(self):
+        return self.__blockchain.mempool_stats
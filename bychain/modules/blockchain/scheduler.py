@@ -0,0 +1,197 @@
+import queue
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Optional, Tuple
+
+from bychain.modules.blockchain.block import Block
+
+
+class MiningJob(object):
+    PENDING = 'pending'
+    RUNNING = 'running'
+    MINED = 'mined'
+    EMPTY = 'empty'
+    FAILED = 'failed'
+
+    @staticmethod
+    def to_json(job: 'MiningJob'):
+        result = None
+        if job is not None:
+            result = dict(job_id=job.uid, trigger=job.trigger, status=job.status, created_at=job.created_at,
+                          finished_at=job.finished_at, error=job.error)
+            if job.block is not None:
+                result['block_index'] = job.block.index
+                result['block_hash'] = job.block.hash
+
+        return result
+
+    def __init__(self, trigger: str):
+        self.__uid = str(uuid.uuid4())
+        self.__trigger = trigger
+        self.__status = self.PENDING
+        self.__block = None
+        self.__error = None
+        self.__created_at = datetime.utcnow().timestamp()
+        self.__finished_at = None
+        self.__done = threading.Event()
+
+    def start(self):
+        self.__status = self.RUNNING
+
+    def finish(self, block: Optional[Block]):
+        self.__block = block
+        self.__status = self.MINED if block is not None else self.EMPTY
+        self.__finished_at = datetime.utcnow().timestamp()
+        self.__done.set()
+
+    def fail(self, error: str):
+        self.__error = error
+        self.__status = self.FAILED
+        self.__finished_at = datetime.utcnow().timestamp()
+        self.__done.set()
+
+    def wait(self, timeout: float = None):
+        return self.__done.wait(timeout=timeout)
+
+    @property
+    def uid(self):
+        return self.__uid
+
+    @property
+    def trigger(self):
+        return self.__trigger
+
+    @property
+    def status(self):
+        return self.__status
+
+    @property
+    def finished(self):
+        return self.__done.is_set()
+
+    @property
+    def block(self):
+        return self.__block
+
+    @property
+    def error(self):
+        return self.__error
+
+    @property
+    def created_at(self):
+        return self.__created_at
+
+    @property
+    def finished_at(self):
+        return self.__finished_at
+
+
+class MiningScheduler(object):
+    ON_DEMAND = 'on_demand'
+    CONTINUOUS = 'continuous'
+    MAX_JOBS = 1000
+    POLL_SECONDS = 0.5
+
+    def __init__(self, mine: Callable[[], Optional[Block]],
+                 pending_summary: Callable[[], Tuple[int, Optional[float]]]):
+        # pending_summary returns the number of unconfirmed transactions and the timestamp of the oldest one; it is
+        # polled every POLL_SECONDS while continuous mining is on, so it must not copy the mempool.
+        self.__mine = mine
+        self.__pending_summary = pending_summary
+        self.__jobs = OrderedDict()
+        self.__queue = queue.Queue()
+        self.__lock = threading.Lock()
+        self.__worker = None
+        self.__watcher = None
+        self.__watcher_stop = None
+        self.__continuous = None
+        self.__continuous_job = None
+
+    def __run_jobs(self):
+        job = self.__queue.get()
+        while job is not None:
+            job.start()
+            try:
+                job.finish(block=self.__mine())
+            except Exception as error:
+                job.fail(error=str(error))
+            job = self.__queue.get()
+
+    def __watch_mempool(self, stop: threading.Event, min_transactions: int, max_age: float):
+        while not stop.wait(timeout=self.POLL_SECONDS):
+            active_job = self.__continuous_job
+            if (active_job is None or active_job.finished) and self.__should_mine(min_transactions, max_age):
+                self.__continuous_job = self.__submit(trigger=self.CONTINUOUS)
+
+    def __should_mine(self, min_transactions: int, max_age: float):
+        count, oldest = self.__pending_summary()
+        should_mine = count > 0 and count >= min_transactions
+        if count and not should_mine and max_age is not None and oldest is not None:
+            should_mine = datetime.utcnow().timestamp() - oldest >= max_age
+
+        return should_mine
+
+    def __submit(self, trigger: str):
+        job = MiningJob(trigger=trigger)
+        with self.__lock:
+            self.__jobs[job.uid] = job
+            while len(self.__jobs) > self.MAX_JOBS:
+                oldest = next(iter(self.__jobs.values()))
+                if not oldest.finished:
+                    break
+                self.__jobs.popitem(last=False)
+
+            if self.__worker is None:
+                self.__worker = threading.Thread(target=self.__run_jobs, name='mining-scheduler', daemon=True)
+                self.__worker.start()
+
+        self.__queue.put(job)
+        return job
+
+    def submit(self):
+        return self.__submit(trigger=self.ON_DEMAND)
+
+    def job(self, job_id: str):
+        return self.__jobs.get(job_id)
+
+    def start_continuous(self, min_transactions: int = 1, max_age: float = None):
+        started = False
+        if isinstance(min_transactions, int) and min_transactions > 0 and \
+                (max_age is None or isinstance(max_age, (int, float)) and max_age >= 0):
+            self.stop_continuous()
+            with self.__lock:
+                self.__continuous = dict(min_transactions=min_transactions, max_age=max_age)
+                self.__watcher_stop = threading.Event()
+                self.__watcher = threading.Thread(target=self.__watch_mempool, name='mining-watcher', daemon=True,
+                                                  args=(self.__watcher_stop, min_transactions, max_age))
+                self.__watcher.start()
+            started = True
+
+        return started
+
+    def stop_continuous(self):
+        with self.__lock:
+            watcher, watcher_stop = self.__watcher, self.__watcher_stop
+            self.__continuous = None
+            self.__watcher = None
+            self.__watcher_stop = None
+
+        if watcher is not None:
+            watcher_stop.set()
+            watcher.join()
+
+    def stop(self):
+        self.stop_continuous()
+        with self.__lock:
+            worker = self.__worker
+            self.__worker = None
+
+        if worker is not None:
+            self.__queue.put(None)
+            worker.join()
+
+    @property
+    def continuous(self):
+        return dict(self.__continuous) if self.__continuous is not None else None
@@ -0,0 +1,211 @@
+import struct
+from typing import Any, Iterable, List
+
+CONTENT_TYPE_JSON = 'application/json'
+CONTENT_TYPE_BINARY = 'application/vnd.bychain.binary'
+CONTENT_TYPE_NDJSON = 'application/x-ndjson'
+
+FORMAT_VERSION = 1
+
+
+class SerializationError(ValueError):
+    pass
+
+
+class BinarySerializer(object):
+    VERSION = FORMAT_VERSION
+
+    NONE = 0x00
+    FALSE = 0x01
+    TRUE = 0x02
+    INT = 0x03
+    BIG_INT = 0x04
+    FLOAT = 0x05
+    STRING = 0x06
+    LIST = 0x07
+    DICT = 0x08
+
+    FLOAT_FORMAT = struct.Struct('>d')
+
+    @classmethod
+    def __encode_length(cls, buffer: bytearray, length: int):
+        # Unsigned LEB128: seven bits per byte, high bit set while more bytes follow.
+        while length > 0x7f:
+            buffer.append((length & 0x7f) | 0x80)
+            length >>= 7
+        buffer.append(length)
+
+    @classmethod
+    def __encode_string(cls, buffer: bytearray, value: str):
+        encoded = value.encode()
+        cls.__encode_length(buffer, len(encoded))
+        buffer += encoded
+
+    @classmethod
+    def encode_value(cls, buffer: bytearray, value: Any):
+        # bool is checked before int because it is a subclass of it; dict keys are sorted so equal values always
+        # produce the same bytes, which is what makes the encoding usable for hashing.
+        if value is None:
+            buffer.append(cls.NONE)
+        elif value is True:
+            buffer.append(cls.TRUE)
+        elif value is False:
+            buffer.append(cls.FALSE)
+        elif isinstance(value, int):
+            if -2 ** 63 <= value < 2 ** 63:
+                buffer.append(cls.INT)
+                cls.__encode_length(buffer, (value << 1) ^ (value >> 63))
+            else:
+                buffer.append(cls.BIG_INT)
+                cls.__encode_string(buffer, str(value))
+        elif isinstance(value, float):
+            buffer.append(cls.FLOAT)
+            buffer += cls.FLOAT_FORMAT.pack(value)
+        elif isinstance(value, str):
+            buffer.append(cls.STRING)
+            cls.__encode_string(buffer, value)
+        elif isinstance(value, (list, tuple)):
+            buffer.append(cls.LIST)
+            cls.__encode_length(buffer, len(value))
+            for item in value:
+                cls.encode_value(buffer, item)
+        elif isinstance(value, dict):
+            buffer.append(cls.DICT)
+            cls.__encode_length(buffer, len(value))
+            for key in sorted(value):
+                if not isinstance(key, str):
+                    raise SerializationError('Only string keys can be encoded, got {!r}'.format(key))
+                cls.__encode_string(buffer, key)
+                cls.encode_value(buffer, value[key])
+        else:
+            raise SerializationError('Cannot encode value of type {}'.format(type(value).__name__))
+
+    @classmethod
+    def __decode_length(cls, data: memoryview, offset: int):
+        length = 0
+        shift = 0
+        while True:
+            if offset >= len(data) or shift > 63:
+                raise SerializationError('Truncated length at offset {}'.format(offset))
+            byte = data[offset]
+            offset += 1
+            length |= (byte & 0x7f) << shift
+            if byte < 0x80:
+                break
+            shift += 7
+
+        return length, offset
+
+    @classmethod
+    def __decode_string(cls, data: memoryview, offset: int):
+        length, offset = cls.__decode_length(data, offset)
+        if offset + length > len(data):
+            raise SerializationError('Truncated string at offset {}'.format(offset))
+        try:
+            value = str(data[offset:offset + length], 'utf-8')
+        except UnicodeDecodeError as error:
+            raise SerializationError('Invalid string at offset {}'.format(offset)) from error
+        return value, offset + length
+
+    @classmethod
+    def decode_value(cls, data: memoryview, offset: int = 0):
+        if offset >= len(data):
+            raise SerializationError('Truncated value at offset {}'.format(offset))
+
+        tag = data[offset]
+        offset += 1
+        if tag == cls.NONE:
+            value = None
+        elif tag == cls.TRUE:
+            value = True
+        elif tag == cls.FALSE:
+            value = False
+        elif tag == cls.INT:
+            encoded, offset = cls.__decode_length(data, offset)
+            value = (encoded >> 1) ^ -(encoded & 1)
+        elif tag == cls.BIG_INT:
+            digits, offset = cls.__decode_string(data, offset)
+            value = int(digits)
+        elif tag == cls.FLOAT:
+            if offset + cls.FLOAT_FORMAT.size > len(data):
+                raise SerializationError('Truncated float at offset {}'.format(offset))
+            value = cls.FLOAT_FORMAT.unpack_from(data, offset)[0]
+            offset += cls.FLOAT_FORMAT.size
+        elif tag == cls.STRING:
+            value, offset = cls.__decode_string(data, offset)
+        elif tag == cls.LIST:
+            length, offset = cls.__decode_length(data, offset)
+            value = []
+            for _ in range(length):
+                item, offset = cls.decode_value(data, offset)
+                value.append(item)
+        elif tag == cls.DICT:
+            length, offset = cls.__decode_length(data, offset)
+            value = {}
+            for _ in range(length):
+                key, offset = cls.__decode_string(data, offset)
+                value[key], offset = cls.decode_value(data, offset)
+        else:
+            raise SerializationError('Unknown tag {} at offset {}'.format(tag, offset - 1))
+
+        return value, offset
+
+    @classmethod
+    def dumps(cls, value: Any):
+        buffer = bytearray([cls.VERSION])
+        cls.encode_value(buffer, value)
+        return bytes(buffer)
+
+    @classmethod
+    def loads(cls, data: bytes):
+        view = memoryview(data)
+        if not view or view[0] != cls.VERSION:
+            raise SerializationError('Unsupported format version')
+
+        value, offset = cls.decode_value(view, 1)
+        if offset != len(view):
+            raise SerializationError('Trailing bytes after offset {}'.format(offset))
+
+        return value
+
+    @classmethod
+    def canonical(cls, value: Any):
+        buffer = bytearray()
+        cls.encode_value(buffer, value)
+        return bytes(buffer)
+
+    @classmethod
+    def encode_blocks(cls, blocks: List[bytes]):
+        return b''.join(cls.iter_encode_blocks(count=len(blocks), blocks=blocks))
+
+    @classmethod
+    def iter_encode_blocks(cls, count: int, blocks: Iterable[bytes]):
+        # Yields the same bytes as encode_blocks one block at a time; count must match what blocks yields.
+        buffer = bytearray([cls.VERSION])
+        cls.__encode_length(buffer, count)
+        yield bytes(buffer)
+        for block in blocks:
+            buffer = bytearray()
+            cls.__encode_length(buffer, len(block))
+            yield bytes(buffer) + block
+
+    @classmethod
+    def decode_blocks(cls, data: bytes):
+        view = memoryview(data)
+        if not view or view[0] != cls.VERSION:
+            raise SerializationError('Unsupported format version')
+
+        count, offset = cls.__decode_length(view, 1)
+        blocks = []
+        for _ in range(count):
+            length, offset = cls.__decode_length(view, offset)
+            if offset + length > len(view):
+                raise SerializationError('Truncated block at offset {}'.format(offset))
+            blocks.append(bytes(view[offset:offset + length]))
+            offset += length
+
+        if offset != len(view):
+            raise SerializationError('Trailing bytes after offset {}'.format(offset))
+
+        return blocks
+
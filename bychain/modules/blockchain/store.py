@@ -0,0 +1,272 @@
+import json
+import mmap
+import os
+import struct
+import threading
+import zlib
+from functools import partial
+from typing import List
+
+from bychain.modules.blockchain.block import Block
+
+
+class BlockStore(object):
+    INDEX_FILE = 'index.dat'
+    PRUNED_FILE = 'pruned.dat'
+    TRANSACTIONS_FILE = 'transactions.dat'
+    SEGMENT_FILE = 'segment-{:06d}.dat'
+    SEGMENT_SIZE = 64 * 1024 * 1024
+    SYNC_WRITES = False
+    RECORD_FORMAT = struct.Struct('>II')
+    INDEX_FORMAT = struct.Struct('>IQIIQdQ32s32s')
+
+    def __init__(self, path: str):
+        self.__path = path
+        self.__lock = threading.RLock()
+        self.__index_map = None
+        self.__read_descriptors = {}
+        os.makedirs(path, exist_ok=True)
+
+        self.__count, self.__segment_id = self.__recover()
+        self.__read_records(path=self.__transactions_path)
+        self.__index_file = open(self.__index_path, 'ab')
+        self.__segment_file = open(self.__segment_path(self.__segment_id), 'ab')
+        self.__transactions_file = open(self.__transactions_path, 'ab')
+
+    @property
+    def __index_path(self):
+        return os.path.join(self.__path, self.INDEX_FILE)
+
+    @property
+    def __pruned_path(self):
+        return os.path.join(self.__path, self.PRUNED_FILE)
+
+    @property
+    def __transactions_path(self):
+        return os.path.join(self.__path, self.TRANSACTIONS_FILE)
+
+    def __segment_path(self, segment_id: int):
+        return os.path.join(self.__path, self.SEGMENT_FILE.format(segment_id))
+
+    def __segment_ids(self):
+        segment_ids = []
+        for name in os.listdir(self.__path):
+            prefix, _, suffix = self.SEGMENT_FILE.partition('{:06d}')
+            if name.startswith(prefix) and name.endswith(suffix):
+                segment_id = name[len(prefix):len(name) - len(suffix)]
+                if segment_id.isdigit():
+                    segment_ids.append(int(segment_id))
+
+        return sorted(segment_ids)
+
+    def __read_record_payload(self, segment_id: int, offset: int, length: int):
+        payload = None
+        segment_path = self.__segment_path(segment_id)
+        end = offset + self.RECORD_FORMAT.size + length
+        if os.path.exists(segment_path) and os.path.getsize(segment_path) >= end:
+            with open(segment_path, 'rb') as segment_file:
+                segment_file.seek(offset)
+                record = segment_file.read(end - offset)
+            record_length, crc = self.RECORD_FORMAT.unpack_from(record, 0)
+            candidate = record[self.RECORD_FORMAT.size:]
+            if record_length == length and zlib.crc32(candidate) == crc:
+                payload = candidate
+
+        return payload
+
+    def __recover(self):
+        # A crash can leave a partial index entry, an index entry whose record never fully reached its segment, or
+        # record bytes that were never indexed. All three are cut back to the last complete, checksummed record.
+        index_size = os.path.getsize(self.__index_path) if os.path.exists(self.__index_path) else 0
+        count = index_size // self.INDEX_FORMAT.size
+        entry = None
+
+        with open(self.__index_path, 'ab+') as index_file:
+            while count > 0:
+                index_file.seek((count - 1) * self.INDEX_FORMAT.size)
+                entry = self.INDEX_FORMAT.unpack(index_file.read(self.INDEX_FORMAT.size))
+                if self.__read_record_payload(segment_id=entry[0], offset=entry[1], length=entry[2]) is not None:
+                    break
+                count -= 1
+                entry = None
+            index_file.truncate(count * self.INDEX_FORMAT.size)
+
+        segment_id = entry[0] if entry is not None else 0
+        end = entry[1] + self.RECORD_FORMAT.size + entry[2] if entry is not None else 0
+        for existing_segment_id in self.__segment_ids():
+            if existing_segment_id > segment_id:
+                os.remove(self.__segment_path(existing_segment_id))
+        with open(self.__segment_path(segment_id), 'ab+') as segment_file:
+            segment_file.truncate(end)
+
+        return count, segment_id
+
+    def __entry(self, height: int):
+        if self.__index_map is None or len(self.__index_map) < (height + 1) * self.INDEX_FORMAT.size:
+            if self.__index_map is not None:
+                self.__index_map.close()
+            self.__index_file.flush()
+            with open(self.__index_path, 'rb') as index_file:
+                self.__index_map = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        return self.INDEX_FORMAT.unpack_from(self.__index_map, height * self.INDEX_FORMAT.size)
+
+    def __read_descriptor(self, segment_id: int):
+        if segment_id not in self.__read_descriptors:
+            self.__read_descriptors[segment_id] = os.open(self.__segment_path(segment_id), os.O_RDONLY)
+        return self.__read_descriptors[segment_id]
+
+    def __close_readers(self):
+        if self.__index_map is not None:
+            self.__index_map.close()
+            self.__index_map = None
+        for descriptor in self.__read_descriptors.values():
+            os.close(descriptor)
+        self.__read_descriptors = {}
+
+    def __flush(self, file):
+        file.flush()
+        if self.SYNC_WRITES:
+            os.fsync(file.fileno())
+
+    def __write_record(self, file, value):
+        payload = json.dumps(value).encode()
+        file.write(self.RECORD_FORMAT.pack(len(payload), zlib.crc32(payload)) + payload)
+        self.__flush(file)
+
+    def __read_records(self, path: str):
+        # Returns the decoded records of a side file; a partial record left by a crash is cut off.
+        records = []
+        with self.__lock, open(path, 'ab+') as records_file:
+            records_file.seek(0)
+            data = records_file.read()
+            offset = 0
+            while offset + self.RECORD_FORMAT.size <= len(data):
+                length, crc = self.RECORD_FORMAT.unpack_from(data, offset)
+                payload = data[offset + self.RECORD_FORMAT.size:offset + self.RECORD_FORMAT.size + length]
+                if len(payload) != length or zlib.crc32(payload) != crc:
+                    break
+                records.append(payload)
+                offset += self.RECORD_FORMAT.size + length
+            records_file.truncate(offset)
+
+        return [json.loads(payload) for payload in records]
+
+    def append(self, block: Block):
+        payload = block.encode()
+        record = self.RECORD_FORMAT.pack(len(payload), zlib.crc32(payload)) + payload
+
+        with self.__lock:
+            offset = self.__segment_file.tell()
+            if offset > 0 and offset + len(record) > self.SEGMENT_SIZE:
+                self.__segment_file.close()
+                self.__segment_id += 1
+                self.__segment_file = open(self.__segment_path(self.__segment_id), 'ab')
+                offset = 0
+
+            # The record goes to disk before its index entry, so an entry never points at missing data.
+            self.__segment_file.write(record)
+            self.__flush(self.__segment_file)
+            self.__index_file.write(self.INDEX_FORMAT.pack(
+                self.__segment_id, offset, len(payload), zlib.crc32(payload), block.index, block.timestamp,
+                block.nonce, block.merkle_root, bytes.fromhex(block.hash)))
+            self.__flush(self.__index_file)
+            self.__write_record(self.__transactions_file,
+                                [block.index, [str(transaction.get('id')) for transaction in block.transactions]])
+            self.__count += 1
+
+    def read(self, height: int):
+        with self.__lock:
+            segment_id, offset, length, crc = self.__entry(height)[:4]
+            payload = os.pread(self.__read_descriptor(segment_id), length, offset + self.RECORD_FORMAT.size)
+
+        if len(payload) != length or zlib.crc32(payload) != crc:
+            raise IOError('Corrupted block record at height {}'.format(height))
+
+        return Block.decode(payload)
+
+    def read_transactions(self, height: int):
+        return self.read(height=height).transactions
+
+    def load(self, first_previous_hash: str):
+        # Only the index is read: blocks come back header-only and fetch their transactions on first use.
+        blocks: List[Block] = []
+        with self.__lock:
+            previous_hash = first_previous_hash
+            for height in range(self.__count):
+                _, _, _, _, index, timestamp, nonce, merkle_root, block_hash = self.__entry(height)
+                blocks.append(Block.from_header(index=index, previous_hash=previous_hash, timestamp=timestamp,
+                                                nonce=nonce, merkle_root=merkle_root,
+                                                body_loader=partial(self.read_transactions, height)))
+                previous_hash = block_hash.hex()
+
+        return blocks
+
+    def truncate(self, height: int):
+        with self.__lock:
+            if height < self.__count:
+                segment_id, offset = self.__entry(height)[:2]
+                self.__close_readers()
+                self.__segment_file.close()
+                self.__index_file.truncate(height * self.INDEX_FORMAT.size)
+                self.__flush(self.__index_file)
+
+                for existing_segment_id in self.__segment_ids():
+                    if existing_segment_id > segment_id:
+                        os.remove(self.__segment_path(existing_segment_id))
+                with open(self.__segment_path(segment_id), 'ab+') as segment_file:
+                    segment_file.truncate(offset)
+
+                self.__segment_id = segment_id
+                self.__segment_file = open(self.__segment_path(segment_id), 'ab')
+                self.__count = height
+
+    def prune(self, height: int):
+        # Deletes the segments that only hold records below height; their index entries, and so the headers, stay.
+        with self.__lock:
+            if 0 < height <= self.__count:
+                segment_id = self.__entry(height - 1)[0]
+                for existing_segment_id in self.__segment_ids():
+                    if existing_segment_id < segment_id:
+                        descriptor = self.__read_descriptors.pop(existing_segment_id, None)
+                        if descriptor is not None:
+                            os.close(descriptor)
+                        os.remove(self.__segment_path(existing_segment_id))
+
+    def record_pruned(self, height: int, transaction_ids: List[str]):
+        # Written before the block's segment can be deleted, so its ids are still known after a restart.
+        with self.__lock, open(self.__pruned_path, 'ab') as pruned_file:
+            self.__write_record(pruned_file, [height, transaction_ids])
+
+    def load_pruned(self):
+        # Returns the height below which blocks were recorded as pruned and the ids of their transactions.
+        height, transaction_ids = 0, []
+        for pruned_height, pruned_ids in self.__read_records(path=self.__pruned_path):
+            height = max(height, pruned_height + 1)
+            transaction_ids.extend(pruned_ids)
+
+        return height, transaction_ids
+
+    def load_transaction_ids(self):
+        # The transaction ids of each stored block, by height, as written along with the block. Records are not
+        # removed on truncate: one for a height replaces everything recorded from that height on. The list stops at
+        # the first block whose record was lost in a crash.
+        transaction_ids: List[List[str]] = []
+        for height, block_ids in self.__read_records(path=self.__transactions_path):
+            if height > len(transaction_ids):
+                break
+            del transaction_ids[height:]
+            transaction_ids.append(block_ids)
+
+        with self.__lock:
+            return transaction_ids[:self.__count]
+
+    def close(self):
+        with self.__lock:
+            self.__close_readers()
+            self.__segment_file.close()
+            self.__index_file.close()
+            self.__transactions_file.close()
+
+    def __len__(self):
+        return self.__count
@@ -0,0 +1,30 @@
+from typing import Dict
+
+
+class FrozenTransaction(dict):
+    __slots__ = ()
+
+    @classmethod
+    def freeze(cls, transaction: Dict):
+        return transaction if isinstance(transaction, cls) else cls(transaction)
+
+    def __immutable(self, *args, **kwargs):
+        raise TypeError('{} is immutable'.format(type(self).__name__))
+
+    __setitem__ = __immutable
+    __delitem__ = __immutable
+    __ior__ = __immutable
+    clear = __immutable
+    pop = __immutable
+    popitem = __immutable
+    setdefault = __immutable
+    update = __immutable
+
+    def __reduce__(self):
+        return type(self), (dict(self),)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
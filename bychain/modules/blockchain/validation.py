@@ -0,0 +1,218 @@
+import multiprocessing
+import struct
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Callable, Dict, List
+
+from bychain.modules.blockchain.block import Block
+from bychain.modules.blockchain.difficulty import Difficulty
+from bychain.modules.blockchain.serialization import SerializationError
+
+NO_FAILURE = 2 ** 63 - 1
+UINT64_LIMIT = 2 ** 64
+
+_first_failure = None
+
+
+def _init_worker(first_failure):
+    global _first_failure
+    _first_failure = first_failure
+
+
+def _is_uint64(value):
+    # Index and nonce are packed as unsigned 64 bit integers into the header.
+    return isinstance(value, int) and not isinstance(value, bool) and 0 <= value < UINT64_LIMIT
+
+
+def _block_from_json(block_json: Dict):
+    # Header dicts, as served by /headers, carry the merkle root in place of the transactions.
+    fields = {field: value for field, value in block_json.items() if field != 'hash'}
+    if 'transactions' not in fields and 'merkle_root' in fields:
+        merkle_root = bytes.fromhex(fields.pop('merkle_root'))
+        if len(merkle_root) != 32:
+            raise ValueError('Invalid merkle root')
+        block = Block.from_header(merkle_root=merkle_root, body_loader=None, **fields)
+    else:
+        block = Block(**fields)
+
+    return block
+
+
+def _verify_block(block_json: Dict, target: int = None):
+    # A None target skips the proof of work check only; the hash is always recomputed from the block's fields.
+    try:
+        block = _block_from_json(block_json=block_json)
+        valid = block.hash == block_json['hash'] and \
+            (target is None or Difficulty.meets_target(block_hash=block.hash, target=target))
+    except (TypeError, ValueError, AttributeError, struct.error, SerializationError):
+        valid = False
+
+    return valid
+
+
+def _verify_chunk(first_height: int, block_jsons: List[Dict], targets: List[int]):
+    # Returns the height of the first block whose hash does not match its fields or its target. Chunks stop early
+    # once a lower failing height has been published by another worker.
+    first_failure = _first_failure
+    failed_height = None
+
+    for offset, (block_json, target) in enumerate(zip(block_jsons, targets)):
+        height = first_height + offset
+        if first_failure is not None and height > first_failure.value:
+            break
+        if not _verify_block(block_json=block_json, target=target):
+            failed_height = height
+            if first_failure is not None:
+                with first_failure.get_lock():
+                    first_failure.value = min(first_failure.value, height)
+            break
+
+    return failed_height
+
+
+class ValidationResult(object):
+    MALFORMED = 'malformed'
+    BROKEN_LINK = 'broken_link'
+    CHECKPOINT_MISMATCH = 'checkpoint_mismatch'
+    INVALID_PROOF = 'invalid_proof'
+    INVALID_TIMESTAMP = 'invalid_timestamp'
+
+    def __init__(self, failed_height: int = None, reason: str = None, work: int = None):
+        self.__failed_height = failed_height
+        self.__reason = reason
+        self.__work = work
+
+    @property
+    def valid(self):
+        return self.__failed_height is None
+
+    @property
+    def failed_height(self):
+        return self.__failed_height
+
+    @property
+    def reason(self):
+        return self.__reason
+
+    @property
+    def work(self):
+        # Cumulative work of the chain up to and including the last validated block, None when validation failed.
+        return self.__work
+
+    def __bool__(self):
+        return self.valid
+
+
+class ChainValidator(object):
+    # Worker processes start from a fork server, or are spawned, rather than forked from a threaded server process.
+    CHUNK_SIZE = 256
+    START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+    def __init__(self, expected_target: Callable[[int, int, List[float]], int], workers: int = None,
+                 chunk_size: int = None, checkpoints: Dict[int, str] = None,
+                 valid_timestamp: Callable[[float, List[float]], bool] = None):
+        self.__expected_target = expected_target
+        self.__valid_timestamp = valid_timestamp
+        self.__workers = workers or 1
+        self.__chunk_size = chunk_size or self.CHUNK_SIZE
+        self.__checkpoints = checkpoints or {}
+
+    def __link(self, chain: List[Dict], first_height: int, previous_hash: str, previous_target: int,
+               timestamps: List[float]):
+        # Linkage and targets only need the claimed hashes and timestamps, so a broken or malformed chain is
+        # rejected before any block is rehashed.
+        targets = []
+        timestamps = list(timestamps)
+        failure = None
+
+        for offset, block_json in enumerate(chain):
+            height = first_height + offset
+            if not (isinstance(block_json, dict) and isinstance(block_json.get('hash'), str) and
+                    isinstance(block_json.get('timestamp'), (int, float)) and
+                    _is_uint64(block_json.get('index')) and _is_uint64(block_json.get('nonce'))):
+                failure = ValidationResult(failed_height=height, reason=ValidationResult.MALFORMED)
+                break
+            if block_json.get('previous_hash') != previous_hash:
+                failure = ValidationResult(failed_height=height, reason=ValidationResult.BROKEN_LINK)
+                break
+            if self.__checkpoints.get(height, block_json['hash']) != block_json['hash']:
+                failure = ValidationResult(failed_height=height, reason=ValidationResult.CHECKPOINT_MISMATCH)
+                break
+            if self.__valid_timestamp is not None and not self.__valid_timestamp(block_json['timestamp'], timestamps):
+                failure = ValidationResult(failed_height=height, reason=ValidationResult.INVALID_TIMESTAMP)
+                break
+
+            previous_target = self.__expected_target(height, previous_target, timestamps)
+            targets.append(previous_target)
+            timestamps.append(block_json['timestamp'])
+            previous_hash = block_json['hash']
+
+        return failure, targets
+
+    def __verify_parallel(self, chain: List[Dict], first_height: int, targets: List[int]):
+        context = multiprocessing.get_context(self.START_METHOD)
+        first_failure = context.Value('q', NO_FAILURE)
+
+        with ProcessPoolExecutor(max_workers=self.__workers, mp_context=context, initializer=_init_worker,
+                                 initargs=(first_failure,)) as pool:
+            pending = {pool.submit(_verify_chunk, first_height + start, chain[start:start + self.__chunk_size],
+                                   targets[start:start + self.__chunk_size])
+                       for start in range(0, len(chain), self.__chunk_size)}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                if any(future.result() is not None for future in done):
+                    # Chunks that have not started yet are dropped; running ones stop past the published height.
+                    for future in pending:
+                        future.cancel()
+
+        return first_failure.value if first_failure.value != NO_FAILURE else None
+
+    def validate(self, chain: List[Dict], first_height: int = 0, previous_hash: str = None,
+                 previous_target: int = None, timestamps: List[float] = (), previous_work: int = 0):
+        # chain is a list of block dicts including their claimed hash; it is never modified. first_height,
+        # previous_hash, previous_target, timestamps and previous_work describe the blocks right below chain[0].
+        result = ValidationResult(failed_height=first_height, reason=ValidationResult.MALFORMED)
+
+        if isinstance(chain, list) and chain:
+            failure, targets = self.__link(chain=chain, first_height=first_height, previous_hash=previous_hash,
+                                           previous_target=previous_target, timestamps=timestamps)
+            if failure is not None:
+                result = failure
+            else:
+                # Every block is rehashed, so each one's contents are tied to the hash the next block links to.
+                # Up to the highest checkpoint the chain reaches, the checkpoint hash pins the chain and the
+                # proof of work is not checked against the targets.
+                trusted = [height - first_height + 1 for height in self.__checkpoints
+                           if first_height <= height < first_height + len(chain)]
+                skipped = max(trusted, default=0)
+                proof_targets = [None] * skipped + targets[skipped:]
+
+                if self.__workers > 1 and len(chain) > self.__chunk_size:
+                    failed_height = self.__verify_parallel(chain=chain, first_height=first_height,
+                                                           targets=proof_targets)
+                else:
+                    failed_height = _verify_chunk(first_height=first_height, block_jsons=chain, targets=proof_targets)
+                if failed_height is not None:
+                    result = ValidationResult(failed_height=failed_height, reason=ValidationResult.INVALID_PROOF)
+                else:
+                    result = ValidationResult(work=previous_work + sum(Difficulty.work(target=target)
+                                                                       for target in targets))
+
+        return result
+
+    @staticmethod
+    def matches_headers(chain: List[Dict], headers: List[Dict]):
+        # True when chain holds, transactions included, exactly the blocks that already validated headers commit to.
+        matches = isinstance(chain, list) and len(chain) == len(headers)
+        try:
+            matches = matches and all(isinstance(block_json, dict) and 'transactions' in block_json and
+                                      block_json.get('previous_hash') == header['previous_hash'] and
+                                      _block_from_json(block_json=block_json).hash == header['hash']
+                                      for block_json, header in zip(chain, headers))
+        except (TypeError, ValueError, AttributeError, struct.error, SerializationError):
+            matches = False
+
+        return matches
+
+    @property
+    def workers(self):
+        return self.__workers
@@ -5,6 +5,10 @@ from flask.globals import request
 
 from bychain.modules.blockchain.node import BlockChainNode
 from bychain.modules.blockchain.block import Block
+from bychain.modules.blockchain.blockchain import BlockChain
+from bychain.modules.blockchain.scheduler import MiningJob
+from bychain.modules.blockchain.serialization import BinarySerializer, CONTENT_TYPE_BINARY, CONTENT_TYPE_JSON, \
+    CONTENT_TYPE_NDJSON, SerializationError
 
 app = Flask(__name__)
 node = BlockChainNode()
@@ -22,14 +26,179 @@ def new_transaction():
     return response
 
 
+def _bulk_transactions():
+    # A JSON array, or one transaction per line for NDJSON bodies, which are read from the stream as they arrive.
+    # Lines that do not parse are kept as None so they are reported as invalid at their position.
+    if request.mimetype == CONTENT_TYPE_NDJSON:
+        transactions = []
+        for line in request.stream:
+            if line.strip():
+                try:
+                    transactions.append(json.loads(line))
+                except ValueError:
+                    transactions.append(None)
+    else:
+        transactions = request.get_json(silent=True)
+
+    return transactions if isinstance(transactions, list) else None
+
+
+@app.route('/transactions', methods=['POST'])
+def new_transactions():
+    response = Response(status=400, response='Invalid transactions data')
+    transactions = _bulk_transactions()
+    if transactions is not None:
+        results = node.add_new_transactions(transactions=transactions)
+        body = {
+            "added": results.count(BlockChain.TRANSACTION_ADDED),
+            "results": results
+        }
+        response = Response(status=200, response=json.dumps(body), content_type='application/json')
+
+    return response
+
+
+@app.route('/transactions/relay', methods=['POST'])
+def relay_transactions():
+    # Transactions gossiped by a peer; unlike /transactions they keep the timestamp they were first given.
+    response = Response(status=400, response='Invalid transactions data')
+    transactions = _bulk_transactions()
+    if transactions is not None:
+        results = node.add_new_transactions(transactions=transactions, relayed=True)
+        body = {
+            "added": results.count(BlockChain.TRANSACTION_ADDED),
+            "results": results
+        }
+        response = Response(status=200, response=json.dumps(body), content_type='application/json')
+
+    return response
+
+
+@app.route('/inventory', methods=['POST'])
+def receive_inventory():
+    # Answers an announcement with the block hashes and transaction ids this node wants delivered.
+    response = Response(status=400, response='Invalid inventory')
+    inventory = request.get_json(silent=True)
+    if isinstance(inventory, dict) and isinstance(inventory.get('blocks', []), list) and \
+            isinstance(inventory.get('transactions', []), list):
+        wanted = node.inventory(blocks=inventory.get('blocks', []), transactions=inventory.get('transactions', []))
+        response = Response(status=200, response=json.dumps(wanted), content_type='application/json')
+    return response
+
+
+def _chain_range_arguments():
+    # from and to are inclusive block heights and limit caps the number of blocks; returns None when invalid.
+    result = None
+    try:
+        start = int(request.args.get('from', 0))
+        stop = int(request.args['to']) + 1 if 'to' in request.args else None
+        limit = int(request.args['limit']) if 'limit' in request.args else None
+    except ValueError:
+        pass
+    else:
+        if start >= 0 and (stop is None or stop > start) and (limit is None or limit >= 0):
+            if limit is not None:
+                stop = start + limit if stop is None else min(stop, start + limit)
+            result = (start, stop)
+
+    return result
+
+
+def _stream_chain_json(length, json_blocks):
+    # Produces the same document as json.dumps({"length": ..., "chain": [...]}) one block at a time; length is
+    # always the full chain length so paginating clients know where the chain ends.
+    yield '{{"length": {}, "chain": ['.format(length)
+    for position, json_block in enumerate(json_blocks):
+        yield (', ' if position else '') + json_block
+    yield ']}'
+
+
 @app.route('/chain', methods=['GET'])
 def get_chain():
-    chain_data = node.chain
-    body = {
-        "length": len(chain_data),
-        "chain": chain_data
-    }
-    return Response(status=200, response=json.dumps(body), content_type='application/json')
+    response = Response(status=400, response='Invalid chain range')
+    chain_range = _chain_range_arguments()
+    if chain_range is not None and chain_range[0] < node.pruned_height:
+        response = Response(status=410, response='Blocks below height {} have been pruned'.format(node.pruned_height))
+    elif chain_range is not None:
+        if request.accept_mimetypes.best_match([CONTENT_TYPE_JSON, CONTENT_TYPE_BINARY]) == CONTENT_TYPE_BINARY:
+            _, count, encoded_blocks = node.encoded_range(start=chain_range[0], stop=chain_range[1])
+            response = Response(status=200, response=BinarySerializer.iter_encode_blocks(count=count,
+                                                                                         blocks=encoded_blocks),
+                                content_type=CONTENT_TYPE_BINARY)
+        else:
+            length, _, json_blocks = node.json_range(start=chain_range[0], stop=chain_range[1])
+            response = Response(status=200, response=_stream_chain_json(length=length, json_blocks=json_blocks),
+                                content_type=CONTENT_TYPE_JSON)
+    return response
+
+
+@app.route('/headers', methods=['GET'])
+def get_headers():
+    # Ranges are capped at BlockChain.HEADERS_PER_REQUEST headers; clients page with from.
+    response = Response(status=400, response='Invalid chain range')
+    chain_range = _chain_range_arguments()
+    if chain_range is not None:
+        length, headers = node.headers_range(start=chain_range[0], stop=chain_range[1])
+        body = {
+            "length": length,
+            "headers": headers
+        }
+        response = Response(status=200, response=json.dumps(body), content_type='application/json')
+    return response
+
+
+@app.route('/locate', methods=['POST'])
+def locate_fork_point():
+    response = Response(status=400, response='Invalid locator')
+    locator = request.get_json(silent=True)
+    if isinstance(locator, list) and all(isinstance(block_hash, str) for block_hash in locator):
+        body = {
+            "length": node.length,
+            "fork_height": node.locate(locator=locator),
+            "work": node.work
+        }
+        response = Response(status=200, response=json.dumps(body), content_type='application/json')
+    return response
+
+
+@app.route('/block/<block_hash>', methods=['GET'])
+def get_block(block_hash):
+    response = Response(status=404, response='Block not found')
+    block = node.block(block_hash=block_hash)
+    if block is not None and not block.body_available:
+        response = Response(status=410, response='Block transactions have been pruned')
+    elif block is not None:
+        response = Response(status=200, response=json.dumps(Block.to_json(block)), content_type='application/json')
+    return response
+
+
+@app.route('/block/height/<int:height>', methods=['GET'])
+def get_block_at_height(height):
+    response = Response(status=404, response='Block not found')
+    block = node.block_at(height=height)
+    if block is not None and not block.body_available:
+        response = Response(status=410, response='Block transactions have been pruned')
+    elif block is not None:
+        response = Response(status=200, response=json.dumps(Block.to_json(block)), content_type='application/json')
+    return response
+
+
+@app.route('/tx/<transaction_id>', methods=['GET'])
+def get_transaction(transaction_id):
+    response = Response(status=404, response='Transaction not found')
+    transaction = node.transaction(transaction_id=transaction_id)
+    if transaction is not None:
+        response = Response(status=200, response=json.dumps(transaction), content_type='application/json')
+    return response
+
+
+@app.route('/transaction/<transaction_id>/proof', methods=['GET'])
+def get_transaction_proof(transaction_id):
+    response = Response(status=404, response='Transaction not found')
+    proof = node.transaction_proof(transaction_id=transaction_id)
+    if proof is not None:
+        response = Response(status=200, response=json.dumps(proof), content_type='application/json')
+    return response
 
 
 @app.route('/mine', methods=['GET'])
@@ -44,6 +213,72 @@ def mine_unconfirmed_transactions():
     return response
 
 
+@app.route('/mine/jobs', methods=['POST'])
+def submit_mining_job():
+    job = node.submit_mining_job()
+    return Response(status=202, response=json.dumps(MiningJob.to_json(job)), content_type='application/json',
+                    headers={'Location': '/mine/jobs/{}'.format(job.uid)})
+
+
+@app.route('/mine/jobs/<job_id>', methods=['GET'])
+def get_mining_job(job_id):
+    response = Response(status=404, response='Mining job not found')
+    job = node.mining_job(job_id=job_id)
+    if job is not None:
+        response = Response(status=200, response=json.dumps(MiningJob.to_json(job)), content_type='application/json')
+    return response
+
+
+@app.route('/mine/jobs/<job_id>/result', methods=['GET'])
+def get_mining_job_result(job_id):
+    response = Response(status=404, response='Mining job not found')
+    job = node.mining_job(job_id=job_id)
+    if job is not None:
+        if not job.finished:
+            response = Response(status=202, response=json.dumps(MiningJob.to_json(job)),
+                                content_type='application/json')
+        elif job.status == MiningJob.MINED:
+            body = {
+                "block_index": job.block.index
+            }
+            response = Response(status=200, response=json.dumps(body), content_type='application/json')
+        elif job.status == MiningJob.EMPTY:
+            response = Response(status=204)
+        else:
+            response = Response(status=500, response=json.dumps(MiningJob.to_json(job)),
+                                content_type='application/json')
+    return response
+
+
+@app.route('/mine/continuous', methods=['GET'])
+def get_continuous_mining():
+    response = Response(status=204)
+    settings = node.continuous_mining()
+    if settings is not None:
+        response = Response(status=200, response=json.dumps(settings), content_type='application/json')
+    return response
+
+
+@app.route('/mine/continuous', methods=['POST'])
+def start_continuous_mining():
+    response = Response(status=400, response='Invalid mining settings')
+    settings = request.get_json(silent=True)
+    settings = {} if settings is None else settings
+    started = isinstance(settings, dict) and \
+        node.start_continuous_mining(min_transactions=settings.get('min_transactions', 1),
+                                     max_age=settings.get('max_age'))
+    if started:
+        response = Response(status=200, response=json.dumps(node.continuous_mining()),
+                            content_type='application/json')
+    return response
+
+
+@app.route('/mine/continuous', methods=['DELETE'])
+def stop_continuous_mining():
+    node.stop_continuous_mining()
+    return Response(status=204)
+
+
 @app.route('/pending', methods=['GET'])
 def get_pending_transactions():
     response = Response(status=204)
@@ -53,6 +288,11 @@ def get_pending_transactions():
     return response
 
 
+@app.route('/mempool/stats', methods=['GET'])
+def get_mempool_stats():
+    return Response(status=200, response=json.dumps(node.mempool_stats), content_type='application/json')
+
+
 @app.route('/nodes', methods=['POST'])
 def register_new_peers():
     response = Response(status=400, response='Invalid nodes data')
@@ -65,14 +305,51 @@ def register_new_peers():
     return response
 
 
+@app.route('/nodes/stats', methods=['GET'])
+def get_peer_stats():
+    return Response(status=200, response=json.dumps(node.announcement_stats()), content_type='application/json')
+
+
+def _compact_block_response(missing):
+    # missing is what the node returns for a compact block: positions to send, [] once added, None when rejected.
+    response = Response(status=400, response='Invalid compact block')
+    if missing == []:
+        response = Response(status=201, response='Added block successfully')
+    elif missing is not None:
+        response = Response(status=200, response=json.dumps({"missing": missing}), content_type='application/json')
+    return response
+
+
+@app.route('/compact_block', methods=['POST'])
+def receive_compact_block():
+    return _compact_block_response(missing=node.receive_compact_block(compact=request.get_json(silent=True)))
+
+
+@app.route('/compact_block/transactions', methods=['POST'])
+def receive_compact_block_transactions():
+    body = request.get_json(silent=True)
+    missing = None
+    if isinstance(body, dict) and isinstance(body.get('hash'), str):
+        missing = node.receive_compact_transactions(block_hash=body['hash'], positions=body.get('positions'),
+                                                    transactions=body.get('transactions'))
+    return _compact_block_response(missing=missing)
+
+
 @app.route('/add_block', methods=['POST'])
 def validate_and_add_block():
     response = Response(status=400, response='Invalid nodes data')
 
-    block_json = request.get_json()
-    proof = block_json.pop('hash')
-    block = Block(**block_json)
-    added = node.add_block(block=block, proof=proof)
+    if request.mimetype == CONTENT_TYPE_BINARY:
+        try:
+            block = Block.decode(request.get_data())
+            proof = block.hash
+        except SerializationError:
+            block, proof = None, None
+    else:
+        block_json = request.get_json()
+        proof = block_json.pop('hash')
+        block = Block(**block_json)
+    added = block is not None and node.add_block(block=block, proof=proof)
 
     if added:
         response = Response(status=201, response='Added block successfully')
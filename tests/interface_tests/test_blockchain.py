@@ -2,8 +2,10 @@ import json
 from unittest import mock
 
 from interface_tests.base_interface_test import BaseInterfaceTest
+from modules.interface.blockchain import node
 from modules.blockchain.block import Block
 from modules.blockchain.blockchain import BlockChain
+from modules.blockchain.compact import CompactBlock
 from modules.blockchain.node import BlockChainNode
 
 
@@ -28,6 +30,92 @@ class TestBlockChainInterface(BaseInterfaceTest):
         self.assertEqual(response.status_code, expected_status_code)
         self.assertEqual(response.data, expected_data)
 
+    def test_new_transactions_json_ok(self):
+        expected_status_code = 200
+        expected_body = {
+            'added': 2,
+            'results': ['added', 'added', 'duplicate', 'invalid']
+        }
+
+        transactions = [{'id': 1, 'value': 1}, {'id': 2, 'value': 2}, {'id': 1, 'value': 1}, {'id': 3}]
+        response = self.client.post('/transactions', content_type='application/json', data=json.dumps(transactions))
+
+        self.assertEqual(response.status_code, expected_status_code)
+        self.assertEqual(json.loads(response.data), expected_body)
+        self.assertEqual(len(node.unconfirmed_transactions), 2)
+
+    def test_new_transactions_ndjson_ok(self):
+        expected_status_code = 200
+        expected_body = {
+            'added': 2,
+            'results': ['added', 'invalid', 'added']
+        }
+
+        data = '{"id": 1, "value": 1}\nnot json\n\n{"id": 2, "value": 2}\n'
+        response = self.client.post('/transactions', content_type='application/x-ndjson', data=data)
+
+        self.assertEqual(response.status_code, expected_status_code)
+        self.assertEqual(json.loads(response.data), expected_body)
+
+    def test_new_transactions_invalid_ko(self):
+        expected_status_code = 400
+        expected_data = b'Invalid transactions data'
+
+        response = self.client.post('/transactions', content_type='application/json',
+                                    data=json.dumps({'id': 1, 'value': 1}))
+
+        self.assertEqual(response.status_code, expected_status_code)
+        self.assertEqual(response.data, expected_data)
+
+    def test_get_headers_ok(self):
+        expected_status_code = 200
+
+        self.client.post('/transaction', content_type='application/json', data=json.dumps({'id': 1, 'value': 1}))
+        self.client.get('/mine')
+        response = self.client.get('/headers?from=1')
+        body = json.loads(response.data)
+
+        self.assertEqual(response.status_code, expected_status_code)
+        self.assertEqual(body['length'], 2)
+        self.assertEqual(body['headers'], [Block.header_to_json(node.block_at(height=1))])
+
+    def test_get_headers_invalid_range_ko(self):
+        expected_status_code = 400
+
+        response = self.client.get('/headers?from=-1')
+
+        self.assertEqual(response.status_code, expected_status_code)
+
+    def test_inventory_ok(self):
+        expected_status_code = 200
+        expected_body = {'blocks': ['unknown_block'], 'transactions': [2]}
+
+        self.client.post('/transaction', content_type='application/json', data=json.dumps({'id': 1, 'value': 1}))
+        inventory = {'blocks': [node.last_block.hash, 'unknown_block'], 'transactions': [1, 2]}
+        response = self.client.post('/inventory', content_type='application/json', data=json.dumps(inventory))
+
+        self.assertEqual(response.status_code, expected_status_code)
+        self.assertEqual(json.loads(response.data), expected_body)
+
+    def test_inventory_invalid_ko(self):
+        expected_status_code = 400
+
+        response = self.client.post('/inventory', content_type='application/json', data=json.dumps(['block']))
+
+        self.assertEqual(response.status_code, expected_status_code)
+
+    def test_relay_transactions_ok(self):
+        expected_status_code = 200
+        expected_body = {'added': 1, 'results': ['added', 'invalid']}
+
+        transactions = [{'id': 1, 'value': 1, 'timestamp': 12.5}, {'id': 2, 'value': 2}]
+        response = self.client.post('/transactions/relay', content_type='application/json',
+                                    data=json.dumps(transactions))
+
+        self.assertEqual(response.status_code, expected_status_code)
+        self.assertEqual(json.loads(response.data), expected_body)
+        self.assertEqual(node.unconfirmed_transactions[0]['timestamp'], 12.5)
+
     def test_get_chain_empty_ok(self):
         expected_status_code = 200
         expected_content_type = 'application/json'
@@ -51,6 +139,53 @@ class TestBlockChainInterface(BaseInterfaceTest):
         self.assertEqual(response.content_type, expected_content_type)
         self.assertEqual(response.json, expected_body)
 
+    def test_get_chain_binary_ok(self):
+        expected_status_code = 200
+        expected_content_type = 'application/vnd.bychain.binary'
+
+        response = self.client.get('/chain', headers={'Accept': expected_content_type})
+        chain = BlockChain.decode_chain(data=response.data)
+
+        self.assertEqual(response.status_code, expected_status_code)
+        self.assertEqual(response.content_type, expected_content_type)
+        self.assertEqual(len(chain), 1)
+        self.assertEqual(chain[0]['index'], 0)
+
+    def test_get_chain_range_ok(self):
+        expected_status_code = 200
+        expected_indexes = [1, 2]
+
+        for transaction_id in range(1, 4):
+            self.client.post('/transaction', content_type='application/json',
+                             data=json.dumps({'id': transaction_id, 'value': 1}))
+            self.client.get('/mine')
+        response = self.client.get('/chain?from=1&to=3&limit=2')
+        limited_response = self.client.get('/chain?from=3&limit=5')
+        binary_response = self.client.get('/chain?from=1&limit=2',
+                                          headers={'Accept': 'application/vnd.bychain.binary'})
+
+        self.assertEqual(response.status_code, expected_status_code)
+        self.assertEqual(response.json['length'], 4)
+        self.assertEqual([block['index'] for block in response.json['chain']], expected_indexes)
+        self.assertEqual([block['index'] for block in limited_response.json['chain']], [3])
+        self.assertEqual([block['index'] for block in BlockChain.decode_chain(data=binary_response.data)],
+                         expected_indexes)
+
+    def test_get_chain_range_invalid_ko(self):
+        expected_status_code = 400
+
+        responses = [self.client.get('/chain?from=-1'), self.client.get('/chain?from=2&to=1'),
+                     self.client.get('/chain?limit=many')]
+
+        self.assertEqual([response.status_code for response in responses], [expected_status_code] * 3)
+
+    def test_add_block_binary_invalid_ko(self):
+        expected_status_code = 400
+
+        response = self.client.post('/add_block', content_type='application/vnd.bychain.binary', data=b'invalid')
+
+        self.assertEqual(response.status_code, expected_status_code)
+
     def test_mine_unconfirmed_transactions_empty_ok(self):
         expected_status_code = 204
 
@@ -73,6 +208,149 @@ class TestBlockChainInterface(BaseInterfaceTest):
         self.assertEqual(response.content_type, expected_content_type)
         self.assertEqual(response.json, expected_body)
 
+    def test_get_transaction_proof_ok(self):
+        expected_status_code = 200
+        expected_content_type = 'application/json'
+
+        self.client.post('/transaction', content_type='application/json',
+                         data=json.dumps({'id': 1, 'value': 1}))
+        self.client.get('/mine')
+        response = self.client.get('/transaction/1/proof')
+
+        self.assertEqual(response.status_code, expected_status_code)
+        self.assertEqual(response.content_type, expected_content_type)
+        self.assertEqual(response.json['block_index'], 1)
+        self.assertEqual(response.json['proof'], [])
+
+    def test_locate_ok(self):
+        expected_status_code = 200
+
+        genesis_hash = self.client.get('/block/height/0').json['hash']
+        response = self.client.post('/locate', content_type='application/json',
+                                    data=json.dumps(['unknown', genesis_hash]))
+        invalid_response = self.client.post('/locate', content_type='application/json', data=json.dumps({}))
+
+        self.assertEqual(response.status_code, expected_status_code)
+        self.assertEqual(response.json, {'length': 1, 'fork_height': 0, 'work': 2 ** 8})
+        self.assertEqual(invalid_response.status_code, 400)
+
+    def test_get_block_ok(self):
+        expected_status_code = 200
+        expected_content_type = 'application/json'
+
+        self.client.post('/transaction', content_type='application/json',
+                         data=json.dumps({'id': 1, 'value': 1}))
+        self.client.get('/mine')
+        response_by_height = self.client.get('/block/height/1')
+        response_by_hash = self.client.get('/block/{}'.format(response_by_height.json['hash']))
+
+        self.assertEqual(response_by_height.status_code, expected_status_code)
+        self.assertEqual(response_by_height.content_type, expected_content_type)
+        self.assertEqual(response_by_height.json['index'], 1)
+        self.assertEqual(response_by_hash.status_code, expected_status_code)
+        self.assertEqual(response_by_hash.json, response_by_height.json)
+
+    def test_get_block_not_found_ko(self):
+        expected_status_code = 404
+
+        response_by_height = self.client.get('/block/height/5')
+        response_by_hash = self.client.get('/block/unknown')
+
+        self.assertEqual(response_by_height.status_code, expected_status_code)
+        self.assertEqual(response_by_hash.status_code, expected_status_code)
+
+    @mock.patch('bychain.modules.blockchain.blockchain.BlockChain.PRUNE_DEPTH', 1)
+    @mock.patch('bychain.modules.blockchain.blockchain.BlockChain.PRUNE_MODE', BlockChain.PRUNE_FULL)
+    def test_get_pruned_blocks_ko(self):
+        expected_status_code = 410
+
+        node.initialize()
+        self.client.post('/transaction', content_type='application/json',
+                         data=json.dumps({'id': 1, 'value': 1}))
+        self.client.get('/mine')
+        chain_response = self.client.get('/chain')
+        block_response = self.client.get('/block/height/0')
+        kept_response = self.client.get('/chain?from=1')
+
+        self.assertEqual(chain_response.status_code, expected_status_code)
+        self.assertEqual(block_response.status_code, expected_status_code)
+        self.assertEqual(kept_response.status_code, 200)
+        self.assertEqual(kept_response.json['length'], 2)
+
+    def test_get_transaction_ok(self):
+        expected_status_code = 200
+
+        self.client.post('/transaction', content_type='application/json',
+                         data=json.dumps({'id': 1, 'value': 1}))
+        self.client.get('/mine')
+        response = self.client.get('/tx/1')
+        missing_response = self.client.get('/tx/2')
+
+        self.assertEqual(response.status_code, expected_status_code)
+        self.assertEqual(response.json['block_index'], 1)
+        self.assertEqual(response.json['transaction']['id'], 1)
+        self.assertEqual(missing_response.status_code, 404)
+
+    def test_get_transaction_proof_not_found_ko(self):
+        expected_status_code = 404
+
+        response = self.client.get('/transaction/1/proof')
+
+        self.assertEqual(response.status_code, expected_status_code)
+
+    def test_mining_job_ok(self):
+        expected_status_code = 202
+        expected_body = {
+            "block_index": 1
+        }
+
+        self.client.post('/transaction', content_type='application/json',
+                         data=json.dumps({'id': 1, 'value': 1}))
+        response = self.client.post('/mine/jobs')
+        job_id = response.json['job_id']
+        node.mining_job(job_id=job_id).wait(timeout=5)
+        status_response = self.client.get('/mine/jobs/{}'.format(job_id))
+        result_response = self.client.get('/mine/jobs/{}/result'.format(job_id))
+
+        self.assertEqual(response.status_code, expected_status_code)
+        self.assertEqual(response.headers['Location'], '/mine/jobs/{}'.format(job_id))
+        self.assertEqual(status_response.status_code, 200)
+        self.assertEqual(status_response.json['status'], 'mined')
+        self.assertEqual(result_response.status_code, 200)
+        self.assertEqual(result_response.json, expected_body)
+
+    def test_mining_job_empty_ok(self):
+        response = self.client.post('/mine/jobs')
+        job_id = response.json['job_id']
+        node.mining_job(job_id=job_id).wait(timeout=5)
+        result_response = self.client.get('/mine/jobs/{}/result'.format(job_id))
+
+        self.assertEqual(result_response.status_code, 204)
+
+    def test_mining_job_not_found_ko(self):
+        self.assertEqual(self.client.get('/mine/jobs/unknown').status_code, 404)
+        self.assertEqual(self.client.get('/mine/jobs/unknown/result').status_code, 404)
+
+    def test_continuous_mining_ok(self):
+        response = self.client.post('/mine/continuous', content_type='application/json',
+                                    data=json.dumps({'min_transactions': 5, 'max_age': 10}))
+        status_response = self.client.get('/mine/continuous')
+        stop_response = self.client.delete('/mine/continuous')
+        stopped_response = self.client.get('/mine/continuous')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(status_response.json, {'min_transactions': 5, 'max_age': 10})
+        self.assertEqual(stop_response.status_code, 204)
+        self.assertEqual(stopped_response.status_code, 204)
+
+    def test_continuous_mining_invalid_ko(self):
+        for settings in ({'min_transactions': -1}, [1], 5):
+            with self.subTest(settings=settings):
+                response = self.client.post('/mine/continuous', content_type='application/json',
+                                            data=json.dumps(settings))
+
+                self.assertEqual(response.status_code, 400)
+
     def test_get_pending_transactions_empty_ok(self):
         expected_status_code = 204
 
@@ -95,6 +373,26 @@ class TestBlockChainInterface(BaseInterfaceTest):
         self.assertEqual(response.content_type, expected_content_type)
         self.assertEqual(response.json, expected_body)
 
+    def test_get_mempool_stats_ok(self):
+        expected_status_code = 200
+        expected_body = {
+            'transactions': 1,
+            'bytes': mock.ANY,
+            'max_transactions': BlockChain.MEMPOOL_MAX_TRANSACTIONS,
+            'max_bytes': BlockChain.MEMPOOL_MAX_BYTES,
+            'ttl': BlockChain.MEMPOOL_TTL,
+            'expired': 0,
+            'evicted': 0,
+            'rejected': 0
+        }
+
+        self.client.post('/transaction', content_type='application/json',
+                         data=json.dumps({'id': 1, 'value': 1}))
+        response = self.client.get('/mempool/stats')
+
+        self.assertEqual(response.status_code, expected_status_code)
+        self.assertEqual(response.json, expected_body)
+
     def test_add_nodes_invalid_ko(self):
         expected_status_code = 400
         expected_data = b'Invalid nodes data'
@@ -114,6 +412,62 @@ class TestBlockChainInterface(BaseInterfaceTest):
         self.assertEqual(response.status_code, expected_status_code)
         self.assertEqual(response.data, expected_data)
 
+    @mock.patch('requests.Session.post', return_value=mock.Mock(status_code=201))
+    def test_get_peer_stats_ok(self, _):
+        expected_status_code = 200
+        expected_body = {
+            'node1': {'delivered': 2, 'rejected': 0, 'failed': 0, 'last_latency': mock.ANY,
+                      'average_latency': mock.ANY}
+        }
+
+        self.client.post('/nodes', content_type='application/json', data=json.dumps(['node1']))
+        self.client.post('/transaction', content_type='application/json', data=json.dumps({'id': 1, 'value': 1}))
+        self.client.get('/mine')
+        node.wait_for_announcements(timeout=5)
+        response = self.client.get('/nodes/stats')
+
+        self.assertEqual(response.status_code, expected_status_code)
+        self.assertEqual(json.loads(response.data), expected_body)
+
+    def test_compact_block_ok(self):
+        expected_status_code = 201
+
+        self.client.post('/transaction', content_type='application/json', data=json.dumps({'id': 1, 'value': 1}))
+        block = Block(index=1, transactions=node.unconfirmed_transactions, previous_hash=node.last_block.hash)
+        BlockChain.proof_of_work(block=block, target=BlockChain.initial_target())
+        response = self.client.post('/compact_block', content_type='application/json',
+                                    data=json.dumps(CompactBlock.to_json(block=block)))
+
+        self.assertEqual(response.status_code, expected_status_code)
+        self.assertEqual(node.last_block.hash, block.hash)
+
+    def test_compact_block_missing_transactions_ok(self):
+        expected_status_code = 200
+        expected_body = {'missing': [0]}
+
+        block = Block(index=1, transactions=[{'id': 1, 'value': 1, 'timestamp': 1.0}],
+                      previous_hash=node.last_block.hash)
+        BlockChain.proof_of_work(block=block, target=BlockChain.initial_target())
+        response = self.client.post('/compact_block', content_type='application/json',
+                                    data=json.dumps(CompactBlock.to_json(block=block)))
+        missing_transactions = {'hash': block.hash, 'positions': [0], 'transactions': block.transactions}
+        completed = self.client.post('/compact_block/transactions', content_type='application/json',
+                                     data=json.dumps(missing_transactions))
+
+        self.assertEqual(response.status_code, expected_status_code)
+        self.assertEqual(json.loads(response.data), expected_body)
+        self.assertEqual(completed.status_code, 201)
+        self.assertEqual(node.last_block.hash, block.hash)
+
+    def test_compact_block_invalid_ko(self):
+        expected_status_code = 400
+
+        for body in ({}, {'short_ids': []}, [], 5):
+            with self.subTest(body=body):
+                response = self.client.post('/compact_block', content_type='application/json', data=json.dumps(body))
+
+                self.assertEqual(response.status_code, expected_status_code)
+
     def test_add_block_ok(self):
         expected_status_code = 201
         expected_data = b'Added block successfully'
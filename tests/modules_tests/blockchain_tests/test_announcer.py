@@ -0,0 +1,80 @@
+import threading
+import unittest
+from unittest import mock
+
+import requests
+
+from bychain.modules.blockchain.announcer import BlockAnnouncer
+
+
+class ResponseMock(object):
+
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+class TestBlockAnnouncer(unittest.TestCase):
+
+    def test_announce_stats(self):
+        expected_stats = {
+            'node2': {'delivered': 1, 'rejected': 0, 'failed': 0, 'last_latency': mock.ANY,
+                      'average_latency': mock.ANY},
+            'node3': {'delivered': 0, 'rejected': 1, 'failed': 0, 'last_latency': mock.ANY,
+                      'average_latency': mock.ANY},
+            'node4': {'delivered': 0, 'rejected': 0, 'failed': 1, 'last_latency': None, 'average_latency': None}
+        }
+
+        def post(url, **kwargs):
+            if url.startswith('http://node4'):
+                raise requests.ConnectionError()
+            return ResponseMock(status_code=201 if url.startswith('http://node2') else 400)
+
+        announcer = BlockAnnouncer(workers=3)
+        with mock.patch('requests.Session.post', side_effect=post):
+            futures = announcer.announce(peers=['node2', 'node3', 'node4'], path='/add_block', data=b'block',
+                                         headers={})
+            flushed = announcer.flush(timeout=5)
+        announcer.close()
+
+        self.assertEqual(flushed, True)
+        self.assertEqual([future.result() for future in futures], [True, False, False])
+        self.assertEqual(announcer.stats, expected_stats)
+
+    def test_announce_does_not_wait_for_slow_peers(self):
+        release = threading.Event()
+
+        def post(url, **kwargs):
+            if url.startswith('http://slow'):
+                release.wait(timeout=5)
+            return ResponseMock(status_code=201)
+
+        announcer = BlockAnnouncer(workers=2)
+        with mock.patch('requests.Session.post', side_effect=post):
+            futures = announcer.announce(peers=['slow', 'fast'], path='/add_block', data=b'block', headers={})
+            fast_delivered = futures[1].result(timeout=5)
+            flushed_early = announcer.flush(timeout=0.01)
+            release.set()
+            flushed = announcer.flush(timeout=5)
+        announcer.close()
+
+        self.assertEqual(fast_delivered, True)
+        self.assertEqual(flushed_early, False)
+        self.assertEqual(flushed, True)
+        self.assertEqual(announcer.stats['slow']['delivered'], 1)
+
+    def test_session_reused(self):
+        announcer = BlockAnnouncer(workers=1)
+        sessions = set()
+
+        def post(session, url, **kwargs):
+            sessions.add(id(session))
+            return ResponseMock(status_code=201)
+
+        with mock.patch('requests.Session.post', autospec=True, side_effect=post):
+            announcer.announce(peers=['node2'], path='/add_block', data=b'block_1', headers={})
+            announcer.announce(peers=['node2'], path='/add_block', data=b'block_2', headers={})
+            announcer.flush(timeout=5)
+        announcer.close()
+
+        self.assertEqual(len(sessions), 1)
+        self.assertEqual(announcer.stats['node2']['delivered'], 2)
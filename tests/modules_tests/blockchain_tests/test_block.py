@@ -1,7 +1,9 @@
 import unittest
 from datetime import datetime
+from unittest import mock
 
 from bychain.modules.blockchain.block import Block
+from bychain.modules.blockchain.serialization import BinarySerializer, SerializationError
 
 
 class TestBlock(unittest.TestCase):
@@ -24,7 +26,7 @@ class TestBlock(unittest.TestCase):
 
     def test_to_json(self):
         expected_index = 1
-        expected_hash = '1cc635207b0ba327387d15e11e9d65a9e8439a850384063ebb1e2e07d37a9aa6'
+        expected_hash = '8e8c2c9d982062f80394f072f31fec0c8e85a2bcf9060d72a4df3b0409b4c30d'
         expected_transactions = []
         expected_previous_hash = '01234'
         expected_timestamp = datetime.utcnow().timestamp()
@@ -43,8 +45,112 @@ class TestBlock(unittest.TestCase):
         self.assertEqual(block_dict['hash'], expected_hash)
 
     def test_hash(self):
-        expected_hash = '1cc635207b0ba327387d15e11e9d65a9e8439a850384063ebb1e2e07d37a9aa6'
+        expected_hash = '8e8c2c9d982062f80394f072f31fec0c8e85a2bcf9060d72a4df3b0409b4c30d'
 
         block = Block(index=1, transactions=[], previous_hash='01234', timestamp=123456)
 
         self.assertEqual(block.hash, expected_hash)
+
+    def test_header(self):
+        expected_header_size = 88
+
+        block = Block(index=1, transactions=[{'id': 'transaction_1', 'value': 1}], previous_hash='01234',
+                      timestamp=123456)
+        empty_block = Block(index=1, transactions=[], previous_hash='01234', timestamp=123456)
+
+        self.assertEqual(len(block.header), expected_header_size)
+        self.assertEqual(len(empty_block.header), expected_header_size)
+        self.assertNotEqual(block.hash, empty_block.hash)
+        self.assertTrue(block.header.startswith(block.header_prefix))
+
+    def test_hash_changes_with_nonce(self):
+        block = Block(index=1, transactions=[], previous_hash='01234', timestamp=123456)
+        next_block = Block(index=1, transactions=[], previous_hash='01234', timestamp=123456, nonce=block.nonce + 1)
+
+        self.assertNotEqual(next_block.hash, block.hash)
+
+    def test_immutable(self):
+        block = Block(index=1, transactions=[{'id': 'transaction_1', 'value': 1}], previous_hash='01234',
+                      timestamp=123456)
+
+        with self.assertRaises(AttributeError):
+            block.index = 2
+        with self.assertRaises(AttributeError):
+            block.nonce = 0
+        with self.assertRaises(AttributeError):
+            block.extra = 'extra'
+        with self.assertRaises(TypeError):
+            block.transactions[0]['value'] = 2
+
+    def test_transactions_not_shared_with_input(self):
+        transactions = [{'id': 'transaction_1', 'value': 1}]
+
+        block = Block(index=1, transactions=transactions, previous_hash='01234', timestamp=123456)
+        first_hash = block.hash
+        transactions[0]['value'] = 2
+        transactions.append({'id': 'transaction_2', 'value': 2})
+
+        self.assertEqual(block.transactions, [{'id': 'transaction_1', 'value': 1}])
+        self.assertEqual(block.hash, first_hash)
+
+    def test_encode_decode(self):
+        block = Block(index=1, transactions=[{'id': 'transaction_1', 'value': 1.5}], previous_hash='01234',
+                      timestamp=123456.5, nonce=42)
+
+        decoded_block = Block.decode(block.encode())
+
+        self.assertEqual(Block.to_json(decoded_block), Block.to_json(block))
+        self.assertEqual(decoded_block.hash, block.hash)
+
+    def test_decode_invalid_ko(self):
+        block = Block(index=1, transactions=[], previous_hash='01234', timestamp=123456)
+
+        with self.assertRaises(SerializationError):
+            Block.decode(block.encode()[:-1])
+        with self.assertRaises(SerializationError):
+            Block.decode(b'')
+
+    def test_decode_non_dict_transaction_ko(self):
+        data = bytearray(Block.ENCODED_FORMAT.pack(BinarySerializer.VERSION, 1, 123456, 0))
+        BinarySerializer.encode_value(data, '01234')
+        BinarySerializer.encode_value(data, [{'id': 'transaction_1', 'value': 1}, 5])
+
+        with self.assertRaises(SerializationError):
+            Block.decode(bytes(data))
+
+    def test_evict_body(self):
+        expected_transactions = [{'id': 'transaction_1', 'value': 1}]
+        block = Block(index=1, transactions=expected_transactions, previous_hash='0', timestamp=123456)
+        expected_hash = block.hash
+
+        block.evict_body(body_loader=lambda: expected_transactions)
+        body_loaded = block.body_loaded
+
+        self.assertFalse(body_loaded)
+        self.assertEqual(block.transactions, expected_transactions)
+        self.assertEqual(block.hash, expected_hash)
+
+    def test_evict_body_read_through(self):
+        expected_transactions = [{'id': 'transaction_1', 'value': 1}]
+        block = Block(index=1, transactions=expected_transactions, previous_hash='0', timestamp=123456)
+        body_loader = mock.Mock(return_value=tuple(expected_transactions))
+
+        block.evict_body(body_loader=body_loader, read_through=True)
+        block.transactions
+        block.merkle_tree
+
+        self.assertFalse(block.body_loaded)
+        self.assertEqual(block.transactions, expected_transactions)
+        self.assertEqual(body_loader.call_count, 3)
+
+    def test_evict_body_without_loader(self):
+        block = Block(index=1, transactions=[{'id': 'transaction_1', 'value': 1}], previous_hash='0',
+                      timestamp=123456)
+        expected_hash = block.hash
+
+        block.evict_body()
+
+        self.assertFalse(block.body_available)
+        self.assertEqual(block.hash, expected_hash)
+        with self.assertRaises(LookupError):
+            block.transactions
@@ -1,9 +1,16 @@
+import json
+import os
+import tempfile
+import threading
+import time
 import unittest
 from unittest import mock
 from datetime import datetime
 
 from bychain.modules.blockchain.block import Block
 from bychain.modules.blockchain.blockchain import BlockChain
+from bychain.modules.blockchain.serialization import BinarySerializer, SerializationError
+from bychain.modules.blockchain.store import BlockStore
 
 
 class TestBlockChain(unittest.TestCase):
@@ -38,8 +45,8 @@ class TestBlockChain(unittest.TestCase):
         self.assertEqual(chain.unconfirmed_transactions, expected_unconfirmed_transactions)
 
     def test_proof_of_work(self):
-        expected_hash = '00c7200e876c6f2f93297d37f3253e559adf609a16fffd3c198a0792055f052d'
-        expected_nonce = 148
+        expected_hash = '003b13689608ec6003666a03d6cb2f7c97118761102c38eab609a99bc58a667b'
+        expected_nonce = 284
         expected_unconfirmed_transactions = []
         block = Block(index=1, transactions=[], previous_hash='0', timestamp=123456)
 
@@ -54,12 +61,12 @@ class TestBlockChain(unittest.TestCase):
     def test_add_block_ok(self):
         expected_index = 1
         expected_transactions = []
-        expected_timestamp = 123456
         expected_unconfirmed_transactions = []
 
         chain = BlockChain()
         first_block = chain.last_block
-        block = Block(index=1, transactions=[], previous_hash=chain.last_block.hash, timestamp=123456)
+        expected_timestamp = first_block.timestamp + 1
+        block = Block(index=1, transactions=[], previous_hash=chain.last_block.hash, timestamp=expected_timestamp)
         generated_hash = chain.proof_of_work(block=block)
         expected_chain = [
             {
@@ -75,7 +82,7 @@ class TestBlockChain(unittest.TestCase):
                 'index': 1,
                 'nonce': block.nonce,
                 'previous_hash': chain.last_block.hash,
-                'timestamp': 123456,
+                'timestamp': expected_timestamp,
                 'transactions': []
             }
         ]
@@ -94,13 +101,13 @@ class TestBlockChain(unittest.TestCase):
     def test_add_block_with_transactions_ok(self):
         expected_index = 1
         expected_transactions = [{'id': 'transaction_1', 'value': 1}]
-        expected_timestamp = 123456
         expected_unconfirmed_transactions = []
 
         chain = BlockChain()
         first_block = chain.last_block
+        expected_timestamp = first_block.timestamp + 1
         block = Block(index=1, transactions=[{'id': 'transaction_1', 'value': 1}], previous_hash=chain.last_block.hash,
-                      timestamp=123456)
+                      timestamp=expected_timestamp)
         generated_hash = chain.proof_of_work(block=block)
         expected_chain = [
             {
@@ -116,7 +123,7 @@ class TestBlockChain(unittest.TestCase):
                 'index': 1,
                 'nonce': block.nonce,
                 'previous_hash': chain.last_block.hash,
-                'timestamp': 123456,
+                'timestamp': expected_timestamp,
                 'transactions': [{'id': 'transaction_1', 'value': 1}]
             }
         ]
@@ -166,7 +173,8 @@ class TestBlockChain(unittest.TestCase):
         expected_transactions = []
 
         chain = BlockChain()
-        block = Block(index=1, transactions=[], previous_hash=chain.last_block.hash, timestamp=123456)
+        block = Block(index=1, transactions=[], previous_hash=chain.last_block.hash,
+                      timestamp=chain.last_block.timestamp + 1)
         added = chain.add_block(block=block, proof=block.hash)
         last_block = chain.last_block
 
@@ -188,7 +196,100 @@ class TestBlockChain(unittest.TestCase):
         self.assertEqual(added_1, True)
         self.assertEqual(added_2, True)
         self.assertEqual(chain.unconfirmed_transactions, expected_unconfirmed_transactions)
-        self.assertIsNot(chain._BlockChain__unconfirmed_transactions, chain.unconfirmed_transactions)
+        self.assertIsNot(chain.unconfirmed_transactions, chain.unconfirmed_transactions)
+
+    def test_add_new_transaction_duplicate_ko(self):
+        chain = BlockChain()
+        added_pending = chain.add_new_transaction(transaction={'id': 'transaction_1', 'value': 1})
+        duplicate_pending = chain.add_new_transaction(transaction={'id': 'transaction_1', 'value': 2})
+        chain.mine()
+        duplicate_confirmed = chain.add_new_transaction(transaction={'id': 'transaction_1', 'value': 3})
+        added_string_id = chain.add_new_transaction(transaction={'id': 1, 'value': 1})
+        duplicate_string_id = chain.add_new_transaction(transaction={'id': '1', 'value': 1})
+
+        self.assertEqual(added_pending, True)
+        self.assertEqual(duplicate_pending, False)
+        self.assertEqual(duplicate_confirmed, False)
+        self.assertEqual(added_string_id, True)
+        self.assertEqual(duplicate_string_id, False)
+
+    def test_add_new_transaction_duplicate_after_chain_replacement(self):
+        chain = BlockChain()
+        genesis_json = chain.chain
+        chain.add_new_transaction(transaction={'id': 'transaction_1', 'value': 1})
+        chain.mine()
+        duplicate_confirmed = chain.add_new_transaction(transaction={'id': 'transaction_1', 'value': 1})
+        replacement = [dict(genesis_json[0])]
+        replacement[0].pop('hash')
+        chain.chain = replacement
+        duplicate_restored = chain.add_new_transaction(transaction={'id': 'transaction_1', 'value': 1})
+        chain.mine()
+        chain.chain = replacement
+        chain.mine()
+        added_new = chain.add_new_transaction(transaction={'id': 'transaction_2', 'value': 2})
+
+        self.assertEqual(duplicate_confirmed, False)
+        self.assertEqual(duplicate_restored, False)
+        self.assertEqual(added_new, True)
+        self.assertIsNotNone(chain.find_transaction(transaction_id='transaction_1'))
+
+    def test_add_new_transaction_duplicate_in_store(self):
+        with tempfile.TemporaryDirectory() as path:
+            chain = BlockChain(store=BlockStore(path=path))
+            chain.add_new_transaction(transaction={'id': 'transaction_1', 'value': 1})
+            chain.mine()
+            chain.close()
+            reopened_chain = BlockChain(store=BlockStore(path=path))
+            duplicate = reopened_chain.add_new_transaction(transaction={'id': 'transaction_1', 'value': 1})
+            reopened_chain.close()
+
+        self.assertEqual(duplicate, False)
+
+    @mock.patch.object(BlockChain, 'MEMPOOL_MAX_TRANSACTIONS', 3)
+    def test_add_new_transactions(self):
+        expected_results = [BlockChain.TRANSACTION_ADDED, BlockChain.TRANSACTION_INVALID,
+                            BlockChain.TRANSACTION_DUPLICATE, BlockChain.TRANSACTION_INVALID,
+                            BlockChain.TRANSACTION_ADDED, BlockChain.TRANSACTION_ADDED,
+                            BlockChain.TRANSACTION_REJECTED]
+
+        chain = BlockChain()
+        results = chain.add_new_transactions(transactions=[
+            {'id': 'transaction_1', 'value': 1, 'fee': 1},
+            {'id': 'transaction_2'},
+            {'id': 'transaction_1', 'value': 1},
+            None,
+            {'id': 'transaction_3', 'value': 3, 'fee': 1},
+            {'id': 'transaction_4', 'value': 4, 'fee': 1},
+            {'id': 'transaction_5', 'value': 5}
+        ])
+
+        self.assertEqual(results, expected_results)
+        self.assertEqual([transaction['id'] for transaction in chain.unconfirmed_transactions],
+                         ['transaction_1', 'transaction_3', 'transaction_4'])
+
+    def test_pending_summary(self):
+        now = datetime.utcnow().timestamp()
+        chain = BlockChain()
+        empty_summary = chain.pending_summary
+        chain.add_new_transactions(transactions=[{'id': 'transaction_1', 'value': 1, 'timestamp': now},
+                                                 {'id': 'transaction_2', 'value': 2, 'timestamp': now - 60}],
+                                   relayed=True)
+
+        self.assertEqual(empty_summary, (0, None))
+        self.assertEqual(chain.pending_summary, (2, now - 60))
+
+    def test_add_new_transactions_relayed_future_timestamp_ko(self):
+        expected_results = [BlockChain.TRANSACTION_ADDED, BlockChain.TRANSACTION_INVALID]
+
+        now = datetime.utcnow().timestamp()
+        chain = BlockChain()
+        results = chain.add_new_transactions(transactions=[
+            {'id': 'transaction_1', 'value': 1, 'timestamp': now + BlockChain.MAX_FUTURE_BLOCK_TIME - 60},
+            {'id': 'transaction_2', 'value': 2, 'timestamp': now + BlockChain.MAX_FUTURE_BLOCK_TIME + 60}
+        ], relayed=True)
+
+        self.assertEqual(results, expected_results)
+        self.assertEqual([transaction['id'] for transaction in chain.unconfirmed_transactions], ['transaction_1'])
 
     def test_add_new_transaction_missing_required_fields_ko(self):
         chain = BlockChain()
@@ -209,7 +310,7 @@ class TestBlockChain(unittest.TestCase):
 
         self.assertEqual(added_1, True)
         self.assertEqual(added_2, False)
-        self.assertEqual(chain._BlockChain__unconfirmed_transactions, expected_transactions)
+        self.assertEqual(chain.unconfirmed_transactions, expected_transactions)
 
     def test_mine(self):
         expected_index = 1
@@ -230,7 +331,8 @@ class TestBlockChain(unittest.TestCase):
 
     def test_validate_chain_ok(self):
         chain = BlockChain()
-        block = Block(index=1, transactions=[], previous_hash=chain.last_block.hash, timestamp=123456)
+        block = Block(index=1, transactions=[], previous_hash=chain.last_block.hash,
+                      timestamp=chain.last_block.timestamp + 1)
         chain.add_block(block=block, proof=block.hash)
         is_valid = chain.validate_chain(chain=chain.chain)
 
@@ -250,7 +352,8 @@ class TestBlockChain(unittest.TestCase):
 
     def test_validate_chain_invalid_previous_hash_ko(self):
         chain = BlockChain()
-        block = Block(index=1, transactions=[], previous_hash=chain.last_block.hash, timestamp=123456)
+        block = Block(index=1, transactions=[], previous_hash=chain.last_block.hash,
+                      timestamp=chain.last_block.timestamp + 1)
         chain.proof_of_work(block=block)
         chain.add_block(block=block, proof=block.hash)
         chain_json = chain.chain
@@ -261,7 +364,8 @@ class TestBlockChain(unittest.TestCase):
 
     def test_validate_chain_invalid_proof_hash_ko(self):
         chain = BlockChain()
-        block = Block(index=1, transactions=[], previous_hash=chain.last_block.hash, timestamp=123456)
+        block = Block(index=1, transactions=[], previous_hash=chain.last_block.hash,
+                      timestamp=chain.last_block.timestamp + 1)
         chain.proof_of_work(block=block)
         chain.add_block(block=block, proof=block.hash)
         chain_json = chain.chain
@@ -270,3 +374,429 @@ class TestBlockChain(unittest.TestCase):
 
         self.assertEqual(is_valid, False)
 
+
+    def test_encode_decode_chain(self):
+        chain = BlockChain()
+        chain.add_new_transaction(transaction={'id': 'transaction_1', 'value': 1})
+        chain.mine()
+
+        decoded_chain = BlockChain.decode_chain(data=chain.encode_chain())
+
+        self.assertEqual(decoded_chain, chain.chain)
+        self.assertEqual(chain.validate_chain(chain=decoded_chain), True)
+
+    @mock.patch.object(BlockChain, 'RETARGET_INTERVAL', 2)
+    def test_retarget_fast_blocks(self):
+        chain = BlockChain()
+        initial_target = chain.next_target
+        genesis_timestamp = chain.last_block.timestamp
+        block = Block(index=1, transactions=[], previous_hash=chain.last_block.hash, timestamp=genesis_timestamp + 1)
+        chain.proof_of_work(block=block, target=chain.next_target)
+        chain.add_block(block=block, proof=block.hash)
+
+        self.assertEqual(chain.next_target, initial_target // 4)
+        self.assertEqual(chain.difficulty, chain.DIFFICULTY_BITS + 2)
+        self.assertEqual(chain.validate_chain(chain=chain.chain), True)
+
+    @mock.patch.object(BlockChain, 'RETARGET_INTERVAL', 2)
+    def test_add_block_below_expected_difficulty_ko(self):
+        chain = BlockChain()
+        genesis_timestamp = chain.last_block.timestamp
+        block = Block(index=1, transactions=[], previous_hash=chain.last_block.hash, timestamp=genesis_timestamp + 1)
+        chain.proof_of_work(block=block, target=chain.next_target)
+        chain.add_block(block=block, proof=block.hash)
+        easy_block = Block(index=2, transactions=[], previous_hash=chain.last_block.hash,
+                           timestamp=genesis_timestamp + 2)
+        chain.proof_of_work(block=easy_block, target=chain.initial_target())
+        while int(easy_block.hash, 16) < chain.next_target:
+            easy_block = Block(index=2, transactions=[], previous_hash=easy_block.previous_hash,
+                               timestamp=easy_block.timestamp, nonce=easy_block.nonce + 1)
+            chain.proof_of_work(block=easy_block, target=chain.initial_target())
+
+        added = chain.add_block(block=easy_block, proof=easy_block.hash)
+
+        self.assertEqual(added, False)
+        self.assertEqual(chain.last_block.index, 1)
+
+    def test_mine_interrupted_keeps_mempool(self):
+        expected_unconfirmed_transactions = [{'id': 'transaction_1', 'value': 1, 'timestamp': mock.ANY}]
+        results = []
+
+        chain = BlockChain()
+        chain.add_new_transaction(transaction={'id': 'transaction_1', 'value': 1})
+        with mock.patch.object(BlockChain, 'next_target', new_callable=mock.PropertyMock, return_value=1):
+            miner_thread = threading.Thread(target=lambda: results.append(chain.mine()))
+            miner_thread.start()
+            while not chain.mining and miner_thread.is_alive():
+                time.sleep(.01)
+            chain.interrupt_mining()
+            miner_thread.join(timeout=5)
+
+        self.assertFalse(miner_thread.is_alive())
+        self.assertEqual(results, [None])
+        self.assertFalse(chain.mining)
+        self.assertEqual(chain.last_block.index, 0)
+        self.assertEqual(chain.unconfirmed_transactions, expected_unconfirmed_transactions)
+
+    def test_add_block_interrupts_mining(self):
+        chain = BlockChain()
+        block = Block(index=1, transactions=[], previous_hash=chain.last_block.hash,
+                      timestamp=chain.last_block.timestamp + 1)
+        chain.proof_of_work(block=block)
+
+        with mock.patch.object(chain, 'interrupt_mining') as mock_interrupt:
+            chain.add_block(block=block, proof=block.hash)
+
+        mock_interrupt.assert_called_once_with()
+
+    def test_add_block_removes_confirmed_transactions(self):
+        expected_unconfirmed_transactions = [{'id': 'transaction_2', 'value': 2, 'timestamp': mock.ANY}]
+
+        chain = BlockChain()
+        chain.add_new_transaction(transaction={'id': 'transaction_1', 'value': 1})
+        chain.add_new_transaction(transaction={'id': 'transaction_2', 'value': 2})
+        block = Block(index=1, transactions=[{'id': 'transaction_1', 'value': 1, 'timestamp': 1.0}],
+                      previous_hash=chain.last_block.hash, timestamp=chain.last_block.timestamp + 1)
+        chain.proof_of_work(block=block)
+        chain.add_block(block=block, proof=block.hash)
+
+        self.assertEqual(chain.unconfirmed_transactions, expected_unconfirmed_transactions)
+
+    def test_chain_replacement_restores_dropped_transactions(self):
+        expected_unconfirmed_transactions = [{'id': 'transaction_1', 'value': 1, 'timestamp': mock.ANY}]
+
+        chain = BlockChain()
+        genesis_json = chain.chain
+        chain.add_new_transaction(transaction={'id': 'transaction_1', 'value': 1})
+        chain.mine()
+        replacement = [dict(genesis_json[0])]
+        replacement[0].pop('hash')
+        chain.chain = replacement
+
+        self.assertEqual(chain.last_block.index, 0)
+        self.assertEqual(chain.unconfirmed_transactions, expected_unconfirmed_transactions)
+
+    def test_add_new_transaction_invalid_fee_ko(self):
+        chain = BlockChain()
+        added_1 = chain.add_new_transaction(transaction={'id': 'transaction_1', 'value': 1, 'fee': -1})
+        added_2 = chain.add_new_transaction(transaction={'id': 'transaction_2', 'value': 1, 'fee': 'high'})
+        added_3 = chain.add_new_transaction(transaction={'id': 'transaction_3', 'value': 1, 'fee': 2})
+
+        self.assertEqual(added_1, False)
+        self.assertEqual(added_2, False)
+        self.assertEqual(added_3, True)
+
+    @mock.patch.object(BlockChain, 'MAX_BLOCK_TRANSACTIONS', 2)
+    def test_mine_selects_best_transactions(self):
+        expected_mined_ids = ['transaction_2', 'transaction_3']
+        expected_pending_ids = ['transaction_1', 'transaction_4']
+
+        chain = BlockChain()
+        chain.add_new_transaction(transaction={'id': 'transaction_1', 'value': 1})
+        chain.add_new_transaction(transaction={'id': 'transaction_2', 'value': 2, 'fee': 5})
+        chain.add_new_transaction(transaction={'id': 'transaction_3', 'value': 3, 'fee': 1})
+        chain.add_new_transaction(transaction={'id': 'transaction_4', 'value': 4})
+        mined_block = chain.mine()
+
+        self.assertEqual([transaction['id'] for transaction in mined_block.transactions], expected_mined_ids)
+        self.assertEqual([transaction['id'] for transaction in chain.unconfirmed_transactions], expected_pending_ids)
+
+    @mock.patch.object(BlockChain, 'MEMPOOL_MAX_TRANSACTIONS', 1)
+    def test_add_new_transaction_mempool_full_ko(self):
+        chain = BlockChain()
+        added_1 = chain.add_new_transaction(transaction={'id': 'transaction_1', 'value': 1, 'fee': 1})
+        added_2 = chain.add_new_transaction(transaction={'id': 'transaction_2', 'value': 2})
+
+        self.assertEqual(added_1, True)
+        self.assertEqual(added_2, False)
+        self.assertEqual(chain.mempool_stats['rejected'], 1)
+
+    def test_block_lookups(self):
+        chain = BlockChain()
+        chain.add_new_transaction(transaction={'id': 'transaction_1', 'value': 1})
+        mined_block = chain.mine()
+
+        self.assertIs(chain.block_at(height=1), mined_block)
+        self.assertIs(chain.block_by_hash(block_hash=mined_block.hash), mined_block)
+        self.assertIsNone(chain.block_at(height=2))
+        self.assertIsNone(chain.block_by_hash(block_hash='unknown'))
+
+    def test_find_transaction_after_chain_replacement(self):
+        chain = BlockChain()
+        genesis_json = chain.chain
+        chain.add_new_transaction(transaction={'id': 'transaction_1', 'value': 1})
+        mined_block = chain.mine()
+        found = chain.find_transaction(transaction_id='transaction_1')
+        replacement = [dict(genesis_json[0])]
+        replacement[0].pop('hash')
+        chain.chain = replacement
+
+        self.assertEqual(found, (mined_block, 0))
+        self.assertIsNone(chain.find_transaction(transaction_id='transaction_1'))
+        self.assertIsNone(chain.block_by_hash(block_hash=mined_block.hash))
+
+    def test_serialized_ranges_cached(self):
+        chain = BlockChain()
+        chain.add_new_transaction(transaction={'id': 'transaction_1', 'value': 1})
+        chain.mine()
+
+        with mock.patch.object(Block, 'to_json', wraps=Block.to_json) as mock_to_json:
+            length, count, json_blocks = chain.json_range(start=1)
+            first_read = list(json_blocks)
+            second_read = list(chain.json_range(start=1)[2])
+        _, _, encoded_blocks = chain.encoded_range()
+
+        self.assertEqual((length, count, chain.length), (2, 1, 2))
+        self.assertEqual(first_read, second_read)
+        self.assertEqual(json.loads(first_read[0]), chain.chain[1])
+        self.assertEqual(mock_to_json.call_count, 1)
+        self.assertEqual(list(encoded_blocks), [block.encode() for block in (chain.block_at(0), chain.block_at(1))])
+
+    def test_serialized_ranges_reset_on_chain_replacement(self):
+        chain = BlockChain()
+        genesis_json = chain.chain
+        chain.add_new_transaction(transaction={'id': 'transaction_1', 'value': 1})
+        chain.mine()
+        list(chain.json_range()[2])
+        replacement = [dict(genesis_json[0])]
+        replacement[0].pop('hash')
+        chain.chain = replacement
+
+        length, count, json_blocks = chain.json_range()
+
+        self.assertEqual((length, count, chain.length), (1, 1, 1))
+        self.assertEqual([json.loads(json_block) for json_block in json_blocks], genesis_json)
+
+    @mock.patch.object(BlockChain, 'LOCATOR_DENSE_BLOCKS', 2)
+    def test_locator_and_locate(self):
+        expected_heights = [10, 9, 7, 3, 0]
+
+        chain = BlockChain()
+        for transaction_id in range(1, 11):
+            chain.add_new_transaction(transaction={'id': transaction_id, 'value': 1})
+            chain.mine()
+        locator = chain.locator()
+
+        self.assertEqual(locator, [chain.block_at(height=height).hash for height in expected_heights])
+        self.assertEqual(chain.locate(locator=['unknown'] + locator[2:]), 7)
+        self.assertEqual(chain.locate(locator=['unknown']), -1)
+
+    @staticmethod
+    def __extend(chain, timestamps):
+        for timestamp in timestamps:
+            block = Block(index=chain.last_block.index + 1, transactions=[], previous_hash=chain.last_block.hash,
+                          timestamp=timestamp)
+            chain.proof_of_work(block=block, target=chain.next_target)
+            chain.add_block(block=block, proof=block.hash)
+
+    def test_add_block_timestamp_below_median_ko(self):
+        chain = BlockChain()
+        genesis_timestamp = chain.last_block.timestamp
+        self.__extend(chain=chain, timestamps=[genesis_timestamp + 1, genesis_timestamp + 2])
+        block = Block(index=3, transactions=[], previous_hash=chain.last_block.hash, timestamp=genesis_timestamp + 1)
+        chain.proof_of_work(block=block, target=chain.next_target)
+
+        added = chain.add_block(block=block, proof=block.hash)
+
+        self.assertEqual(added, False)
+        self.assertEqual(chain.length, 3)
+
+    def test_time_warp_ko(self):
+        chain = BlockChain()
+        warped = Block(index=1, transactions=[], previous_hash=chain.last_block.hash,
+                       timestamp=chain.last_block.timestamp + 10 ** 6)
+        chain.proof_of_work(block=warped, target=chain.next_target)
+
+        added = chain.add_block(block=warped, proof=warped.hash)
+        result = BlockChain.check_chain(chain=chain.chain + [Block.to_json(warped)])
+
+        self.assertEqual(added, False)
+        self.assertEqual(result.failed_height, 1)
+        self.assertEqual(result.reason, 'invalid_timestamp')
+
+    @mock.patch.object(BlockChain, 'RETARGET_INTERVAL', 2)
+    def test_reorganize_prefers_work_over_length(self):
+        chain = BlockChain()
+        genesis_timestamp = chain.last_block.timestamp
+        heavier_chain = BlockChain()
+        heavier_chain.chain = chain.chain
+        self.__extend(chain=heavier_chain, timestamps=[genesis_timestamp + 1, genesis_timestamp + 2])
+        self.__extend(chain=chain, timestamps=[genesis_timestamp + 100, genesis_timestamp + 200,
+                                               genesis_timestamp + 300])
+
+        result = chain.check_suffix(suffix=heavier_chain.chain[1:])
+        reorganized = chain.reorganize(suffix=heavier_chain.chain[1:])
+
+        self.assertTrue(heavier_chain.work > 4 * 2 ** 8)
+        self.assertEqual(result.work, heavier_chain.work)
+        self.assertEqual(reorganized, True)
+        self.assertEqual(chain.chain, heavier_chain.chain)
+        self.assertEqual(chain.work, heavier_chain.work)
+
+    @mock.patch.object(BlockChain, 'RETARGET_INTERVAL', 2)
+    def test_reorganize_longer_lighter_suffix_ko(self):
+        chain = BlockChain()
+        genesis_timestamp = chain.last_block.timestamp
+        longer_chain = BlockChain()
+        longer_chain.chain = chain.chain
+        self.__extend(chain=longer_chain, timestamps=[genesis_timestamp + 100, genesis_timestamp + 200,
+                                                      genesis_timestamp + 300])
+        self.__extend(chain=chain, timestamps=[genesis_timestamp + 1, genesis_timestamp + 2])
+
+        reorganized = chain.reorganize(suffix=longer_chain.chain[1:])
+
+        self.assertTrue(longer_chain.length > chain.length)
+        self.assertTrue(longer_chain.work < chain.work)
+        self.assertEqual(reorganized, False)
+        self.assertEqual(chain.length, 3)
+
+    def test_check_suffix_unknown_fork_ko(self):
+        chain = BlockChain()
+        other_chain = BlockChain()
+        other_chain.add_new_transaction(transaction={'id': 'transaction_1', 'value': 1})
+        other_chain.mine()
+
+        result = chain.check_suffix(suffix=other_chain.chain[1:])
+        reorganized = chain.reorganize(suffix=other_chain.chain[1:])
+
+        self.assertEqual(result.reason, 'broken_link')
+        self.assertEqual(reorganized, False)
+        self.assertEqual(chain.length, 1)
+
+    def test_check_suffix_unhashable_previous_hash_ko(self):
+        chain = BlockChain()
+        chain.add_new_transaction(transaction={'id': 'transaction_1', 'value': 1})
+        chain.mine()
+
+        for previous_hash in (['0'], {'hash': '0'}, None):
+            with self.subTest(previous_hash=previous_hash):
+                suffix = chain.chain[1:]
+                suffix[0]['previous_hash'] = previous_hash
+
+                result = chain.check_suffix(suffix=suffix)
+
+                self.assertEqual(result.valid, False)
+                self.assertEqual(result.reason, 'malformed')
+
+    def test_add_block_checkpoint_mismatch_ko(self):
+        chain = BlockChain()
+        block = Block(index=1, transactions=[], previous_hash=chain.last_block.hash,
+                      timestamp=chain.last_block.timestamp + 1)
+        chain.proof_of_work(block=block, target=chain.next_target)
+
+        with mock.patch.object(BlockChain, 'CHECKPOINTS', {1: 'f' * 64}):
+            added = chain.add_block(block=block, proof=block.hash)
+
+        self.assertEqual(added, False)
+
+    def test_chain_tampered_below_checkpoint_ko(self):
+        chain = BlockChain()
+        for transaction_id in ('transaction_1', 'transaction_2', 'transaction_3'):
+            chain.add_new_transaction(transaction={'id': transaction_id, 'value': 1})
+            chain.mine()
+        forged = chain.chain
+        forged[2]['transactions'] = [{'id': 'evil', 'value': 1000000, 'timestamp': 1.0}]
+
+        with mock.patch.object(BlockChain, 'CHECKPOINTS', {3: forged[3]['hash']}):
+            result = BlockChain.check_chain(chain=forged)
+
+        self.assertEqual(result.valid, False)
+        self.assertEqual(result.failed_height, 2)
+
+    def test_snapshot_round_trip(self):
+        chain = BlockChain()
+        for transaction_id in ('transaction_1', 'transaction_2', 'transaction_3'):
+            chain.add_new_transaction(transaction={'id': transaction_id, 'value': 1})
+            chain.mine()
+        checkpoints = {2: chain.block_at(height=2).hash}
+
+        with tempfile.TemporaryDirectory() as directory, mock.patch.object(BlockChain, 'CHECKPOINTS', checkpoints):
+            path = os.path.join(directory, 'snapshot.dat')
+            exported_height = chain.export_snapshot(path=path)
+            bootstrapped_chain = BlockChain(snapshot=path)
+            body_loaded = bootstrapped_chain.last_block.body_loaded
+
+            found_block, position = bootstrapped_chain.find_transaction(transaction_id='transaction_2')
+            self.assertEqual(exported_height, 2)
+            self.assertEqual(bootstrapped_chain.length, 3)
+            self.assertFalse(body_loaded)
+            self.assertEqual((found_block.index, position), (2, 0))
+            self.assertIsNone(bootstrapped_chain.find_transaction(transaction_id='transaction_3'))
+            self.assertEqual(bootstrapped_chain.chain, chain.chain[:3])
+
+    def test_snapshot_without_checkpoint_ko(self):
+        chain = BlockChain()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'snapshot.dat')
+            with mock.patch.object(BlockChain, 'CHECKPOINTS', {0: chain.last_block.hash}):
+                chain.export_snapshot(path=path)
+
+            exported_height = chain.export_snapshot(path=os.path.join(directory, 'other.dat'))
+            with self.assertRaises(SerializationError):
+                BlockChain(snapshot=path)
+
+        self.assertIsNone(exported_height)
+
+    def test_snapshot_tampered_body_ko(self):
+        chain = BlockChain()
+        chain.add_new_transaction(transaction={'id': 'transaction_1', 'value': 1})
+        mined_block = chain.mine()
+        tampered_block = Block(index=1, transactions=[{'id': 'transaction_1', 'value': 100, 'timestamp': 1.0}],
+                               previous_hash=mined_block.previous_hash, timestamp=mined_block.timestamp,
+                               nonce=mined_block.nonce)
+
+        with tempfile.TemporaryDirectory() as directory, \
+                mock.patch.object(BlockChain, 'CHECKPOINTS', {1: mined_block.hash}):
+            path = os.path.join(directory, 'snapshot.dat')
+            chain.export_snapshot(path=path)
+            with open(path, 'rb') as snapshot_file:
+                entries = BinarySerializer.decode_blocks(snapshot_file.read())
+            with open(path, 'wb') as snapshot_file:
+                snapshot_file.write(BinarySerializer.encode_blocks(entries[:2] + [tampered_block.encode()]))
+            bootstrapped_chain = BlockChain(snapshot=path)
+
+            self.assertEqual(bootstrapped_chain.last_block.hash, mined_block.hash)
+            with self.assertRaises(SerializationError):
+                bootstrapped_chain.last_block.transactions
+
+    @mock.patch.object(BlockChain, 'PRUNE_DEPTH', 1)
+    @mock.patch.object(BlockChain, 'PRUNE_MODE', BlockChain.PRUNE_FULL)
+    @mock.patch.object(BlockChain, 'HEADERS_PER_REQUEST', 2)
+    def test_headers_range(self):
+        chain = BlockChain()
+        for transaction_id in ('transaction_1', 'transaction_2', 'transaction_3'):
+            chain.add_new_transaction(transaction={'id': transaction_id, 'value': 1})
+            chain.mine()
+
+        length, headers = chain.headers_range(start=1)
+        _, last_headers = chain.headers_range(start=3, stop=10)
+
+        self.assertEqual(length, 4)
+        self.assertEqual([header['index'] for header in headers], [1, 2])
+        self.assertEqual(headers[0], Block.header_to_json(chain.block_at(height=1)))
+        self.assertEqual(headers[1]['previous_hash'], headers[0]['hash'])
+        self.assertEqual([header['index'] for header in last_headers], [3])
+
+    @mock.patch.object(BlockChain, 'PRUNE_DEPTH', 1)
+    @mock.patch.object(BlockChain, 'PRUNE_MODE', BlockChain.PRUNE_FULL)
+    def test_full_prune(self):
+        chain = BlockChain()
+        genesis_json = chain.chain
+        for transaction_id in ('transaction_1', 'transaction_2', 'transaction_3'):
+            chain.add_new_transaction(transaction={'id': transaction_id, 'value': 1})
+            chain.mine()
+        replacement = [dict(genesis_json[0])]
+        replacement[0].pop('hash')
+
+        _, count, json_blocks = chain.json_range(start=chain.pruned_height)
+        reorganized = chain.reorganize(suffix=[])
+        chain.chain = replacement
+
+        self.assertEqual(chain.pruned_height, 3)
+        self.assertEqual(count, 1)
+        self.assertEqual(json.loads(next(json_blocks))['index'], 3)
+        self.assertFalse(chain.block_at(height=2).body_available)
+        self.assertIsNone(chain.find_transaction(transaction_id='transaction_2'))
+        self.assertEqual(chain.find_transaction(transaction_id='transaction_3')[1], 0)
+        self.assertEqual(reorganized, False)
+        self.assertEqual(chain.length, 4)
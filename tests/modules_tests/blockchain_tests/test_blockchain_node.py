@@ -1,5 +1,7 @@
 import copy
 import json
+import threading
+import time
 import unittest
 from unittest import mock
 from datetime import datetime
@@ -7,13 +9,19 @@ from datetime import datetime
 from bychain.modules.blockchain.node import BlockChainNode
 from bychain.modules.blockchain.block import Block
 from bychain.modules.blockchain.blockchain import BlockChain
+from bychain.modules.blockchain.compact import CompactBlock
+from bychain.modules.blockchain.merkle import MerkleTree
+from bychain.modules.blockchain.scheduler import MiningJob
+from bychain.modules.blockchain.serialization import CONTENT_TYPE_BINARY, CONTENT_TYPE_JSON
 
 
 class ResponseMock(object):
 
-    def __init__(self, status_code, body):
+    def __init__(self, status_code, body, headers=None, content=None):
         self.status_code = status_code
         self.body = body
+        self.headers = headers or {'Content-Type': 'application/json'}
+        self.content = content
 
     def json(self):
         return self.body
@@ -29,6 +37,7 @@ class TestBlockChainNode(unittest.TestCase):
     def tearDown(self) -> None:
         super().tearDown()
         BlockChainNode.clear()
+        BlockChainNode.WIRE_CONTENT_TYPE = CONTENT_TYPE_JSON
 
     def test_initialization(self):
         expected_index = 0
@@ -76,13 +85,13 @@ class TestBlockChainNode(unittest.TestCase):
     def test_add_block_ok(self):
         expected_index = 1
         expected_transactions = []
-        expected_timestamp = 123456
         expected_unconfirmed_transactions = []
 
         node = BlockChainNode()
         chain = BlockChain()
         first_block = node.last_block
-        block = Block(index=1, transactions=[], previous_hash=node.last_block.hash, timestamp=123456)
+        expected_timestamp = first_block.timestamp + 1
+        block = Block(index=1, transactions=[], previous_hash=node.last_block.hash, timestamp=expected_timestamp)
         generated_hash = chain.proof_of_work(block=block)
         expected_chain = [
             {
@@ -98,7 +107,7 @@ class TestBlockChainNode(unittest.TestCase):
                 'index': 1,
                 'nonce': block.nonce,
                 'previous_hash': node.last_block.hash,
-                'timestamp': 123456,
+                'timestamp': expected_timestamp,
                 'transactions': []
             }
         ]
@@ -131,8 +140,18 @@ class TestBlockChainNode(unittest.TestCase):
         self.assertEqual(node.last_block.index, expected_index)
         self.assertEqual(node.last_block.transactions, expected_transactions)
 
-    @unittest.mock.patch('requests.post')
-    def test_mine_announced(self, mock_post):
+    @staticmethod
+    def __wanting_peer(url, data, headers, timeout):
+        # A peer that asks for everything announced to it.
+        if url.endswith('/inventory'):
+            return ResponseMock(status_code=200, body=json.loads(data))
+        return ResponseMock(status_code=201, body=None)
+
+    @staticmethod
+    def __posted(mock_post, path):
+        return [call for call in mock_post.call_args_list if call.kwargs['url'].endswith(path)]
+
+    def test_mine_announced(self):
         expected_index = 1
         expected_transactions = [
             {'id': 'transaction_1', 'value': 1, 'timestamp': mock.ANY},
@@ -140,24 +159,260 @@ class TestBlockChainNode(unittest.TestCase):
         ]
 
         node = BlockChainNode()
+        node.add_new_transaction(transaction={'id': 'transaction_1', 'value': 1})
         node.add_peer(peer='node2')
         node.add_peer(peer='node3')
-        node.add_new_transaction(transaction={'id': 'transaction_1', 'value': 1})
-        node.add_new_transaction(transaction={'id': 'transaction_2', 'value': 2})
-        node.mine()
+        with mock.patch('requests.Session.post', side_effect=self.__wanting_peer) as mock_post:
+            node.add_new_transaction(transaction={'id': 'transaction_2', 'value': 2})
+            node.mine()
+            flushed = node.wait_for_announcements(timeout=5)
         last_block = node.last_block
         expected_post_calls = [
             unittest.mock.call(
-                url='http://node3/add_block',
-                data=json.dumps(Block.to_json(block=last_block), sort_keys=True)),
+                url='http://node3/compact_block', data=json.dumps(CompactBlock.to_json(block=last_block)),
+                headers={'Content-Type': CONTENT_TYPE_JSON}, timeout=BlockChainNode.ANNOUNCE_TIMEOUT),
             unittest.mock.call(
-                url='http://node2/add_block',
-                data=json.dumps(Block.to_json(block=last_block), sort_keys=True))
+                url='http://node2/compact_block', data=json.dumps(CompactBlock.to_json(block=last_block)),
+                headers={'Content-Type': CONTENT_TYPE_JSON}, timeout=BlockChainNode.ANNOUNCE_TIMEOUT)
         ]
 
+        self.assertEqual(flushed, True)
         self.assertEqual(node.last_block.index, expected_index)
         self.assertEqual(node.last_block.transactions, expected_transactions)
-        self.assertCountEqual(mock_post.call_args_list, expected_post_calls)
+        self.assertCountEqual(self.__posted(mock_post, '/compact_block'), expected_post_calls)
+        self.assertEqual(self.__posted(mock_post, '/add_block'), [])
+        self.assertEqual(len(self.__posted(mock_post, '/inventory')), 4)
+        self.assertEqual(len(self.__posted(mock_post, '/transactions/relay')), 2)
+        self.assertEqual(node.announcement_stats()['node2']['delivered'], 4)
+
+    def test_submit_mining_job(self):
+        expected_transactions = [{'id': 'transaction_1', 'value': 1, 'timestamp': mock.ANY}]
+
+        node = BlockChainNode()
+        node.add_new_transaction(transaction={'id': 'transaction_1', 'value': 1})
+        job = node.submit_mining_job()
+        job.wait(timeout=5)
+
+        self.assertIs(node.mining_job(job_id=job.uid), job)
+        self.assertEqual(job.status, MiningJob.MINED)
+        self.assertEqual(node.last_block.index, 1)
+        self.assertEqual(node.last_block.transactions, expected_transactions)
+
+    def test_transaction_proof_ok(self):
+        node = BlockChainNode()
+        node.add_new_transaction(transaction={'id': 'transaction_1', 'value': 1})
+        node.add_new_transaction(transaction={'id': 'transaction_2', 'value': 2})
+        node.add_new_transaction(transaction={'id': 'transaction_3', 'value': 3})
+        node.mine()
+
+        proof = node.transaction_proof(transaction_id='transaction_2')
+
+        self.assertEqual(proof['block_index'], 1)
+        self.assertEqual(proof['block_hash'], node.last_block.hash)
+        self.assertEqual(proof['position'], 1)
+        self.assertTrue(MerkleTree.verify(transaction=proof['transaction'], proof=proof['proof'],
+                                          root=proof['merkle_root']))
+
+    def test_block_and_transaction_lookups(self):
+        node = BlockChainNode()
+        node.add_new_transaction(transaction={'id': 'transaction_1', 'value': 1})
+        node.add_new_transaction(transaction={'id': 2, 'value': 2})
+        mined_block = node.mine()
+
+        transaction = node.transaction(transaction_id='2')
+
+        self.assertIs(node.block(block_hash=mined_block.hash), mined_block)
+        self.assertIs(node.block_at(height=1), mined_block)
+        self.assertEqual(transaction['block_hash'], mined_block.hash)
+        self.assertEqual(transaction['position'], 1)
+        self.assertEqual(transaction['transaction']['id'], 2)
+        self.assertIsNone(node.transaction(transaction_id='transaction_3'))
+
+    def test_transaction_proof_not_found_ko(self):
+        node = BlockChainNode()
+
+        proof = node.transaction_proof(transaction_id='transaction_1')
+
+        self.assertIsNone(proof)
+
+    @mock.patch.object(BlockChainNode, 'COMPACT_BLOCKS', False)
+    def test_mine_announced_binary(self):
+        BlockChainNode.WIRE_CONTENT_TYPE = CONTENT_TYPE_BINARY
+        node = BlockChainNode()
+        node.add_new_transaction(transaction={'id': 'transaction_1', 'value': 1})
+        node.add_peer(peer='node2')
+        with mock.patch('requests.Session.post', side_effect=self.__wanting_peer) as mock_post:
+            node.mine()
+            node.wait_for_announcements(timeout=5)
+        expected_post_calls = [
+            unittest.mock.call(url='http://node2/add_block', data=node.last_block.encode(),
+                               headers={'Content-Type': CONTENT_TYPE_BINARY}, timeout=BlockChainNode.ANNOUNCE_TIMEOUT)
+        ]
+
+        self.assertEqual(self.__posted(mock_post, '/add_block'), expected_post_calls)
+
+    def test_gossip_delivers_only_wanted_items(self):
+        node = BlockChainNode()
+        node.add_peer(peer='node2')
+
+        def peer_with_transaction_1(url, data, headers, timeout):
+            body = json.loads(data) if url.endswith('/inventory') else None
+            if body is not None:
+                body['transactions'] = [transaction_id for transaction_id in body['transactions']
+                                        if transaction_id != 'transaction_1']
+            return ResponseMock(status_code=200, body=body)
+
+        with mock.patch('requests.Session.post', side_effect=peer_with_transaction_1) as mock_post:
+            node.add_new_transactions(transactions=[{'id': 'transaction_1', 'value': 1},
+                                                    {'id': 'transaction_2', 'value': 2}])
+            node.wait_for_announcements(timeout=5)
+        relayed = self.__posted(mock_post, '/transactions/relay')
+
+        self.assertEqual(json.loads(self.__posted(mock_post, '/inventory')[0].kwargs['data']),
+                         {'blocks': [], 'transactions': ['transaction_1', 'transaction_2']})
+        self.assertEqual(len(relayed), 1)
+        self.assertEqual([transaction['id'] for transaction in json.loads(relayed[0].kwargs['data'])],
+                         ['transaction_2'])
+
+    def test_inventory_wants_unknown_items_once(self):
+        node = BlockChainNode()
+        node.add_new_transaction(transaction={'id': 'transaction_1', 'value': 1})
+        known_hash = node.last_block.hash
+
+        wanted = node.inventory(blocks=[known_hash, 'unknown_block'],
+                                transactions=['transaction_1', 'transaction_2', None])
+        wanted_again = node.inventory(blocks=['unknown_block'], transactions=['transaction_2'])
+
+        self.assertEqual(wanted, {'blocks': ['unknown_block'], 'transactions': ['transaction_2']})
+        self.assertEqual(wanted_again, {'blocks': [], 'transactions': []})
+
+    @mock.patch.object(BlockChainNode, 'GOSSIP_REQUEST_TIMEOUT', 0)
+    def test_inventory_requests_again_after_timeout(self):
+        node = BlockChainNode()
+
+        node.inventory(blocks=[], transactions=['transaction_1'])
+        time.sleep(0.01)
+        wanted_again = node.inventory(blocks=[], transactions=['transaction_1'])
+
+        self.assertEqual(wanted_again, {'blocks': [], 'transactions': ['transaction_1']})
+
+    def test_relayed_transactions_keep_timestamp_and_are_not_relayed_back(self):
+        node = BlockChainNode()
+        node.add_peer(peer='node2')
+
+        with mock.patch('requests.Session.post', side_effect=self.__wanting_peer):
+            results = node.add_new_transactions(transactions=[{'id': 'transaction_1', 'value': 1, 'timestamp': 12.5}],
+                                                relayed=True)
+            node.wait_for_announcements(timeout=5)
+        wanted = node.inventory(blocks=[], transactions=['transaction_1'])
+
+        self.assertEqual(results, [BlockChain.TRANSACTION_ADDED])
+        self.assertEqual(node.unconfirmed_transactions[0]['timestamp'], 12.5)
+        self.assertEqual(wanted, {'blocks': [], 'transactions': []})
+
+    def __mined_elsewhere(self, node, transaction_ids):
+        # A block built on the node's tip by another miner, holding transaction_ids.
+        block = Block(index=node.length, previous_hash=node.last_block.hash,
+                      transactions=[{'id': transaction_id, 'value': 1, 'timestamp': datetime.utcnow().timestamp()}
+                                    for transaction_id in transaction_ids])
+        BlockChain.proof_of_work(block=block, target=BlockChain.initial_target())
+        return block
+
+    def test_receive_compact_block_from_mempool(self):
+        node = BlockChainNode()
+        block = self.__mined_elsewhere(node=node, transaction_ids=['transaction_1', 'transaction_2'])
+        node.add_new_transactions(transactions=[dict(transaction) for transaction in block.transactions],
+                                  relayed=True)
+
+        missing = node.receive_compact_block(compact=CompactBlock.to_json(block=block))
+
+        self.assertEqual(missing, [])
+        self.assertEqual(node.last_block.hash, block.hash)
+        self.assertEqual(node.unconfirmed_transactions, [])
+
+    def test_receive_compact_block_missing_transactions(self):
+        node = BlockChainNode()
+        block = self.__mined_elsewhere(node=node, transaction_ids=['transaction_1', 'transaction_2', 'transaction_3'])
+        node.add_new_transactions(transactions=[dict(block.transactions[1])], relayed=True)
+
+        missing = node.receive_compact_block(compact=CompactBlock.to_json(block=block))
+        added = node.receive_compact_transactions(block_hash=block.hash, positions=missing,
+                                                  transactions=[block.transactions[position] for position in missing])
+
+        self.assertEqual(missing, [0, 2])
+        self.assertEqual(added, [])
+        self.assertEqual(node.last_block.hash, block.hash)
+
+    def test_receive_compact_block_wrong_transactions_ko(self):
+        node = BlockChainNode()
+        block = self.__mined_elsewhere(node=node, transaction_ids=['transaction_1'])
+
+        missing = node.receive_compact_block(compact=CompactBlock.to_json(block=block))
+        rejected = node.receive_compact_transactions(block_hash=block.hash, positions=missing,
+                                                     transactions=[{'id': 'transaction_2', 'value': 1,
+                                                                    'timestamp': 1.0}])
+
+        self.assertEqual(missing, [0])
+        self.assertIsNone(rejected)
+        self.assertEqual(node.length, 1)
+
+    def test_compact_block_sends_only_missing_transactions(self):
+        node = BlockChainNode()
+        node.add_new_transaction(transaction={'id': 'transaction_1', 'value': 1})
+        node.add_new_transaction(transaction={'id': 'transaction_2', 'value': 2})
+        node.add_peer(peer='node2')
+
+        def peer_missing_transaction_2(url, data, headers, timeout):
+            if url.endswith('/inventory'):
+                return ResponseMock(status_code=200, body=json.loads(data))
+            if url.endswith('/compact_block'):
+                return ResponseMock(status_code=200, body={'missing': [1]})
+            return ResponseMock(status_code=201, body=None)
+
+        with mock.patch('requests.Session.post', side_effect=peer_missing_transaction_2) as mock_post:
+            mined_block = node.mine()
+            node.wait_for_announcements(timeout=5)
+        sent = self.__posted(mock_post, '/compact_block/transactions')
+
+        self.assertEqual(len(sent), 1)
+        self.assertEqual(json.loads(sent[0].kwargs['data']),
+                         {'hash': mined_block.hash, 'positions': [1],
+                          'transactions': [json.loads(json.dumps(mined_block.transactions[1]))]})
+        self.assertEqual(self.__posted(mock_post, '/add_block'), [])
+
+    def test_compact_block_refused_falls_back_to_full_block(self):
+        node = BlockChainNode()
+        node.add_new_transaction(transaction={'id': 'transaction_1', 'value': 1})
+        node.add_peer(peer='node2')
+
+        def peer_without_compact_blocks(url, data, headers, timeout):
+            if url.endswith('/inventory'):
+                return ResponseMock(status_code=200, body=json.loads(data))
+            return ResponseMock(status_code=404 if url.endswith('/compact_block') else 201, body=None)
+
+        with mock.patch('requests.Session.post', side_effect=peer_without_compact_blocks) as mock_post:
+            mined_block = node.mine()
+            node.wait_for_announcements(timeout=5)
+
+        self.assertEqual([call.kwargs['data'] for call in self.__posted(mock_post, '/add_block')],
+                         [json.dumps(Block.to_json(block=mined_block), sort_keys=True)])
+
+    def test_compact_block_rejected_not_sent_again(self):
+        node = BlockChainNode()
+        node.add_new_transaction(transaction={'id': 'transaction_1', 'value': 1})
+        node.add_peer(peer='node2')
+
+        def peer_rejecting_block(url, data, headers, timeout):
+            if url.endswith('/inventory'):
+                return ResponseMock(status_code=200, body=json.loads(data))
+            return ResponseMock(status_code=400, body=None)
+
+        with mock.patch('requests.Session.post', side_effect=peer_rejecting_block) as mock_post:
+            node.mine()
+            node.wait_for_announcements(timeout=5)
+
+        self.assertEqual(len(self.__posted(mock_post, '/compact_block')), 1)
+        self.assertEqual(self.__posted(mock_post, '/add_block'), [])
 
     def test_add_peer_ok(self):
         node = BlockChainNode()
@@ -181,8 +436,9 @@ class TestBlockChainNode(unittest.TestCase):
 
         self.assertEqual(added, False)
 
+    @unittest.mock.patch('requests.post', return_value=ResponseMock(status_code=404, body=None))
     @unittest.mock.patch('requests.get')
-    def test_consensus_ok(self, mock_get):
+    def test_consensus_ok(self, mock_get, mock_post):
         remote_node = BlockChainNode()
         remote_node.add_new_transaction(transaction={'id': 'transaction_1', 'value': 1})
         remote_node.add_new_transaction(transaction={'id': 'transaction_2', 'value': 2})
@@ -203,8 +459,32 @@ class TestBlockChainNode(unittest.TestCase):
         self.assertEqual(result, True)
         self.assertEqual(node.chain, expected_chain)
 
+    @unittest.mock.patch('requests.post', return_value=ResponseMock(status_code=404, body=None))
     @unittest.mock.patch('requests.get')
-    def test_consensus_ko(self, mock_get):
+    def test_consensus_binary_ok(self, mock_get, mock_post):
+        BlockChainNode.WIRE_CONTENT_TYPE = CONTENT_TYPE_BINARY
+        remote_node = BlockChainNode()
+        remote_node.add_new_transaction(transaction={'id': 'transaction_1', 'value': 1})
+        remote_node.mine()
+        remote_node.add_new_transaction(transaction={'id': 'transaction_2', 'value': 2.5})
+        remote_node.mine()
+        expected_chain = remote_node.chain
+        mock_get.side_effect = [
+            ResponseMock(status_code=200, body=None, headers={'Content-Type': CONTENT_TYPE_BINARY},
+                         content=remote_node.encoded_chain)
+        ]
+        remote_node.clear()
+        node = BlockChainNode()
+        node.add_peer(peer='node2')
+
+        result = node.consensus()
+
+        self.assertEqual(result, True)
+        self.assertEqual(node.chain, expected_chain)
+
+    @unittest.mock.patch('requests.post', return_value=ResponseMock(status_code=404, body=None))
+    @unittest.mock.patch('requests.get')
+    def test_consensus_ko(self, mock_get, mock_post):
         mock_get.side_effect = [
             ResponseMock(status_code=200, body={'length': 0, 'chain': []})
         ]
@@ -214,3 +494,295 @@ class TestBlockChainNode(unittest.TestCase):
         result = node.consensus()
 
         self.assertEqual(result, False)
+
+    def __peer_responses(self, peer_chain: BlockChain):
+        def locate(url, data, headers, timeout):
+            return ResponseMock(status_code=200, body={'length': peer_chain.length,
+                                                       'fork_height': peer_chain.locate(locator=json.loads(data)),
+                                                       'work': peer_chain.work})
+
+        def request_chain(url, params=None, timeout=None):
+            length, _, json_blocks = peer_chain.json_range(start=params['from'])
+            return ResponseMock(status_code=200, body={'length': length,
+                                                       'chain': [json.loads(block) for block in json_blocks]})
+
+        return locate, request_chain
+
+    def test_consensus_locator_fetches_suffix_ok(self):
+        node = BlockChainNode()
+        node.add_new_transaction(transaction={'id': 'transaction_1', 'value': 1})
+        node.mine()
+        peer_chain = BlockChain()
+        peer_chain.chain = node.chain
+        for transaction_id in ('transaction_2', 'transaction_3'):
+            peer_chain.add_new_transaction(transaction={'id': transaction_id, 'value': 1})
+            peer_chain.mine()
+        node.add_peer(peer='node2')
+        locate, request_chain = self.__peer_responses(peer_chain=peer_chain)
+
+        with mock.patch('requests.post', side_effect=locate), \
+                mock.patch('requests.get', side_effect=request_chain) as mock_get:
+            result = node.consensus()
+
+        self.assertEqual(result, True)
+        self.assertEqual(node.chain, peer_chain.chain)
+        mock_get.assert_called_once_with('http://node2/chain', params={'from': 2}, timeout=mock.ANY)
+
+    def test_consensus_locator_reorganizes_fork_ok(self):
+        expected_unconfirmed_ids = ['transaction_local']
+
+        node = BlockChainNode()
+        node.add_new_transaction(transaction={'id': 'transaction_1', 'value': 1})
+        node.mine()
+        peer_chain = BlockChain()
+        peer_chain.chain = node.chain
+        node.add_new_transaction(transaction={'id': 'transaction_local', 'value': 1})
+        node.mine()
+        for transaction_id in ('transaction_2', 'transaction_3'):
+            peer_chain.add_new_transaction(transaction={'id': transaction_id, 'value': 1})
+            peer_chain.mine()
+        node.add_peer(peer='node2')
+        locate, request_chain = self.__peer_responses(peer_chain=peer_chain)
+
+        with mock.patch('requests.post', side_effect=locate), mock.patch('requests.get', side_effect=request_chain):
+            result = node.consensus()
+
+        self.assertEqual(result, True)
+        self.assertEqual(node.chain, peer_chain.chain)
+        self.assertEqual([transaction['id'] for transaction in node.unconfirmed_transactions],
+                         expected_unconfirmed_ids)
+        self.assertIsNone(node.transaction(transaction_id='transaction_local'))
+        self.assertEqual(node.transaction(transaction_id='transaction_3')['block_index'], 3)
+
+    def test_consensus_downloads_longest_peer_only(self):
+        node = BlockChainNode()
+        peer_chains = {'node2': BlockChain(), 'node3': BlockChain(), 'node4': BlockChain()}
+        for peer, blocks in (('node2', 1), ('node3', 3), ('node4', 2)):
+            peer_chains[peer].chain = node.chain
+            for position in range(blocks):
+                peer_chains[peer].add_new_transaction(transaction={'id': '{}_{}'.format(peer, position), 'value': 1})
+                peer_chains[peer].mine()
+            node.add_peer(peer=peer)
+
+        def peer_of(url):
+            return url.split('/')[2]
+
+        def locate(url, data, headers, timeout):
+            return self.__peer_responses(peer_chain=peer_chains[peer_of(url)])[0](url, data, headers, timeout)
+
+        def request_chain(url, params=None, timeout=None):
+            return self.__peer_responses(peer_chain=peer_chains[peer_of(url)])[1](url, params, timeout)
+
+        with mock.patch('requests.post', side_effect=locate), \
+                mock.patch('requests.get', side_effect=request_chain) as mock_get:
+            result = node.consensus()
+
+        self.assertEqual(result, True)
+        self.assertEqual(node.chain, peer_chains['node3'].chain)
+        mock_get.assert_called_once_with('http://node3/chain', params={'from': 1}, timeout=mock.ANY)
+
+    @mock.patch.object(BlockChainNode, 'CONSENSUS_TIMEOUT', 0.2)
+    def test_consensus_deadline_skips_slow_peer(self):
+        node = BlockChainNode()
+        peer_chain = BlockChain()
+        peer_chain.chain = node.chain
+        peer_chain.add_new_transaction(transaction={'id': 'transaction_1', 'value': 1})
+        peer_chain.mine()
+        node.add_peer(peer='slow')
+        release = threading.Event()
+
+        def locate(url, data, headers, timeout):
+            release.wait(timeout=5)
+            return self.__peer_responses(peer_chain=peer_chain)[0](url, data, headers, timeout)
+
+        with mock.patch('requests.post', side_effect=locate), mock.patch('requests.get') as mock_get:
+            started = time.monotonic()
+            result = node.consensus()
+            elapsed = time.monotonic() - started
+            release.set()
+
+        self.assertEqual(result, False)
+        self.assertTrue(elapsed < 2)
+        mock_get.assert_not_called()
+
+    def __sync_responses(self, peer_chains, tampered_headers=(), tampered_bodies=()):
+        def locate(url, data, headers, timeout):
+            peer_chain = peer_chains[url.split('/')[2]]
+            return ResponseMock(status_code=200, body={'length': peer_chain.length,
+                                                       'fork_height': peer_chain.locate(locator=json.loads(data)),
+                                                       'work': peer_chain.work})
+
+        def get(url, params=None, timeout=None, headers=None):
+            peer = url.split('/')[2]
+            start, stop = params['from'], params['to'] + 1
+            if url.endswith('/headers'):
+                length, served = peer_chains[peer].headers_range(start=start, stop=stop)
+                served = [dict(header, nonce=0) if peer in tampered_headers else header for header in served]
+                body = {'length': length, 'headers': served}
+            else:
+                length, _, json_blocks = peer_chains[peer].json_range(start=start, stop=stop)
+                served = [json.loads(block) for block in json_blocks]
+                served = [dict(block, transactions=[]) if peer in tampered_bodies else block for block in served]
+                body = {'length': length, 'chain': served}
+            return ResponseMock(status_code=200, body=body)
+
+        return locate, get
+
+    def __longer_peer_chain(self, node, blocks):
+        peer_chain = BlockChain()
+        peer_chain.chain = node.chain
+        for position in range(blocks):
+            peer_chain.add_new_transaction(transaction={'id': 'peer_{}'.format(position), 'value': 1})
+            peer_chain.mine()
+        return peer_chain
+
+    @mock.patch.object(BlockChainNode, 'SYNC_BODIES_BATCH', 1)
+    def test_sync_headers_first_ok(self):
+        node = BlockChainNode()
+        peer_chain = self.__longer_peer_chain(node=node, blocks=4)
+        node.add_peer(peer='node2')
+        node.add_peer(peer='node3')
+        locate, get = self.__sync_responses(peer_chains={'node2': peer_chain, 'node3': peer_chain})
+
+        with mock.patch('requests.post', side_effect=locate), mock.patch('requests.get', side_effect=get) as mock_get:
+            result = node.sync()
+        body_peers = {call.args[0].split('/')[2] for call in mock_get.call_args_list
+                      if call.args[0].endswith('/chain')}
+
+        self.assertEqual(result, True)
+        self.assertEqual(node.chain, peer_chain.chain)
+        self.assertEqual(body_peers, {'node2', 'node3'})
+        self.assertEqual(node.transaction(transaction_id='peer_3')['block_index'], 4)
+
+    def test_sync_invalid_headers_skip_bodies_ko(self):
+        node = BlockChainNode()
+        peer_chain = self.__longer_peer_chain(node=node, blocks=2)
+        node.add_peer(peer='node2')
+        locate, get = self.__sync_responses(peer_chains={'node2': peer_chain}, tampered_headers={'node2'})
+
+        with mock.patch('requests.post', side_effect=locate), mock.patch('requests.get', side_effect=get) as mock_get:
+            result = node.sync()
+
+        self.assertEqual(result, False)
+        self.assertEqual(node.length, 1)
+        self.assertTrue(all(call.args[0].endswith('/headers') for call in mock_get.call_args_list))
+
+    @mock.patch.object(BlockChainNode, 'SYNC_BODIES_BATCH', 1)
+    def test_sync_bodies_not_matching_headers_retried(self):
+        node = BlockChainNode()
+        peer_chain = self.__longer_peer_chain(node=node, blocks=3)
+        node.add_peer(peer='node2')
+        node.add_peer(peer='node3')
+        locate, get = self.__sync_responses(peer_chains={'node2': peer_chain, 'node3': peer_chain},
+                                            tampered_bodies={'node3'})
+
+        with mock.patch('requests.post', side_effect=locate), mock.patch('requests.get', side_effect=get):
+            result = node.sync()
+
+        self.assertEqual(result, True)
+        self.assertEqual(node.chain, peer_chain.chain)
+
+    def test_consensus_locator_shorter_peer_ko(self):
+        node = BlockChainNode()
+        node.add_new_transaction(transaction={'id': 'transaction_1', 'value': 1})
+        node.mine()
+        node.add_peer(peer='node2')
+
+        with mock.patch('requests.post', return_value=ResponseMock(status_code=200,
+                                                                  body={'length': 2, 'fork_height': 1,
+                                                                        'work': node.work})), \
+                mock.patch('requests.get') as mock_get:
+            result = node.consensus()
+
+        self.assertEqual(result, False)
+        mock_get.assert_not_called()
+
+    def test_consensus_malformed_locate_replies_ko(self):
+        malformed_bodies = [
+            [],
+            'length',
+            {'length': '9', 'fork_height': 0, 'work': 2 ** 16},
+            {'length': 9, 'fork_height': None, 'work': 2 ** 16},
+            {'length': 9, 'fork_height': 9, 'work': 2 ** 16},
+            {'length': 9, 'fork_height': -2, 'work': 2 ** 16},
+            {'length': True, 'fork_height': 0, 'work': 2 ** 16},
+            {'length': 9, 'fork_height': 0},
+            {'length': 9, 'fork_height': 0, 'work': -1},
+        ]
+        node = BlockChainNode()
+        node.add_peer(peer='node2')
+
+        for body in malformed_bodies:
+            with self.subTest(body=body), \
+                    mock.patch('requests.post', return_value=ResponseMock(status_code=200, body=body)), \
+                    mock.patch('requests.get') as mock_get:
+                result = node.consensus()
+                synced = node.sync()
+
+                self.assertEqual(result, False)
+                self.assertEqual(synced, False)
+                mock_get.assert_not_called()
+
+    @unittest.mock.patch('requests.post', return_value=ResponseMock(status_code=404, body=None))
+    @unittest.mock.patch('requests.get', return_value=ResponseMock(status_code=200, body=[]))
+    def test_consensus_malformed_chain_reply_ko(self, mock_get, mock_post):
+        node = BlockChainNode()
+        node.add_peer(peer='node2')
+
+        result = node.consensus()
+
+        self.assertEqual(result, False)
+        self.assertEqual(node.length, 1)
+
+    @mock.patch.object(BlockChainNode, 'SYNC_BODIES_BATCH', 1)
+    def test_sync_malformed_headers_reply_skips_peer(self):
+        for malformed_body in ([], 'headers', {'headers': 'headers'}):
+            with self.subTest(body=malformed_body):
+                BlockChainNode.clear()
+                node = BlockChainNode()
+                peer_chain = self.__longer_peer_chain(node=node, blocks=2)
+                node.add_peer(peer='node2')
+                node.add_peer(peer='node3')
+                locate, get = self.__sync_responses(peer_chains={'node2': peer_chain, 'node3': peer_chain})
+
+                def locate_preferring_node2(url, data, headers, timeout):
+                    response = locate(url, data, headers, timeout)
+                    if url.split('/')[2] == 'node2':
+                        response.body['work'] += 1
+                    return response
+
+                def get_malformed_node2_headers(url, params=None, timeout=None, headers=None):
+                    if url == 'http://node2/headers':
+                        return ResponseMock(status_code=200, body=malformed_body)
+                    return get(url, params=params, timeout=timeout, headers=headers)
+
+                with mock.patch('requests.post', side_effect=locate_preferring_node2), \
+                        mock.patch('requests.get', side_effect=get_malformed_node2_headers) as mock_get:
+                    result = node.sync()
+                headers_peers = [call.args[0] for call in mock_get.call_args_list if call.args[0].endswith('/headers')]
+
+                self.assertEqual(result, True)
+                self.assertEqual(node.chain, peer_chain.chain)
+                self.assertEqual(headers_peers[0], 'http://node2/headers')
+
+    @unittest.mock.patch('requests.post', return_value=ResponseMock(status_code=404, body=None))
+    @unittest.mock.patch('requests.get')
+    def test_consensus_malformed_block_fields_ko(self, mock_get, mock_post):
+        remote_node = BlockChainNode()
+        remote_node.add_new_transaction(transaction={'id': 'transaction_1', 'value': 1})
+        remote_node.mine()
+        remote_chain_data = remote_node.chain
+        remote_node.clear()
+        node = BlockChainNode()
+        node.add_peer(peer='node2')
+
+        for field, value in (('index', '0'), ('index', -1), ('nonce', 2 ** 70)):
+            with self.subTest(field=field, value=value):
+                malformed_chain = [dict(block_json) for block_json in remote_chain_data]
+                malformed_chain[1][field] = value
+                mock_get.side_effect = [ResponseMock(status_code=200, body={'length': 2, 'chain': malformed_chain})]
+
+                result = node.consensus()
+
+                self.assertEqual(result, False)
+                self.assertEqual(node.length, 1)
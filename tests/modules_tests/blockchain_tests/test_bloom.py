@@ -0,0 +1,29 @@
+import unittest
+
+from bychain.modules.blockchain.bloom import BloomFilter
+
+
+class TestBloomFilter(unittest.TestCase):
+
+    def test_add_contains(self):
+        bloom_filter = BloomFilter(capacity=1000, error_rate=0.01)
+        for position in range(1000):
+            bloom_filter.add('transaction_{}'.format(position))
+
+        self.assertEqual(len(bloom_filter), 1000)
+        self.assertTrue(all('transaction_{}'.format(position) in bloom_filter for position in range(1000)))
+
+    def test_false_positive_rate(self):
+        bloom_filter = BloomFilter(capacity=1000, error_rate=0.01)
+        for position in range(1000):
+            bloom_filter.add('transaction_{}'.format(position))
+        false_positives = sum('unknown_{}'.format(position) in bloom_filter for position in range(10000))
+
+        self.assertTrue(false_positives < 300)
+
+    def test_sizing(self):
+        bloom_filter = BloomFilter(capacity=1000, error_rate=0.01)
+
+        self.assertEqual(bloom_filter.size, 9586)
+        self.assertEqual(bloom_filter.hashes, 7)
+        self.assertNotIn('transaction_1', bloom_filter)
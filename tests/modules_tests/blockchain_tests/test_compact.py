@@ -0,0 +1,65 @@
+import unittest
+
+from bychain.modules.blockchain.block import Block
+from bychain.modules.blockchain.compact import CompactBlock
+
+
+class TestCompactBlock(unittest.TestCase):
+
+    def setUp(self):
+        self.transactions = [{'id': position, 'value': position, 'timestamp': 1.0} for position in range(1, 4)]
+        self.block = Block(index=1, transactions=self.transactions, previous_hash='0', timestamp=123456)
+
+    def test_to_json(self):
+        compact = CompactBlock.to_json(block=self.block)
+
+        self.assertEqual(compact['hash'], self.block.hash)
+        self.assertEqual(compact['merkle_root'], self.block.merkle_root.hex())
+        self.assertEqual(len(compact['short_ids']), 3)
+        self.assertEqual(len(compact['short_ids'][0]), CompactBlock.SHORT_ID_BYTES * 2)
+        self.assertNotIn('transactions', compact)
+
+    def test_short_id_keyed_by_block(self):
+        other_block = Block(index=1, transactions=self.transactions, previous_hash='0', timestamp=654321)
+
+        self.assertNotEqual(CompactBlock.short_id(block_hash=self.block.hash, transaction=self.transactions[0]),
+                            CompactBlock.short_id(block_hash=other_block.hash, transaction=self.transactions[0]))
+
+    def test_match_and_rebuild(self):
+        compact = CompactBlock.to_json(block=self.block)
+        mempool = [self.transactions[2], {'id': 9, 'value': 9, 'timestamp': 1.0}, self.transactions[0]]
+
+        matched = CompactBlock.match(block_hash=self.block.hash, short_ids=compact['short_ids'],
+                                     transactions=mempool)
+        matched[1] = self.transactions[1]
+        rebuilt = CompactBlock.rebuild(compact=compact, transactions=matched)
+
+        self.assertEqual(matched, self.transactions)
+        self.assertEqual(rebuilt.hash, self.block.hash)
+
+    def test_match_ambiguous_short_id(self):
+        compact = CompactBlock.to_json(block=self.block)
+
+        matched = CompactBlock.match(block_hash=self.block.hash, short_ids=compact['short_ids'],
+                                     transactions=[self.transactions[0], self.transactions[0]])
+
+        self.assertEqual(matched, [None, None, None])
+
+    def test_is_well_formed(self):
+        compact = CompactBlock.to_json(block=self.block)
+        malformed = {
+            'no header': {'short_ids': []},
+            'short hash': dict(compact, hash='00'),
+            'non hex hash': dict(compact, hash='z' * 64),
+            'list previous hash': dict(compact, previous_hash=[]),
+            'negative index': dict(compact, index=-1),
+            'bool nonce': dict(compact, nonce=True),
+            'oversized nonce': dict(compact, nonce=2 ** 64),
+            'string timestamp': dict(compact, timestamp='1'),
+            'short ids not a list': dict(compact, short_ids='ids'),
+        }
+
+        self.assertTrue(CompactBlock.is_well_formed(compact=compact))
+        for name, value in malformed.items():
+            with self.subTest(name=name):
+                self.assertFalse(CompactBlock.is_well_formed(compact=value))
@@ -0,0 +1,48 @@
+import unittest
+
+from bychain.modules.blockchain.difficulty import Difficulty
+
+
+class TestDifficulty(unittest.TestCase):
+
+    def test_target_from_bits(self):
+        self.assertEqual(Difficulty.target_from_bits(bits=8), 2 ** 248)
+        self.assertEqual(Difficulty.bits_from_target(target=2 ** 248), 8)
+        self.assertTrue(Difficulty.target_from_bits(bits=8.5) < 2 ** 248)
+
+    def test_meets_target(self):
+        self.assertTrue(Difficulty.meets_target(block_hash='00ff' + 'f' * 60, target=2 ** 248))
+        self.assertFalse(Difficulty.meets_target(block_hash='0100' + '0' * 60, target=2 ** 248))
+
+    def test_retarget_on_schedule(self):
+        target = Difficulty.retarget(target=2 ** 248, timestamps=[0, 10, 20, 30], block_interval=10)
+
+        self.assertEqual(target, 2 ** 248)
+
+    def test_retarget_fast_blocks_harder(self):
+        target = Difficulty.retarget(target=2 ** 248, timestamps=[0, 5, 10, 15], block_interval=10)
+
+        self.assertEqual(target, 2 ** 247)
+
+    def test_retarget_slow_blocks_easier(self):
+        target = Difficulty.retarget(target=2 ** 248, timestamps=[0, 15, 30, 45], block_interval=10)
+
+        self.assertEqual(target, 3 * 2 ** 247)
+
+    def test_retarget_clamped(self):
+        harder = Difficulty.retarget(target=2 ** 248, timestamps=[0, 0, 0, 0], block_interval=10)
+        easier = Difficulty.retarget(target=2 ** 248, timestamps=[0, 1000, 2000, 3000], block_interval=10)
+
+        self.assertEqual(harder, 2 ** 246)
+        self.assertEqual(easier, 2 ** 250)
+
+    def test_retarget_exact_for_large_targets(self):
+        target = Difficulty.retarget(target=2 ** 255 - 1, timestamps=[0, 10, 20, 30], block_interval=10)
+        slower = Difficulty.retarget(target=2 ** 200 + 1, timestamps=[0.0, 10.5, 20.5, 30.5], block_interval=10)
+
+        self.assertEqual(target, 2 ** 255 - 1)
+        self.assertEqual(slower, (2 ** 200 + 1) * 61 // 60)
+
+    def test_work(self):
+        self.assertEqual(Difficulty.work(target=2 ** 248), 2 ** 8)
+        self.assertEqual(Difficulty.work(target=2 ** 246), 4 * Difficulty.work(target=2 ** 248))
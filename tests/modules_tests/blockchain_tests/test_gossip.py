@@ -0,0 +1,36 @@
+import time
+import unittest
+
+from bychain.modules.blockchain.gossip import SeenCache
+
+
+class TestSeenCache(unittest.TestCase):
+
+    def test_add(self):
+        seen = SeenCache(capacity=10)
+
+        added = seen.add('block_1')
+        added_again = seen.add('block_1')
+
+        self.assertEqual(added, True)
+        self.assertEqual(added_again, False)
+        self.assertIn('block_1', seen)
+
+    def test_capacity_evicts_least_recent(self):
+        seen = SeenCache(capacity=2)
+        seen.add('block_1')
+        seen.add('block_2')
+        seen.add('block_1')
+        seen.add('block_3')
+
+        self.assertEqual(len(seen), 2)
+        self.assertIn('block_1', seen)
+        self.assertNotIn('block_2', seen)
+
+    def test_max_age(self):
+        seen = SeenCache(capacity=10)
+        seen.add('transaction_1')
+        time.sleep(0.01)
+
+        self.assertEqual(seen.add('transaction_1', max_age=60), False)
+        self.assertEqual(seen.add('transaction_1', max_age=0), True)
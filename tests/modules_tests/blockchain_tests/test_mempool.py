@@ -0,0 +1,173 @@
+import unittest
+
+from bychain.modules.blockchain.mempool import Mempool
+from bychain.modules.blockchain.serialization import BinarySerializer
+
+
+class TestMempool(unittest.TestCase):
+
+    def test_add(self):
+        expected_transactions = [{'id': 'transaction_1', 'value': 1}, {'id': 'transaction_2', 'value': 2}]
+
+        mempool = Mempool()
+        mempool.add(transaction={'id': 'transaction_1', 'value': 1})
+        mempool.add(transaction={'id': 'transaction_2', 'value': 2})
+
+        self.assertEqual(len(mempool), 2)
+        self.assertEqual(mempool.transactions, expected_transactions)
+        self.assertEqual(mempool.size, sum(len(BinarySerializer.canonical(transaction))
+                                           for transaction in expected_transactions))
+
+    def test_contains(self):
+        mempool = Mempool()
+        mempool.add(transaction={'id': 1, 'value': 1})
+        mempool.add(transaction={'id': 'transaction_2', 'value': 2})
+        mempool.remove_ids(transaction_ids=['transaction_2'])
+
+        self.assertIn(1, mempool)
+        self.assertIn('1', mempool)
+        self.assertNotIn('transaction_2', mempool)
+
+    def test_select_by_priority_then_arrival(self):
+        expected_ids = ['transaction_3', 'transaction_2', 'transaction_4', 'transaction_1']
+
+        mempool = Mempool()
+        mempool.add(transaction={'id': 'transaction_1', 'value': 1})
+        mempool.add(transaction={'id': 'transaction_2', 'value': 2, 'fee': 1})
+        mempool.add(transaction={'id': 'transaction_3', 'value': 3, 'fee': 2.5})
+        mempool.add(transaction={'id': 'transaction_4', 'value': 4, 'fee': 1})
+        selected = mempool.select(max_transactions=10, max_bytes=10000)
+
+        self.assertEqual([transaction['id'] for transaction in selected], expected_ids)
+        self.assertEqual(len(mempool), 4)
+
+    def test_select_max_transactions(self):
+        mempool = Mempool()
+        for position in range(10):
+            mempool.add(transaction={'id': position, 'value': position, 'fee': position})
+        selected = mempool.select(max_transactions=3, max_bytes=10000)
+        selected_again = mempool.select(max_transactions=3, max_bytes=10000)
+
+        self.assertEqual([transaction['id'] for transaction in selected], [9, 8, 7])
+        self.assertEqual(selected_again, selected)
+
+    def test_select_max_bytes(self):
+        mempool = Mempool()
+        for position in range(10):
+            mempool.add(transaction={'id': position, 'value': position})
+        transaction_size = mempool.size // 10
+        selected = mempool.select(max_transactions=10, max_bytes=transaction_size * 4 + 1)
+
+        self.assertEqual(len(selected), 4)
+
+    def test_remove_ids(self):
+        mempool = Mempool()
+        for position in range(200):
+            mempool.add(transaction={'id': position, 'value': position, 'fee': position})
+        removed = mempool.remove_ids(transaction_ids=range(100, 200))
+        selected = mempool.select(max_transactions=2, max_bytes=10000)
+
+        self.assertEqual(removed, 100)
+        self.assertEqual(len(mempool), 100)
+        self.assertEqual([transaction['id'] for transaction in selected], [99, 98])
+
+    def test_remove_unknown_ids(self):
+        mempool = Mempool()
+        mempool.add(transaction={'id': 'transaction_1', 'value': 1})
+
+        removed = mempool.remove_ids(transaction_ids=['unknown'])
+
+        self.assertEqual(removed, 0)
+        self.assertEqual(len(mempool), 1)
+
+    def test_expire(self):
+        expected_transactions = [{'id': 'transaction_2', 'value': 2, 'timestamp': 150}]
+
+        mempool = Mempool(ttl=100)
+        mempool.add(transaction={'id': 'transaction_1', 'value': 1, 'timestamp': 90}, now=100)
+        mempool.add(transaction={'id': 'transaction_2', 'value': 2, 'timestamp': 150}, now=150)
+        expired = mempool.expire(now=200)
+
+        self.assertEqual(expired, 1)
+        self.assertEqual(mempool.transactions, expected_transactions)
+        self.assertEqual(mempool.stats['expired'], 1)
+
+    def test_oldest_timestamp(self):
+        mempool = Mempool()
+        empty_oldest = mempool.oldest_timestamp()
+        mempool.add(transaction={'id': 'transaction_1', 'value': 1, 'timestamp': 90})
+        mempool.add(transaction={'id': 'transaction_2', 'value': 2, 'timestamp': 150})
+        mempool.remove_ids(transaction_ids=['transaction_1'])
+
+        self.assertIsNone(empty_oldest)
+        self.assertEqual(mempool.oldest_timestamp(), 150)
+
+    def test_select_skips_expired(self):
+        mempool = Mempool(ttl=100)
+        mempool.add(transaction={'id': 'transaction_1', 'value': 1, 'timestamp': 90, 'fee': 10}, now=100)
+        mempool.add(transaction={'id': 'transaction_2', 'value': 2, 'timestamp': 150}, now=150)
+        selected = mempool.select(max_transactions=10, max_bytes=10000, now=200)
+
+        self.assertEqual([transaction['id'] for transaction in selected], ['transaction_2'])
+
+    def test_evict_lowest_priority_when_full(self):
+        expected_ids = ['transaction_2', 'transaction_3']
+
+        mempool = Mempool(max_transactions=2)
+        mempool.add(transaction={'id': 'transaction_1', 'value': 1, 'fee': 1})
+        mempool.add(transaction={'id': 'transaction_2', 'value': 2, 'fee': 3})
+        added = mempool.add(transaction={'id': 'transaction_3', 'value': 3, 'fee': 2})
+
+        self.assertIsNotNone(added)
+        self.assertEqual([transaction['id'] for transaction in mempool.transactions], expected_ids)
+        self.assertEqual(mempool.stats['evicted'], 1)
+
+    def test_evict_oldest_on_equal_priority(self):
+        expected_ids = ['transaction_2', 'transaction_3']
+
+        mempool = Mempool(max_transactions=2)
+        mempool.add(transaction={'id': 'transaction_1', 'value': 1})
+        mempool.add(transaction={'id': 'transaction_2', 'value': 2})
+        mempool.add(transaction={'id': 'transaction_3', 'value': 3})
+
+        self.assertEqual([transaction['id'] for transaction in mempool.transactions], expected_ids)
+
+    def test_reject_lowest_priority_when_full(self):
+        expected_ids = ['transaction_1', 'transaction_2']
+
+        mempool = Mempool(max_transactions=2)
+        mempool.add(transaction={'id': 'transaction_1', 'value': 1, 'fee': 2})
+        mempool.add(transaction={'id': 'transaction_2', 'value': 2, 'fee': 2})
+        added = mempool.add(transaction={'id': 'transaction_3', 'value': 3, 'fee': 1})
+
+        self.assertIsNone(added)
+        self.assertEqual([transaction['id'] for transaction in mempool.transactions], expected_ids)
+        self.assertEqual(mempool.stats['rejected'], 1)
+
+    def test_max_bytes(self):
+        transaction_size = len(BinarySerializer.canonical({'id': 0, 'value': 0}))
+
+        mempool = Mempool(max_bytes=transaction_size * 3)
+        for position in range(5):
+            mempool.add(transaction={'id': position, 'value': position})
+
+        self.assertEqual([transaction['id'] for transaction in mempool.transactions], [2, 3, 4])
+        self.assertTrue(mempool.size <= transaction_size * 3)
+        self.assertEqual(mempool.stats['evicted'], 2)
+
+    def test_stats(self):
+        expected_stats = {
+            'transactions': 1,
+            'bytes': len(BinarySerializer.canonical({'id': 'transaction_1', 'value': 1})),
+            'max_transactions': 10,
+            'max_bytes': 1000,
+            'ttl': 60,
+            'expired': 0,
+            'evicted': 0,
+            'rejected': 0
+        }
+
+        mempool = Mempool(max_transactions=10, max_bytes=1000, ttl=60)
+        mempool.add(transaction={'id': 'transaction_1', 'value': 1}, now=0)
+
+        self.assertEqual(mempool.stats, expected_stats)
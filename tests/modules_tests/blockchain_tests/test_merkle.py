@@ -0,0 +1,54 @@
+import unittest
+
+from bychain.modules.blockchain.merkle import MerkleTree
+
+
+class TestMerkleTree(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.transactions = [{'id': 'transaction_{}'.format(position), 'value': position} for position in range(7)]
+
+    def test_empty_root(self):
+        expected_root = 'e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855'
+
+        tree = MerkleTree(transactions=[])
+
+        self.assertEqual(tree.root.hex(), expected_root)
+        self.assertEqual(len(tree), 0)
+
+    def test_single_transaction_root(self):
+        tree = MerkleTree(transactions=self.transactions[:1])
+
+        self.assertEqual(tree.root, MerkleTree.hash_leaf(transaction=self.transactions[0]))
+        self.assertEqual(tree.proof(position=0), [])
+
+    def test_proof_ok(self):
+        tree = MerkleTree(transactions=self.transactions)
+        root = tree.root.hex()
+
+        for position, transaction in enumerate(self.transactions):
+            proof = tree.proof(position=position)
+
+            self.assertTrue(len(proof) <= 3)
+            self.assertTrue(MerkleTree.verify(transaction=transaction, proof=proof, root=root))
+
+    def test_proof_wrong_transaction_ko(self):
+        tree = MerkleTree(transactions=self.transactions)
+        proof = tree.proof(position=2)
+
+        is_valid = MerkleTree.verify(transaction=self.transactions[3], proof=proof, root=tree.root.hex())
+
+        self.assertEqual(is_valid, False)
+
+    def test_proof_out_of_range_ko(self):
+        tree = MerkleTree(transactions=self.transactions)
+
+        self.assertIsNone(tree.proof(position=7))
+        self.assertIsNone(tree.proof(position=-1))
+
+    def test_root_depends_on_order(self):
+        tree = MerkleTree(transactions=self.transactions)
+        reversed_tree = MerkleTree(transactions=list(reversed(self.transactions)))
+
+        self.assertNotEqual(tree.root, reversed_tree.root)
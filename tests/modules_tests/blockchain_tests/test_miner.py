@@ -0,0 +1,70 @@
+import threading
+import unittest
+
+from bychain.modules.blockchain.block import Block
+from bychain.modules.blockchain.miner import ProofOfWorkMiner
+
+
+class TestProofOfWorkMiner(unittest.TestCase):
+
+    def test_mine_serial(self):
+        expected_hash = '003b13689608ec6003666a03d6cb2f7c97118761102c38eab609a99bc58a667b'
+        expected_nonce = 284
+        block = Block(index=1, transactions=[], previous_hash='0', timestamp=123456)
+
+        miner = ProofOfWorkMiner(workers=1)
+        generated_hash = miner.mine(block=block, target=2 ** 248)
+
+        self.assertEqual(generated_hash, expected_hash)
+        self.assertEqual(block.nonce, expected_nonce)
+
+    def test_mine_parallel_finds_lowest_nonce(self):
+        expected_hash = '003b13689608ec6003666a03d6cb2f7c97118761102c38eab609a99bc58a667b'
+        expected_nonce = 284
+        block = Block(index=1, transactions=[], previous_hash='0', timestamp=123456)
+
+        miner = ProofOfWorkMiner(workers=4)
+        generated_hash = miner.mine(block=block, target=2 ** 248)
+
+        self.assertEqual(generated_hash, expected_hash)
+        self.assertEqual(block.nonce, expected_nonce)
+        self.assertEqual(block.hash, expected_hash)
+
+    def test_workers_default(self):
+        miner = ProofOfWorkMiner()
+
+        self.assertEqual(miner.workers, 1)
+
+    def test_mine_bit_level_target(self):
+        target = 2 ** 247
+        block = Block(index=1, transactions=[], previous_hash='0', timestamp=123456)
+
+        miner = ProofOfWorkMiner(workers=1)
+        generated_hash = miner.mine(block=block, target=target)
+
+        self.assertTrue(int(generated_hash, 16) < target)
+        self.assertEqual(generated_hash, block.hash)
+
+    def test_mine_interrupted_serial(self):
+        block = Block(index=1, transactions=[], previous_hash='0', timestamp=123456)
+        interrupt = threading.Event()
+        interrupt.set()
+
+        miner = ProofOfWorkMiner(workers=1)
+        generated_hash = miner.mine(block=block, target=1, interrupt=interrupt)
+
+        self.assertIsNone(generated_hash)
+        self.assertEqual(block.nonce, 0)
+
+    def test_mine_interrupted_parallel(self):
+        block = Block(index=1, transactions=[], previous_hash='0', timestamp=123456)
+        interrupt = threading.Event()
+        timer = threading.Timer(0.2, interrupt.set)
+        timer.start()
+
+        miner = ProofOfWorkMiner(workers=2)
+        generated_hash = miner.mine(block=block, target=1, interrupt=interrupt)
+        timer.join()
+
+        self.assertIsNone(generated_hash)
+        self.assertEqual(block.nonce, 0)
@@ -0,0 +1,124 @@
+import threading
+import unittest
+from datetime import datetime
+from unittest import mock
+
+from bychain.modules.blockchain.block import Block
+from bychain.modules.blockchain.scheduler import MiningJob, MiningScheduler
+
+
+class TestMiningScheduler(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.block = Block(index=1, transactions=[], previous_hash='0', timestamp=123456)
+        self.transactions = []
+        self.mine = mock.Mock(return_value=self.block)
+        self.scheduler = MiningScheduler(mine=self.mine, pending_summary=self.pending_summary)
+        self.scheduler.POLL_SECONDS = .01
+
+    def pending_summary(self):
+        transactions = list(self.transactions)
+        return len(transactions), min((transaction['timestamp'] for transaction in transactions), default=None)
+
+    def tearDown(self):
+        super().tearDown()
+        self.scheduler.stop()
+
+    def test_submit_mined(self):
+        expected_json = {
+            'job_id': mock.ANY,
+            'trigger': MiningScheduler.ON_DEMAND,
+            'status': MiningJob.MINED,
+            'created_at': mock.ANY,
+            'finished_at': mock.ANY,
+            'error': None,
+            'block_index': 1,
+            'block_hash': self.block.hash
+        }
+
+        job = self.scheduler.submit()
+        finished = job.wait(timeout=5)
+
+        self.assertEqual(finished, True)
+        self.assertIs(self.scheduler.job(job_id=job.uid), job)
+        self.assertEqual(MiningJob.to_json(job), expected_json)
+
+    def test_submit_empty(self):
+        self.mine.return_value = None
+
+        job = self.scheduler.submit()
+        job.wait(timeout=5)
+
+        self.assertEqual(job.status, MiningJob.EMPTY)
+        self.assertIsNone(job.block)
+
+    def test_submit_failed(self):
+        self.mine.side_effect = RuntimeError('mining failed')
+
+        job = self.scheduler.submit()
+        job.wait(timeout=5)
+
+        self.assertEqual(job.status, MiningJob.FAILED)
+        self.assertEqual(job.error, 'mining failed')
+
+    def test_jobs_run_one_at_a_time(self):
+        running = []
+        overlaps = []
+        lock = threading.Lock()
+
+        def mine():
+            with lock:
+                running.append(1)
+                overlaps.append(len(running))
+            threading.Event().wait(.01)
+            with lock:
+                running.pop()
+            return None
+
+        self.mine.side_effect = mine
+        jobs = [self.scheduler.submit() for _ in range(5)]
+        for job in jobs:
+            job.wait(timeout=5)
+
+        self.assertEqual(max(overlaps), 1)
+
+    def test_job_unknown(self):
+        self.assertIsNone(self.scheduler.job(job_id='unknown'))
+
+    def test_continuous_by_size(self):
+        mined = threading.Event()
+        self.mine.side_effect = lambda: mined.set()
+        self.transactions.extend([{'id': 1, 'timestamp': datetime.utcnow().timestamp()}])
+
+        started = self.scheduler.start_continuous(min_transactions=2)
+        triggered_early = mined.wait(timeout=.1)
+        self.transactions.append({'id': 2, 'timestamp': datetime.utcnow().timestamp()})
+        triggered = mined.wait(timeout=5)
+
+        self.assertEqual(started, True)
+        self.assertEqual(triggered_early, False)
+        self.assertEqual(triggered, True)
+        self.assertEqual(self.scheduler.continuous, {'min_transactions': 2, 'max_age': None})
+
+    def test_continuous_by_age(self):
+        mined = threading.Event()
+        self.mine.side_effect = lambda: mined.set()
+        self.transactions.append({'id': 1, 'timestamp': datetime.utcnow().timestamp() - 60})
+
+        self.scheduler.start_continuous(min_transactions=100, max_age=30)
+        triggered = mined.wait(timeout=5)
+
+        self.assertEqual(triggered, True)
+
+    def test_continuous_invalid_ko(self):
+        started = self.scheduler.start_continuous(min_transactions=0)
+
+        self.assertEqual(started, False)
+        self.assertIsNone(self.scheduler.continuous)
+
+    def test_stop_continuous(self):
+        self.scheduler.start_continuous(min_transactions=1)
+        self.scheduler.stop_continuous()
+
+        self.assertIsNone(self.scheduler.continuous)
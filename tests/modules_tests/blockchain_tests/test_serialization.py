@@ -0,0 +1,67 @@
+import unittest
+
+from bychain.modules.blockchain.serialization import BinarySerializer, SerializationError
+
+
+class TestBinarySerializer(unittest.TestCase):
+
+    def test_round_trip(self):
+        expected_value = {
+            'id': 'transaction_1',
+            'value': 1,
+            'amount': 1.5,
+            'big': 2 ** 80,
+            'negative': -3,
+            'flags': [True, False, None],
+            'nested': {'name': 'ñandú'}
+        }
+
+        value = BinarySerializer.loads(BinarySerializer.dumps(expected_value))
+
+        self.assertEqual(value, expected_value)
+
+    def test_int_and_float_are_distinct(self):
+        self.assertIsInstance(BinarySerializer.loads(BinarySerializer.dumps(1)), int)
+        self.assertIsInstance(BinarySerializer.loads(BinarySerializer.dumps(1.0)), float)
+        self.assertNotEqual(BinarySerializer.canonical(1), BinarySerializer.canonical(1.0))
+
+    def test_canonical_ignores_key_order(self):
+        first = BinarySerializer.canonical({'id': 'transaction_1', 'value': 1})
+        second = BinarySerializer.canonical({'value': 1, 'id': 'transaction_1'})
+
+        self.assertEqual(first, second)
+
+    def test_loads_invalid_version_ko(self):
+        with self.assertRaises(SerializationError):
+            BinarySerializer.loads(b'\x02\x00')
+
+    def test_loads_truncated_ko(self):
+        data = BinarySerializer.dumps({'id': 'transaction_1'})
+
+        with self.assertRaises(SerializationError):
+            BinarySerializer.loads(data[:-1])
+
+    def test_loads_trailing_bytes_ko(self):
+        data = BinarySerializer.dumps({'id': 'transaction_1'})
+
+        with self.assertRaises(SerializationError):
+            BinarySerializer.loads(data + b'\x00')
+
+    def test_dumps_unsupported_type_ko(self):
+        with self.assertRaises(SerializationError):
+            BinarySerializer.dumps({'id': object()})
+
+    def test_encode_blocks_round_trip(self):
+        expected_blocks = [b'first', b'', b'third']
+
+        blocks = BinarySerializer.decode_blocks(BinarySerializer.encode_blocks(expected_blocks))
+
+        self.assertEqual(blocks, expected_blocks)
+
+    def test_iter_encode_blocks(self):
+        blocks = [b'first', b'', b'third']
+
+        chunks = list(BinarySerializer.iter_encode_blocks(count=len(blocks), blocks=iter(blocks)))
+
+        self.assertEqual(len(chunks), 4)
+        self.assertEqual(b''.join(chunks), BinarySerializer.encode_blocks(blocks))
@@ -0,0 +1,291 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from bychain.modules.blockchain.block import Block
+from bychain.modules.blockchain.blockchain import BlockChain
+from bychain.modules.blockchain.store import BlockStore
+
+
+class TestBlockStore(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = self.directory.name
+        self.blocks = []
+        previous_hash = '0'
+        for index in range(5):
+            block = Block(index=index, transactions=[{'id': 'transaction_{}'.format(index), 'value': index}],
+                          previous_hash=previous_hash, timestamp=123456 + index, nonce=index)
+            self.blocks.append(block)
+            previous_hash = block.hash
+
+    def tearDown(self):
+        super().tearDown()
+        self.directory.cleanup()
+
+    def __write_blocks(self, store: BlockStore):
+        for block in self.blocks:
+            store.append(block=block)
+
+    def test_append_and_load(self):
+        store = BlockStore(path=self.path)
+        self.__write_blocks(store)
+        store.close()
+
+        store = BlockStore(path=self.path)
+        loaded_blocks = store.load(first_previous_hash='0')
+
+        self.assertEqual(len(store), 5)
+        self.assertEqual([block.hash for block in loaded_blocks], [block.hash for block in self.blocks])
+        self.assertFalse(any(block.body_loaded for block in loaded_blocks))
+        self.assertEqual(Block.to_json(loaded_blocks[3]), Block.to_json(self.blocks[3]))
+        self.assertTrue(loaded_blocks[3].body_loaded)
+        store.close()
+
+    def test_read(self):
+        store = BlockStore(path=self.path)
+        self.__write_blocks(store)
+
+        block = store.read(height=2)
+
+        self.assertEqual(Block.to_json(block), Block.to_json(self.blocks[2]))
+        store.close()
+
+    def test_recover_torn_record(self):
+        store = BlockStore(path=self.path)
+        self.__write_blocks(store)
+        store.close()
+        with open(os.path.join(self.path, 'segment-000000.dat'), 'ab') as segment_file:
+            segment_file.write(b'\x00\x00\x01')
+
+        store = BlockStore(path=self.path)
+        store.append(block=self.blocks[0])
+        store.close()
+        store = BlockStore(path=self.path)
+
+        self.assertEqual(len(store), 6)
+        self.assertEqual(store.read(height=5).hash, self.blocks[0].hash)
+        store.close()
+
+    def test_recover_torn_index_entry(self):
+        store = BlockStore(path=self.path)
+        self.__write_blocks(store)
+        store.close()
+        with open(os.path.join(self.path, 'index.dat'), 'ab') as index_file:
+            index_file.write(b'\x00' * 10)
+
+        store = BlockStore(path=self.path)
+
+        self.assertEqual(len(store), 5)
+        self.assertEqual(os.path.getsize(os.path.join(self.path, 'index.dat')), 5 * BlockStore.INDEX_FORMAT.size)
+        store.close()
+
+    def test_recover_missing_record_data(self):
+        store = BlockStore(path=self.path)
+        self.__write_blocks(store)
+        store.close()
+        segment_path = os.path.join(self.path, 'segment-000000.dat')
+        with open(segment_path, 'ab') as segment_file:
+            segment_file.truncate(os.path.getsize(segment_path) - 3)
+
+        store = BlockStore(path=self.path)
+        loaded_blocks = store.load(first_previous_hash='0')
+
+        self.assertEqual(len(store), 4)
+        self.assertEqual([block.hash for block in loaded_blocks], [block.hash for block in self.blocks[:4]])
+        store.close()
+
+    def test_truncate(self):
+        store = BlockStore(path=self.path)
+        self.__write_blocks(store)
+        store.truncate(height=2)
+        store.append(block=self.blocks[2])
+        store.close()
+
+        store = BlockStore(path=self.path)
+
+        self.assertEqual(len(store), 3)
+        self.assertEqual(store.read(height=2).hash, self.blocks[2].hash)
+        store.close()
+
+    @mock.patch.object(BlockStore, 'SEGMENT_SIZE', 100)
+    def test_segment_rotation(self):
+        store = BlockStore(path=self.path)
+        self.__write_blocks(store)
+        store.truncate(height=3)
+        store.close()
+
+        store = BlockStore(path=self.path)
+        segments = sorted(name for name in os.listdir(self.path) if name.startswith('segment-'))
+
+        self.assertEqual(len(segments), 3)
+        self.assertEqual([store.read(height=height).hash for height in range(3)],
+                         [block.hash for block in self.blocks[:3]])
+        store.close()
+
+    @mock.patch.object(BlockStore, 'SEGMENT_SIZE', 100)
+    def test_prune(self):
+        store = BlockStore(path=self.path)
+        self.__write_blocks(store)
+        store.prune(height=3)
+        segments = sorted(name for name in os.listdir(self.path) if name.startswith('segment-'))
+
+        self.assertEqual(segments, ['segment-000002.dat', 'segment-000003.dat', 'segment-000004.dat'])
+        self.assertEqual(store.read(height=2).hash, self.blocks[2].hash)
+        self.assertEqual(len(store.load(first_previous_hash='0')), 5)
+        with self.assertRaises(OSError):
+            store.read(height=1)
+        store.close()
+
+    def test_record_and_load_pruned(self):
+        store = BlockStore(path=self.path)
+        store.record_pruned(height=0, transaction_ids=[])
+        store.record_pruned(height=1, transaction_ids=['transaction_1', '1'])
+        store.close()
+        with open(os.path.join(self.path, BlockStore.PRUNED_FILE), 'ab') as pruned_file:
+            pruned_file.write(b'\x00\x00\x00\x10torn')
+
+        store = BlockStore(path=self.path)
+        height, transaction_ids = store.load_pruned()
+        store.record_pruned(height=2, transaction_ids=['transaction_2'])
+
+        self.assertEqual(height, 2)
+        self.assertEqual(transaction_ids, ['transaction_1', '1'])
+        self.assertEqual(store.load_pruned(), (3, ['transaction_1', '1', 'transaction_2']))
+        store.close()
+
+    def test_load_transaction_ids(self):
+        expected_transaction_ids = [['transaction_0'], ['transaction_1'], ['transaction_x']]
+        replacement = Block(index=2, transactions=[{'id': 'transaction_x', 'value': 1}],
+                            previous_hash=self.blocks[1].hash, timestamp=123460)
+
+        store = BlockStore(path=self.path)
+        self.__write_blocks(store)
+        store.truncate(height=2)
+        store.append(block=replacement)
+        store.close()
+        with open(os.path.join(self.path, BlockStore.TRANSACTIONS_FILE), 'ab') as transactions_file:
+            transactions_file.write(b'\x00\x00\x00\x10torn')
+
+        store = BlockStore(path=self.path)
+
+        self.assertEqual(store.load_transaction_ids(), expected_transaction_ids)
+        store.close()
+
+    @mock.patch.object(BlockChain, 'PRUNE_DEPTH', 1)
+    @mock.patch.object(BlockChain, 'BODY_CACHE_SIZE', 2)
+    def test_blockchain_evicts_bodies(self):
+        store = BlockStore(path=self.path)
+        chain = BlockChain(store=store)
+        for transaction_id in ('transaction_1', 'transaction_2', 'transaction_3'):
+            chain.add_new_transaction(transaction={'id': transaction_id, 'value': 1})
+            chain.mine()
+        loaded = [chain.block_at(height=height).body_loaded for height in range(4)]
+
+        with mock.patch.object(store, 'read_transactions', wraps=store.read_transactions) as read_transactions:
+            first_transactions = chain.block_at(height=1).transactions
+            chain.block_at(height=2).transactions
+            chain.block_at(height=1).transactions
+            chain.block_at(height=0).transactions
+            chain.block_at(height=1).transactions
+            chain.block_at(height=2).transactions
+        read_heights = [call.kwargs['height'] for call in read_transactions.call_args_list]
+
+        self.assertEqual(loaded, [False, False, False, True])
+        self.assertEqual(read_heights, [1, 2, 0, 2])
+        self.assertEqual(first_transactions[0]['id'], 'transaction_1')
+        self.assertEqual(chain.find_transaction(transaction_id='transaction_1')[0].index, 1)
+        self.assertEqual(chain.validate_chain(chain=chain.chain), True)
+        chain.close()
+
+    @mock.patch.object(BlockChain, 'PRUNE_DEPTH', 1)
+    @mock.patch.object(BlockChain, 'PRUNE_MODE', BlockChain.PRUNE_FULL)
+    def test_blockchain_full_prune_restart(self):
+        chain = BlockChain(store=BlockStore(path=self.path))
+        for transaction_id in ('transaction_1', 'transaction_2'):
+            chain.add_new_transaction(transaction={'id': transaction_id, 'value': 1})
+            chain.mine()
+        expected_hash = chain.last_block.hash
+        replayed = chain.add_new_transaction(transaction={'id': 'transaction_1', 'value': 1})
+        chain.close()
+
+        restarted_chain = BlockChain(store=BlockStore(path=self.path))
+        replayed_after_restart = restarted_chain.add_new_transaction(transaction={'id': 'transaction_1', 'value': 1})
+        added_new = restarted_chain.add_new_transaction(transaction={'id': 'transaction_3', 'value': 1})
+
+        self.assertEqual(restarted_chain.last_block.hash, expected_hash)
+        self.assertEqual(restarted_chain.pruned_height, 2)
+        self.assertFalse(restarted_chain.block_at(height=1).body_available)
+        self.assertEqual(restarted_chain.find_transaction(transaction_id='transaction_2')[0].index, 2)
+        self.assertIsNone(restarted_chain.find_transaction(transaction_id='transaction_1'))
+        self.assertEqual(replayed, False)
+        self.assertEqual(replayed_after_restart, False)
+        self.assertEqual(added_new, True)
+        restarted_chain.close()
+
+    def test_blockchain_restart(self):
+        store = BlockStore(path=self.path)
+        chain = BlockChain(store=store)
+        chain.add_new_transaction(transaction={'id': 'transaction_1', 'value': 1})
+        chain.mine()
+        expected_chain = chain.chain
+        chain.close()
+
+        restarted_chain = BlockChain(store=BlockStore(path=self.path))
+
+        self.assertEqual(restarted_chain.chain, expected_chain)
+        self.assertEqual(restarted_chain.validate_chain(chain=restarted_chain.chain), True)
+        restarted_chain.close()
+
+    def test_blockchain_replacement_writes_through(self):
+        remote_chain = BlockChain()
+        remote_chain.add_new_transaction(transaction={'id': 'transaction_1', 'value': 1})
+        remote_chain.mine()
+        replacement = remote_chain.chain
+        for block_json in replacement:
+            block_json.pop('hash')
+
+        chain = BlockChain(store=BlockStore(path=self.path))
+        chain.chain = replacement
+        expected_chain = chain.chain
+        chain.close()
+        restarted_chain = BlockChain(store=BlockStore(path=self.path))
+
+        self.assertEqual(restarted_chain.chain, expected_chain)
+        restarted_chain.close()
+
+    def test_blockchain_restart_indexes(self):
+        chain = BlockChain(store=BlockStore(path=self.path))
+        chain.add_new_transaction(transaction={'id': 'transaction_1', 'value': 1})
+        mined_block = chain.mine()
+        chain.close()
+
+        restarted_chain = BlockChain(store=BlockStore(path=self.path))
+        block = restarted_chain.block_by_hash(block_hash=mined_block.hash)
+
+        self.assertFalse(block.body_loaded)
+        self.assertEqual(restarted_chain.find_transaction(transaction_id='transaction_1'), (block, 0))
+        restarted_chain.close()
+
+    def test_blockchain_restart_indexes_without_reading_bodies(self):
+        chain = BlockChain(store=BlockStore(path=self.path))
+        for transaction_id in ('transaction_1', 'transaction_2'):
+            chain.add_new_transaction(transaction={'id': transaction_id, 'value': 1})
+            chain.mine()
+        chain.close()
+
+        store = BlockStore(path=self.path)
+        with mock.patch.object(store, 'read_transactions', wraps=store.read_transactions) as read_transactions:
+            restarted_chain = BlockChain(store=store)
+            replayed = restarted_chain.add_new_transaction(transaction={'id': 'transaction_2', 'value': 1})
+            added_new = restarted_chain.add_new_transaction(transaction={'id': 'transaction_3', 'value': 1})
+            location = restarted_chain.find_transaction(transaction_id='transaction_1')
+
+        self.assertEqual(replayed, False)
+        self.assertEqual(added_new, True)
+        self.assertEqual((location[0].index, location[1]), (1, 0))
+        self.assertEqual(read_transactions.call_count, 0)
+        restarted_chain.close()
@@ -0,0 +1,43 @@
+import copy
+import json
+import pickle
+import unittest
+
+from bychain.modules.blockchain.transaction import FrozenTransaction
+
+
+class TestFrozenTransaction(unittest.TestCase):
+
+    def test_initialization(self):
+        expected_transaction = {'id': 'transaction_1', 'value': 1}
+
+        transaction = FrozenTransaction(expected_transaction)
+
+        self.assertEqual(transaction, expected_transaction)
+        self.assertEqual(json.dumps(transaction, sort_keys=True), json.dumps(expected_transaction, sort_keys=True))
+
+    def test_freeze_reuses_frozen(self):
+        transaction = FrozenTransaction({'id': 'transaction_1', 'value': 1})
+
+        self.assertIs(FrozenTransaction.freeze(transaction), transaction)
+        self.assertIs(copy.deepcopy(transaction), transaction)
+
+    def test_mutation_ko(self):
+        transaction = FrozenTransaction({'id': 'transaction_1', 'value': 1})
+
+        with self.assertRaises(TypeError):
+            transaction['value'] = 2
+        with self.assertRaises(TypeError):
+            del transaction['value']
+        with self.assertRaises(TypeError):
+            transaction.update(value=2)
+        with self.assertRaises(TypeError):
+            transaction.pop('value')
+
+    def test_pickle(self):
+        transaction = FrozenTransaction({'id': 'transaction_1', 'value': 1})
+
+        loaded = pickle.loads(pickle.dumps(transaction))
+
+        self.assertIsInstance(loaded, FrozenTransaction)
+        self.assertEqual(loaded, transaction)
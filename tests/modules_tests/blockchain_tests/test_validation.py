@@ -0,0 +1,199 @@
+import copy
+import unittest
+from datetime import datetime
+from unittest import mock
+
+from bychain.modules.blockchain.blockchain import BlockChain
+from bychain.modules.blockchain.validation import ChainValidator, ValidationResult, _verify_block
+
+
+class TestChainValidator(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        chain = BlockChain()
+        for transaction_id in range(1, 10):
+            chain.add_new_transaction(transaction={'id': transaction_id, 'value': transaction_id})
+            chain.mine()
+        cls.chain_json = chain.chain
+        cls.headers_json = chain.headers_range()[1]
+
+    def __validate(self, chain, workers=1):
+        validator = ChainValidator(expected_target=BlockChain.expected_target, workers=workers, chunk_size=3)
+        return validator.validate(chain=chain, previous_hash=BlockChain.STARTING_HASH)
+
+    def test_validate_serial_ok(self):
+        expected_work = 10 * 2 ** 8
+
+        result = self.__validate(chain=self.chain_json)
+
+        self.assertTrue(result.valid)
+        self.assertIsNone(result.failed_height)
+        self.assertEqual(result.work, expected_work)
+
+    def test_validate_parallel_ok(self):
+        result = self.__validate(chain=self.chain_json, workers=2)
+
+        self.assertTrue(result.valid)
+
+    def test_workers_default(self):
+        validator = ChainValidator(expected_target=BlockChain.expected_target)
+
+        self.assertEqual(validator.workers, 1)
+        self.assertIn(ChainValidator.START_METHOD, ('forkserver', 'spawn'))
+
+    def test_validate_headers_ok(self):
+        result = self.__validate(chain=self.headers_json)
+
+        self.assertTrue(result.valid)
+
+    def test_validate_headers_tampered_merkle_root_ko(self):
+        headers = [dict(header) for header in self.headers_json]
+        headers[4]['merkle_root'] = '00' * 32
+
+        result = self.__validate(chain=headers)
+
+        self.assertEqual(result.failed_height, 4)
+        self.assertEqual(result.reason, ValidationResult.INVALID_PROOF)
+
+    def test_matches_headers(self):
+        tampered_chain = [dict(block_json) for block_json in self.chain_json]
+        tampered_chain[3]['transactions'] = [{'id': 100, 'value': 100, 'timestamp': 1.0}]
+
+        self.assertTrue(ChainValidator.matches_headers(chain=self.chain_json, headers=self.headers_json))
+        self.assertFalse(ChainValidator.matches_headers(chain=tampered_chain, headers=self.headers_json))
+        self.assertFalse(ChainValidator.matches_headers(chain=self.chain_json[:-1], headers=self.headers_json))
+        self.assertFalse(ChainValidator.matches_headers(chain=self.headers_json, headers=self.headers_json))
+
+    def test_matches_headers_previous_hash_spelling_ko(self):
+        chain = [dict(block_json) for block_json in self.chain_json]
+        chain[3]['previous_hash'] = chain[3]['previous_hash'].upper()
+
+        self.assertFalse(ChainValidator.matches_headers(chain=chain, headers=self.headers_json))
+
+    def test_validate_does_not_mutate_input(self):
+        expected_chain = copy.deepcopy(self.chain_json)
+
+        self.__validate(chain=self.chain_json, workers=2)
+
+        self.assertEqual(self.chain_json, expected_chain)
+
+    def test_validate_parallel_invalid_proof_ko(self):
+        chain_json = copy.deepcopy(self.chain_json)
+        chain_json[7]['transactions'] = [dict(chain_json[7]['transactions'][0], value=100)]
+
+        result = self.__validate(chain=chain_json, workers=2)
+
+        self.assertFalse(result.valid)
+        self.assertEqual(result.failed_height, 7)
+        self.assertEqual(result.reason, ValidationResult.INVALID_PROOF)
+
+    def test_validate_broken_link_ko(self):
+        chain_json = copy.deepcopy(self.chain_json)
+        chain_json[5]['previous_hash'] = 'invalid'
+
+        with mock.patch('bychain.modules.blockchain.validation._verify_chunk') as mock_verify_chunk:
+            result = self.__validate(chain=chain_json)
+
+        self.assertEqual(result.failed_height, 5)
+        self.assertEqual(result.reason, ValidationResult.BROKEN_LINK)
+        mock_verify_chunk.assert_not_called()
+
+    def test_validate_malformed_ko(self):
+        chain_json = copy.deepcopy(self.chain_json)
+        del chain_json[2]['hash']
+
+        result = self.__validate(chain=chain_json)
+        empty_result = self.__validate(chain=[])
+
+        self.assertEqual(result.failed_height, 2)
+        self.assertEqual(result.reason, ValidationResult.MALFORMED)
+        self.assertFalse(empty_result)
+
+    def test_validate_unexpected_fields_ko(self):
+        chain_json = copy.deepcopy(self.chain_json)
+        chain_json[3]['extra'] = 1
+
+        result = self.__validate(chain=chain_json)
+
+        self.assertEqual(result.failed_height, 3)
+        self.assertEqual(result.reason, ValidationResult.INVALID_PROOF)
+
+    def test_validate_checkpoint_mismatch_ko(self):
+        validator = ChainValidator(expected_target=BlockChain.expected_target, workers=1,
+                                   checkpoints={4: 'f' * 64})
+
+        result = validator.validate(chain=self.chain_json, previous_hash=BlockChain.STARTING_HASH)
+
+        self.assertEqual(result.failed_height, 4)
+        self.assertEqual(result.reason, ValidationResult.CHECKPOINT_MISMATCH)
+
+    def test_validate_tampered_body_below_checkpoint_ko(self):
+        chain_json = copy.deepcopy(self.chain_json)
+        chain_json[2]['transactions'] = [{'id': 'evil', 'value': 1000000, 'timestamp': 1.0}]
+        validator = ChainValidator(expected_target=BlockChain.expected_target, workers=1,
+                                   checkpoints={5: self.chain_json[5]['hash']})
+
+        result = validator.validate(chain=chain_json, previous_hash=BlockChain.STARTING_HASH)
+
+        self.assertEqual(result.failed_height, 2)
+        self.assertEqual(result.reason, ValidationResult.INVALID_PROOF)
+
+    def test_validate_skips_proof_below_checkpoint(self):
+        validator = ChainValidator(expected_target=BlockChain.expected_target, workers=1,
+                                   checkpoints={5: self.chain_json[5]['hash']})
+
+        with mock.patch('bychain.modules.blockchain.validation._verify_block', return_value=True) as mock_verify_block:
+            result = validator.validate(chain=self.chain_json, previous_hash=BlockChain.STARTING_HASH)
+        targets = [call.kwargs['target'] for call in mock_verify_block.call_args_list]
+
+        self.assertTrue(result.valid)
+        self.assertEqual(len(targets), len(self.chain_json))
+        self.assertEqual(targets[:6], [None] * 6)
+        self.assertTrue(all(target is not None for target in targets[6:]))
+
+    def test_validate_timestamp_below_median_ko(self):
+        chain_json = copy.deepcopy(self.chain_json)
+        chain_json[7]['timestamp'] = chain_json[3]['timestamp']
+        validator = ChainValidator(expected_target=BlockChain.expected_target, workers=1,
+                                   valid_timestamp=BlockChain.valid_timestamp)
+
+        with mock.patch('bychain.modules.blockchain.validation._verify_chunk') as mock_verify_chunk:
+            result = validator.validate(chain=chain_json, previous_hash=BlockChain.STARTING_HASH)
+
+        self.assertEqual(result.failed_height, 7)
+        self.assertEqual(result.reason, ValidationResult.INVALID_TIMESTAMP)
+        self.assertIsNone(result.work)
+        mock_verify_chunk.assert_not_called()
+
+    def test_validate_timestamp_in_future_ko(self):
+        chain_json = copy.deepcopy(self.chain_json)
+        chain_json[9]['timestamp'] = datetime.utcnow().timestamp() + BlockChain.MAX_FUTURE_BLOCK_TIME + 60
+        validator = ChainValidator(expected_target=BlockChain.expected_target, workers=1,
+                                   valid_timestamp=BlockChain.valid_timestamp)
+
+        result = validator.validate(chain=chain_json, previous_hash=BlockChain.STARTING_HASH)
+
+        self.assertEqual(result.failed_height, 9)
+        self.assertEqual(result.reason, ValidationResult.INVALID_TIMESTAMP)
+
+    def test_validate_malformed_index_and_nonce_ko(self):
+        for field, value in (('index', '0'), ('index', -1), ('index', 1.0), ('index', True), ('nonce', 2 ** 70),
+                             ('nonce', None)):
+            with self.subTest(field=field, value=value):
+                chain_json = copy.deepcopy(self.chain_json)
+                chain_json[3][field] = value
+
+                result = self.__validate(chain=chain_json)
+
+                self.assertEqual(result.failed_height, 3)
+                self.assertEqual(result.reason, ValidationResult.MALFORMED)
+
+    def test_verify_block_out_of_range_nonce_ko(self):
+        headers = [dict(header) for header in self.headers_json]
+        chain_json = copy.deepcopy(self.chain_json)
+        chain_json[2]['nonce'] = 2 ** 70
+
+        self.assertFalse(_verify_block(block_json=chain_json[2]))
+        self.assertFalse(ChainValidator.matches_headers(chain=chain_json, headers=headers))